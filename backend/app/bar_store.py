@@ -0,0 +1,136 @@
+"""
+Intraday 1-minute OHLCV bars per underlying, built incrementally from the ingested chain ticks.
+
+    intraday_bars      {underlying, minute, open, high, low, close, volume, pv, price_sum, ticks}   TTL retention
+    intraday_sessions  {underlying, date, open, high, low, close, volume, pv, price_sum, ticks}     one per IST day
+
+Both are maintained with one upsert per tick ($min/$max/$inc), so the session document always holds the day's
+running high/low and the cumulative sums behind its VWAP. The index has no traded volume of its own: a tick's
+volume is the growth of its expiry's ATM+OTM option volume (calls + puts) since that expiry's previous tick, and
+the VWAP falls back to the plain mean of the session's ticks while no volume has been seen.
+"""
+import os
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pytz import timezone
+
+BARS_COLL = "intraday_bars"
+SESSIONS_COLL = "intraday_sessions"
+BAR_RETENTION_DAYS = int(os.getenv("BAR_RETENTION_DAYS", 30))
+SESSION_TZ = timezone("Asia/Kolkata")
+
+# Running session per underlying, previous session per (underlying, date), last option volume per (user, expiry)
+_sessions = {}
+_previous = {}
+_last_volume = {}
+
+
+def session_date(ts):
+    """IST trading date of a naive UTC timestamp."""
+    return ts.replace(tzinfo=dt_timezone.utc).astimezone(SESSION_TZ).strftime("%Y-%m-%d")
+
+
+def ensure_bar_store(db):
+    db[BARS_COLL].create_index([("underlying", 1), ("minute", 1)], unique=True)
+    db[BARS_COLL].create_index("minute", expireAfterSeconds=BAR_RETENTION_DAYS * 24 * 3600)
+    db[SESSIONS_COLL].create_index([("underlying", 1), ("date", -1)], unique=True)
+
+
+def _ohlcv_update(price, volume):
+    return {
+        "$setOnInsert": {"open": price},
+        "$max": {"high": price},
+        "$min": {"low": price},
+        "$set": {"close": price, "updated_at": datetime.utcnow()},
+        "$inc": {"volume": volume, "pv": price * volume, "price_sum": price, "ticks": 1},
+    }
+
+
+def record_tick(db, underlying, ts, price, volume):
+    """Folds one tick into its minute bar and its session."""
+    update = _ohlcv_update(price, volume)
+    db[BARS_COLL].update_one({"underlying": underlying, "minute": ts.replace(second=0, microsecond=0)}, update, upsert=True)
+    db[SESSIONS_COLL].update_one({"underlying": underlying, "date": session_date(ts)}, update, upsert=True)
+
+
+def load_session(db, underlying, date):
+    return db[SESSIONS_COLL].find_one({"underlying": underlying, "date": date}, {"_id": 0})
+
+
+def load_previous_session(db, underlying, date):
+    """Latest session before `date` (the previous trading day, whatever weekends or holidays lie between)."""
+    return db[SESSIONS_COLL].find_one(
+        {"underlying": underlying, "date": {"$lt": date}}, {"_id": 0}, sort=[("date", -1)],
+    )
+
+
+def session_bars(db, underlying, date):
+    """The minute bars of one session, oldest to newest."""
+    start = SESSION_TZ.localize(datetime.strptime(date, "%Y-%m-%d")).astimezone(dt_timezone.utc).replace(tzinfo=None)
+    window = {"$gte": start, "$lt": start + timedelta(days=1)}
+    return list(db[BARS_COLL].find({"underlying": underlying, "minute": window}, {"_id": 0}).sort("minute", 1))
+
+
+class SessionStats:
+    """Running OHLCV totals of one underlying's session, mirrored in-process from its intraday_sessions document."""
+
+    def __init__(self, underlying, date, doc=None):
+        doc = doc or {}
+        self.underlying = underlying
+        self.date = date
+        self.open = doc.get("open")
+        self.high = doc.get("high")
+        self.low = doc.get("low")
+        self.close = doc.get("close")
+        self.volume = doc.get("volume", 0)
+        self.pv = doc.get("pv", 0)
+        self.price_sum = doc.get("price_sum", 0)
+        self.ticks = doc.get("ticks", 0)
+
+    def add(self, price, volume):
+        if self.open is None:
+            self.open = price
+        self.high = price if self.high is None else max(self.high, price)
+        self.low = price if self.low is None else min(self.low, price)
+        self.close = price
+        self.volume += volume
+        self.pv += price * volume
+        self.price_sum += price
+        self.ticks += 1
+
+    @property
+    def vwap(self):
+        if self.volume > 0:
+            return self.pv / self.volume
+        return self.price_sum / self.ticks if self.ticks else None
+
+
+def get_session(underlying):
+    return _sessions.get(underlying)
+
+
+def set_session(stats):
+    _sessions[stats.underlying] = stats
+    return stats
+
+
+def get_previous(underlying, date):
+    """(True, previous session or None) once cached for this date, else (False, None)."""
+    key = (underlying, date)
+    return (True, _previous[key]) if key in _previous else (False, None)
+
+
+def set_previous(underlying, date, doc):
+    # Only the current date's entry is ever read again
+    for key in [k for k in _previous if k[0] == underlying]:
+        del _previous[key]
+    _previous[(underlying, date)] = doc
+    return doc
+
+
+def tick_volume(user, expiry, total):
+    """Option volume traded since the previous tick of user+expiry (0 on the first tick or a reset)."""
+    last = _last_volume.get((user, expiry))
+    _last_volume[(user, expiry)] = total
+    if last is None or total is None:
+        return 0
+    return max(0, total - last)
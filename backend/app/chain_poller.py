@@ -0,0 +1,102 @@
+import asyncio
+import json
+import os
+from fastapi.encoders import jsonable_encoder
+
+POLL_INTERVAL_SECONDS = float(os.getenv("POLL_INTERVAL_SECONDS", 5))
+# Events buffered per subscriber; a slow client drops its oldest events and catches up on the latest tick
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("SUBSCRIBER_QUEUE_SIZE", 4))
+
+# One poller per (user, expiry) with at least one subscriber
+_pollers = {}
+
+
+def format_event(event, data):
+    """Server-Sent Events frame; encoded once per tick and shared by every subscriber."""
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+
+class ChainPoller:
+    """
+    Fetches one user/expiry chain every `interval` seconds and runs the signal modules once through `tick_fn`,
+    publishing the result to all subscribers. Stops by itself once the last subscriber leaves.
+    """
+
+    def __init__(self, user, expiry, tick_fn, interval=POLL_INTERVAL_SECONDS):
+        self.user = user
+        self.expiry = expiry
+        self.tick_fn = tick_fn
+        self.interval = interval
+        self.subscribers = set()
+        self.latest = None
+        self._task = None
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        # Late joiners get the last tick straight away instead of waiting for the next interval
+        if self.latest is not None:
+            queue.put_nowait(self.latest)
+        self.subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def stop(self):
+        self.subscribers.clear()
+        if self._task is not None:
+            self._task.cancel()
+
+    def _publish(self, message):
+        for queue in list(self.subscribers):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while self.subscribers:
+                started = loop.time()
+                try:
+                    message = format_event("tick", await self.tick_fn(self.user, self.expiry))
+                    self.latest = message
+                except Exception as e:
+                    # HTTPException carries the same detail the polling endpoints would have returned
+                    detail = getattr(e, "detail", None) or str(e)
+                    print(f"[Poller] {self.user}/{self.expiry} tick failed: {detail}")
+                    message = format_event("error", {"detail": detail})
+                self._publish(message)
+                await asyncio.sleep(max(0.0, self.interval - (loop.time() - started)))
+        finally:
+            if _pollers.get((self.user, self.expiry)) is self:
+                del _pollers[(self.user, self.expiry)]
+
+
+def subscribe(user, expiry, tick_fn):
+    poller = _pollers.get((user, expiry))
+    if poller is None:
+        poller = ChainPoller(user, expiry, tick_fn)
+        _pollers[(user, expiry)] = poller
+    return poller.subscribe()
+
+
+def unsubscribe(user, expiry, queue):
+    poller = _pollers.get((user, expiry))
+    if poller is not None:
+        poller.unsubscribe(queue)
+
+
+def stop_pollers():
+    for poller in list(_pollers.values()):
+        poller.stop()
+    _pollers.clear()
+
+
+def active_pollers():
+    return [
+        {"user": p.user, "expiry": p.expiry, "subscribers": len(p.subscribers)}
+        for p in _pollers.values()
+    ]
@@ -0,0 +1,217 @@
+import os
+from datetime import datetime
+from pymongo.errors import CollectionInvalid, OperationFailure
+
+# Append-only option chain history: one document per ingested tick
+CHAIN_HISTORY_COLL = "option_chain_history"
+CHAIN_HISTORY_RETENTION_DAYS = int(os.getenv("CHAIN_HISTORY_RETENTION_DAYS", 30))
+# Mongo time-series bucket granularity ("seconds" groups 5s ticks into ~hourly buckets, "minutes" into daily ones)
+CHAIN_HISTORY_GRANULARITY = os.getenv("CHAIN_HISTORY_GRANULARITY", "seconds")
+# Compact per-tick leg totals computed once at ingest; what the signal modules read their windows from
+CHAIN_AGG_COLL = "option_chain_aggregates"
+# Last N spot prices per user/expiry, mirrored from the in-process ring (window_engine.RingBuffer)
+SPOT_ROLLING_COLL = "spot_price_rolling"
+# One compact checkpoint document per user/expiry of the bias lookback buffer (window_engine.LookbackBuffer)
+ROLLING_COLL = "option_chain_rolling"
+ROLLING_FIELDS = ["call_oi", "put_oi", "call_iv", "put_iv", "call_volume", "put_volume"]
+
+# (label, call field, put field) summed over ATM+OTM strikes of each leg
+LEG_AGG_COLS = [
+    ("volume", "call_volume", "put_volume"),
+    ("openInterest", "call_oi", "put_oi"),
+    ("iv", "call_iv", "put_iv"),
+    ("bidQty", "call_bidQty", "put_bidQty"),
+    ("askQty", "call_askQty", "put_askQty"),
+    ("bidPrice", "call_bidPrice", "put_bidPrice"),
+    ("askPrice", "call_askPrice", "put_askPrice"),
+    ("theta", "call_theta", "put_theta"),
+    ("vega", "call_vega", "put_vega"),
+    ("gamma", "call_gamma", "put_gamma"),
+]
+
+
+def _is_timeseries(db, name):
+    info = next(db.list_collections(filter={"name": name}), None)
+    return bool(info and info.get("type") == "timeseries")
+
+
+def ensure_time_series(db, name, retention_days, granularity="seconds"):
+    """
+    Creates `name` as a bucketed time-series collection (timeField=timestamp, metaField=meta) with TTL retention.
+    On servers without time-series support it falls back to a plain collection with a TTL index.
+    Either way a compound (user, expiry, timestamp) index backs the windowed reads.
+    """
+    expire_after = retention_days * 24 * 3600
+    if name not in db.list_collection_names():
+        try:
+            db.create_collection(
+                name,
+                timeseries={"timeField": "timestamp", "metaField": "meta", "granularity": granularity},
+                expireAfterSeconds=expire_after,
+            )
+        except (CollectionInvalid, OperationFailure):
+            pass
+    col = db[name]
+    col.create_index([("meta.user", 1), ("meta.expiry", 1), ("timestamp", 1)])
+    if not _is_timeseries(db, name):
+        col.create_index("timestamp", expireAfterSeconds=expire_after)
+    return col
+
+
+def ensure_chain_history(db):
+    return ensure_time_series(db, CHAIN_HISTORY_COLL, CHAIN_HISTORY_RETENTION_DAYS, CHAIN_HISTORY_GRANULARITY)
+
+
+def ensure_chain_aggregates(db):
+    return ensure_time_series(db, CHAIN_AGG_COLL, CHAIN_HISTORY_RETENTION_DAYS, CHAIN_HISTORY_GRANULARITY)
+
+
+def _num(v):
+    # Missing greeks/quotes are stored as "-" by the ingest flattening
+    return v if isinstance(v, (int, float)) else 0
+
+
+def aggregate_legs(strikes):
+    """Sums LEG_AGG_COLS over the zone-tagged ATM+OTM rows of each leg. Returns (call_totals, put_totals)."""
+    call_totals = {label: 0 for label, _, _ in LEG_AGG_COLS}
+    put_totals = {label: 0 for label, _, _ in LEG_AGG_COLS}
+    for r in strikes:
+        call_side = r.get("call_option_type_zone") in ("ATM", "OTM")
+        put_side = r.get("put_option_type_zone") in ("ATM", "OTM")
+        for label, call_key, put_key in LEG_AGG_COLS:
+            if call_side:
+                call_totals[label] += _num(r.get(call_key, 0))
+            if put_side:
+                put_totals[label] += _num(r.get(put_key, 0))
+    return call_totals, put_totals
+
+
+def build_tick_aggregate(user, expiry, timestamp, spot, atm_strike, strikes):
+    """
+    Compact record for one tick: underlying, spot, ATM strike and the ATM+OTM leg totals.
+    Zones follow the ATM strike: calls at/above it and puts at/below it are the aggregated ATM+OTM rows.
+    """
+    call_totals, put_totals = aggregate_legs(strikes)
+    return {
+        "timestamp": timestamp,
+        "meta": {"user": user, "expiry": expiry},
+        "underlying": strikes[0].get("underlying_key") if strikes else None,
+        "spot": spot,
+        "atm_strike": atm_strike,
+        "calls": call_totals,
+        "puts": put_totals,
+    }
+
+
+def append_aggregate(db, record):
+    # insert_one adds _id to the dict; keep the caller's record clean for in-process reuse
+    db[CHAIN_AGG_COLL].insert_one(dict(record))
+
+
+def recent_aggregates(db, user, expiry, limit):
+    """Returns the last `limit` aggregate records for user+expiry, oldest to newest."""
+    docs = list(
+        db[CHAIN_AGG_COLL]
+        .find({"meta.user": user, "meta.expiry": expiry}, {"_id": 0})
+        .sort("timestamp", -1)
+        .limit(limit)
+    )
+    return docs[::-1]
+
+
+def latest_aggregate(db, user, expiry):
+    return db[CHAIN_AGG_COLL].find_one({"meta.user": user, "meta.expiry": expiry}, {"_id": 0}, sort=[("timestamp", -1)])
+
+
+def append_tick(db, user, expiry, timestamp, spot, strikes):
+    db[CHAIN_HISTORY_COLL].insert_one({
+        "timestamp": timestamp,
+        "meta": {"user": user, "expiry": expiry},
+        "spot": spot,
+        "strikes": strikes,
+    })
+
+
+def recent_ticks(db, user, expiry, limit, projection=None):
+    """Returns the last `limit` ticks for user+expiry, oldest to newest."""
+    docs = list(
+        db[CHAIN_HISTORY_COLL]
+        .find({"meta.user": user, "meta.expiry": expiry}, projection)
+        .sort("timestamp", -1)
+        .limit(limit)
+    )
+    return docs[::-1]
+
+
+def future_spot(db, user, expiry, ts):
+    """Spot of the first tick at or after `ts`, or None if no such tick has been ingested yet."""
+    doc = db[CHAIN_AGG_COLL].find_one(
+        {"meta.user": user, "meta.expiry": expiry, "timestamp": {"$gte": ts}},
+        {"spot": 1},
+        sort=[("timestamp", 1)],
+    )
+    return doc.get("spot") if doc else None
+
+
+def future_aggregates(db, user, expiry, targets, fields=("spot",)):
+    """
+    As-of merge join: for each of `targets` (any order), the `fields` of the first aggregate at or after it,
+    or None once the series runs out. One forward cursor over the user/expiry series for the whole batch.
+    """
+    if not targets:
+        return []
+    order = sorted(range(len(targets)), key=targets.__getitem__)
+    cursor = (
+        db[CHAIN_AGG_COLL]
+        .find(
+            {"meta.user": user, "meta.expiry": expiry, "timestamp": {"$gte": targets[order[0]]}},
+            {"_id": 0, "timestamp": 1, **{f: 1 for f in fields}},
+        )
+        .sort("timestamp", 1)
+    )
+    found = [None] * len(targets)
+    tick = next(cursor, None)
+    for i in order:
+        while tick is not None and tick["timestamp"] < targets[i]:
+            tick = next(cursor, None)
+        if tick is None:
+            break
+        found[i] = tick
+    cursor.close()
+    return found
+
+
+def push_spot(db, user, expiry, spot, capacity):
+    """Appends one spot and trims server-side, so persisting the rolling window never rewrites the whole array."""
+    db[SPOT_ROLLING_COLL].update_one(
+        {"user": user, "expiry": expiry},
+        {
+            "$push": {"spots": {"$each": [spot], "$slice": -capacity}},
+            "$set": {"updated_at": datetime.utcnow()},
+        },
+        upsert=True,
+    )
+
+
+def load_spots(db, user, expiry):
+    doc = db[SPOT_ROLLING_COLL].find_one({"user": user, "expiry": expiry}, {"spots": 1})
+    return doc.get("spots", []) if doc else []
+
+
+def save_rolling_checkpoint(db, user, expiry, entries):
+    """Stores thinned lookback entries as [epoch, *ROLLING_FIELDS] rows in a single document."""
+    db[ROLLING_COLL].update_one(
+        {"user": user, "expiry": expiry, "checkpoint": {"$exists": True}},
+        {"$set": {
+            "checkpoint": [[ts] + [values[f] for f in ROLLING_FIELDS] for ts, values in entries],
+            "updated_at": datetime.utcnow(),
+        }},
+        upsert=True,
+    )
+
+
+def load_rolling_checkpoint(db, user, expiry):
+    doc = db[ROLLING_COLL].find_one({"user": user, "expiry": expiry, "checkpoint": {"$exists": True}})
+    if not doc:
+        return []
+    return [(row[0], dict(zip(ROLLING_FIELDS, row[1:]))) for row in doc["checkpoint"]]
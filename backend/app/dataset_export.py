@@ -0,0 +1,518 @@
+"""
+Streaming export of labeled training datasets from the *_snapshots collections.
+
+Every module is one entry in EXPORTS: which collection to read, how a snapshot splits into rows, which
+(dotted) fields become feature columns and how the label is computed from the future chain aggregates.
+Snapshots are streamed in timestamp order with a batched cursor, joined per chunk against the
+option_chain_aggregates series (one forward cursor per user/expiry instead of one find_one per row) and
+appended to the output chunk by chunk, so memory stays bounded by EXPORT_BATCH whatever the history.
+Output is a partitioned Parquet dataset per module (dataset_store.py) or, with --format csv, a flat CSV.
+Runs are incremental: each output keeps a watermark and only snapshots after it whose lookahead windows
+have closed are labeled and appended.
+
+    python export_bias_data.py                           # one module, from the repo root
+    python -m backend.app.dataset_export bias trap       # several (or all, with no arguments)
+    python -m backend.app.dataset_export --full          # rebuild from the whole history
+"""
+import argparse
+import os
+import shutil
+import sys
+from datetime import datetime, timedelta
+import pandas as pd
+from pymongo import MongoClient
+try:
+    from .chain_store import future_aggregates
+    from .signal_store import signal_paths, resolve_signals
+    from .dataset_store import (
+        STATE_FILE, PartitionWriter, dataset_path, load_watermark, save_watermark, swap_dataset, write_categories,
+    )
+except ImportError:
+    # Imported as a top-level module by the scripts in this folder (export_meta_model_data.py)
+    from chain_store import future_aggregates
+    from signal_store import signal_paths, resolve_signals
+    from dataset_store import (
+        STATE_FILE, PartitionWriter, dataset_path, load_watermark, save_watermark, swap_dataset, write_categories,
+    )
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
+DB_NAME = "samarth"
+# Snapshots per cursor batch, as-of join and file append
+EXPORT_BATCH = int(os.getenv("EXPORT_BATCH", 2000))
+# "parquet" (partitioned datasets the train_* scripts load) or "csv" (one flat file per module, for inspection)
+EXPORT_FORMAT = os.getenv("EXPORT_FORMAT", "parquet")
+# Extra wait past the longest lookahead before a snapshot is exported, so the tick closing its window is ingested
+EXPORT_GRACE_SECONDS = int(os.getenv("EXPORT_GRACE_SECONDS", 30))
+LABEL_WINDOW_MINUTES = 10
+
+
+def get_path(doc, path):
+    """Dotted-path lookup; numeric parts index into lists (e.g. "raw_signals.sr.0.confidence")."""
+    value = doc
+    for part in path.split("."):
+        if isinstance(value, dict):
+            value = value.get(part)
+        elif isinstance(value, list) and part.isdigit():
+            value = value[int(part)] if int(part) < len(value) else None
+        else:
+            return None
+    return value
+
+
+def _as_datetime(ts):
+    if isinstance(ts, str):
+        return datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    return ts
+
+
+def _pct_move(future, spot):
+    return (future - spot) / spot * 100
+
+
+# --- Row splitters: snapshot -> [(extra key columns, sub-document the features are read from)] ---
+def whole_snapshot(doc):
+    return [({}, doc)]
+
+
+def trap_legs(doc):
+    return [({"leg": leg}, doc.get(leg) or {}) for leg in ("call", "put")]
+
+
+def sr_zones(doc):
+    return [({}, zone) for zone in doc.get("zones") or []]
+
+
+# --- Labels: (snapshot, row built so far, future aggregates per lookahead) -> label columns, or None to drop the row ---
+def _future_spot(futures, i=0):
+    return futures[i].get("spot") if futures[i] else None
+
+
+BIAS_THRESHOLD = 0.15  # 0.15% move for bullish/bearish
+
+
+def bias_label(doc, row, futures):
+    spot, future = doc.get("spot"), _future_spot(futures)
+    if spot is None or future is None:
+        return None
+    spot_delta = _pct_move(future, spot)
+    if spot_delta > BIAS_THRESHOLD:
+        return {"true_direction": "Bullish"}
+    if spot_delta < -BIAS_THRESHOLD:
+        return {"true_direction": "Bearish"}
+    return {"true_direction": "Sideways"}
+
+
+PROFIT_THRESHOLD = 0.15  # 0.15% move for profit
+
+
+def entry_logic_label(doc, row, futures):
+    direction = row["entry_direction"]
+    spot, future = row["zone_level"], _future_spot(futures)
+    if spot is None or future is None or direction not in ("long", "short", "avoid"):
+        return None
+    spot_delta = _pct_move(future, spot)
+    # Correct if entry direction matches profitable move, or avoid in choppy market
+    correct = (
+        (direction == "long" and spot_delta > PROFIT_THRESHOLD)
+        or (direction == "short" and spot_delta < -PROFIT_THRESHOLD)
+        or (direction == "avoid" and abs(spot_delta) < PROFIT_THRESHOLD)
+    )
+    return {"spot_delta": spot_delta, "correct": int(correct)}
+
+
+TREND_THRESHOLD = 0.2  # 0.2% move for trending
+SIDEWAYS_THRESHOLD = 0.1  # 0.1% range for sideways
+VOLATILITY_IV = 5  # IV range for volatile
+
+
+def market_style_label(doc, row, futures):
+    spot = row["spot_trend_strength"]  # spot_trend_strength is the spot proxy
+    base_iv = row["iv_diff"]
+    future = _future_spot(futures)
+    call_iv, put_iv = get_path(futures[0], "calls.iv"), get_path(futures[0], "puts.iv")
+    if spot is None or base_iv is None or future is None or call_iv is None or put_iv is None:
+        return None
+    spot_delta = (future - spot) / (abs(spot) if spot else 1) * 100
+    iv_range = abs(call_iv + put_iv - base_iv)
+    if abs(spot_delta) > TREND_THRESHOLD and iv_range < VOLATILITY_IV:
+        return {"true_style": "Trending"}
+    if abs(spot_delta) < SIDEWAYS_THRESHOLD and iv_range < VOLATILITY_IV:
+        return {"true_style": "Sideways"}
+    return {"true_style": "Volatile"}
+
+
+REVERSAL_THRESHOLD = 0.15  # 0.15% move for reversal
+
+
+def reversal_label(doc, row, futures):
+    spot, future = doc.get("spot"), _future_spot(futures)
+    if spot is None or future is None:
+        return None
+    spot_delta = _pct_move(future, spot)
+    reversal_type = row["reversal_type"]
+    true_reversal = (
+        (reversal_type == "bullish" and spot_delta > REVERSAL_THRESHOLD)
+        or (reversal_type == "bearish" and spot_delta < -REVERSAL_THRESHOLD)
+    )
+    return {"spot_delta": spot_delta, "true_reversal": int(true_reversal)}
+
+
+BOUNCE_THRESHOLD = 0.1  # 0.1% move for bounce
+BREAK_THRESHOLD = 0.15  # 0.15% move for break
+
+
+def sr_label(doc, row, futures):
+    spot, future = row["zone_level"], _future_spot(futures)
+    if spot is None or future is None:
+        return None
+    spot_delta = _pct_move(future, spot)
+    suggestion = row["bias_suggestion"]
+    if suggestion == "Bounce" and spot_delta < -BOUNCE_THRESHOLD:
+        outcome = "Bounce"
+    elif suggestion == "Break" and spot_delta > BREAK_THRESHOLD:
+        outcome = "Break"
+    elif suggestion == "Trap":
+        outcome = "Trap"
+    else:
+        outcome = "Other"
+    return {"spot_delta": spot_delta, "true_outcome": outcome}
+
+
+def trap_label(doc, row, futures):
+    spot, future = doc.get("spot"), _future_spot(futures)
+    if spot is None or future is None:
+        return None
+    spot_delta = _pct_move(future, spot)
+    # True trap if price reverses past the threshold against the trapped leg
+    if row["leg"] == "call":
+        true_trap = spot_delta < -REVERSAL_THRESHOLD
+    else:
+        true_trap = spot_delta > REVERSAL_THRESHOLD
+    return {"spot_delta": spot_delta, "true_trap": int(true_trap)}
+
+
+META_LOOKAHEAD_MINUTES = [15, 30, 45, 60]
+META_MOVE_THRESHOLD = 0.5  # percent
+
+
+def meta_label(doc, row, futures):
+    direction = doc.get("entry_direction")
+    spot_now = get_path(doc, "raw_signals.bias.spot")
+    if spot_now is None or direction not in ("long", "short"):
+        return None
+    # Worked if any lookahead saw the move in the entry direction
+    for i in range(len(futures)):
+        future = _future_spot(futures, i)
+        if future is None:
+            continue
+        pct_move = _pct_move(future, spot_now)
+        if (direction == "long" and pct_move > META_MOVE_THRESHOLD) or (direction == "short" and pct_move < -META_MOVE_THRESHOLD):
+            return {"entry_worked": 1}
+    return {"entry_worked": 0}
+
+
+# Per module: snapshot collection, CSV file name, row splitter and the key columns it adds, feature (column,
+# dotted path within the row's sub-document) in output order, extra snapshot fields the label reads, lookaheads,
+# aggregate fields the label reads, label function and the columns it returns, and where the splitter finds its
+# sub-documents (for the projection). The module name doubles as the feature_schema model name.
+EXPORTS = {
+    "bias": {
+        "collection": "bias_identifier_snapshots",
+        "output": "bias_identifier_snapshots_labeled.csv",
+        "rows": whole_snapshot,
+        "features": [
+            ("ce_oi_pct", "rolling_pct.call_oi"), ("ce_iv_pct", "rolling_pct.call_iv"),
+            ("ce_vol_pct", "rolling_pct.call_volume"), ("pe_oi_pct", "rolling_pct.put_oi"),
+            ("pe_iv_pct", "rolling_pct.put_iv"), ("pe_vol_pct", "rolling_pct.put_volume"),
+            # The snapshot spot, kept under the column name the model was trained with
+            ("spot_delta", "spot"), ("price_direction", "price_direction"),
+            ("call_participant", "call_participant"), ("put_participant", "put_participant"), ("bias", "bias"),
+        ],
+        "label_fields": ["spot"],
+        "lookahead_minutes": [LABEL_WINDOW_MINUTES],
+        "future_fields": ["spot"],
+        "label": bias_label,
+        "label_columns": ["true_direction"],
+    },
+    "entry_logic": {
+        "collection": "entry_logic_snapshots",
+        "output": "entry_logic_snapshots_labeled.csv",
+        "rows": whole_snapshot,
+        "features": [
+            ("entry_direction", "entry_direction"), ("trade_type", "trade_type"), ("entry_score", "entry_score"),
+            ("confidence", "confidence"), ("must_avoid", "must_avoid"), ("zone_level", "entry_zone.zone_level"),
+            ("zone_type", "entry_zone.zone_type"), ("zone_confidence", "entry_zone.confidence"),
+        ],
+        "label_fields": [],
+        "lookahead_minutes": [LABEL_WINDOW_MINUTES],
+        "future_fields": ["spot"],
+        "label": entry_logic_label,
+        "label_columns": ["spot_delta", "correct"],
+    },
+    "market_style": {
+        "collection": "market_style_snapshots",
+        "output": "market_style_snapshots_labeled.csv",
+        "rows": whole_snapshot,
+        "features": [
+            ("oi_diff", "oi_diff"), ("vol_diff", "vol_diff"), ("iv_diff", "iv_diff"),
+            ("price_direction", "price_direction"), ("volatility_state", "volatility_state"),
+            ("spot_trend_strength", "spot_trend_strength"), ("total_volume", "total_volume"),
+            ("total_oi", "total_oi"), ("mode", "mode"),
+        ],
+        "label_fields": [],
+        "lookahead_minutes": [LABEL_WINDOW_MINUTES],
+        "future_fields": ["spot", "calls.iv", "puts.iv"],
+        "label": market_style_label,
+        "label_columns": ["true_style"],
+    },
+    "reversal": {
+        "collection": "reversal_probability_snapshots",
+        "output": "reversal_probability_snapshots_labeled.csv",
+        "rows": whole_snapshot,
+        "features": [
+            ("bias_cluster_flipped", "bias_cluster_flipped"), ("iv_oi_support_flip", "iv_oi_support_flip"),
+            ("price_vs_bias_conflict", "price_vs_bias_conflict"), ("liquidity_ok", "liquidity_ok"),
+            ("structural_context", "structural_context"), ("volatility_phase", "volatility_phase"),
+            ("market_style", "market_style"), ("trap_detected", "trap_detected"),
+            ("reversal_probability", "reversal_probability"), ("reversal_type", "reversal_type"),
+        ],
+        "label_fields": ["spot"],
+        "lookahead_minutes": [LABEL_WINDOW_MINUTES],
+        "future_fields": ["spot"],
+        "label": reversal_label,
+        "label_columns": ["spot_delta", "true_reversal"],
+    },
+    "sr": {
+        "collection": "support_resistance_snapshots",
+        "output": "support_resistance_snapshots_labeled.csv",
+        "rows": sr_zones,
+        "features": [
+            ("zone_level", "zone_level"), ("zone_type", "zone_type"), ("zone_state", "zone_state"),
+            ("confidence_score", "confidence_score"), ("volatility_regime", "volatility_regime"),
+            ("trap_risk", "trap_risk"), ("bias_suggestion", "bias_suggestion"),
+            ("signal_disagreement", "signal_disagreement"),
+        ],
+        "label_fields": [],
+        "lookahead_minutes": [LABEL_WINDOW_MINUTES],
+        "future_fields": ["spot"],
+        "label": sr_label,
+        "label_columns": ["spot_delta", "true_outcome"],
+        "container": "zones",
+    },
+    "trap": {
+        "collection": "trap_detector_snapshots",
+        "output": "trap_detector_snapshots_labeled.csv",
+        "rows": trap_legs,
+        "keys": ["leg"],
+        "features": [
+            ("trap_detected", "trap_detected"), ("deception_score", "deception_score"), ("trap_memory", "trap_memory"),
+        ],
+        "label_fields": ["spot"],
+        "lookahead_minutes": [LABEL_WINDOW_MINUTES],
+        "future_fields": ["spot"],
+        "label": trap_label,
+        "label_columns": ["spot_delta", "true_trap"],
+        "container": ["call", "put"],
+    },
+    "meta": {
+        "collection": "entry_logic_snapshots",
+        "output": "meta_model_training_data.csv",
+        "rows": whole_snapshot,
+        "features": [
+            ("entry_score", "entry_score"), ("confidence", "confidence"), ("anomaly_score", "anomaly_score"),
+            ("bias", "raw_signals.bias.bias"), ("market_style", "raw_signals.style.market_style"),
+            ("trap_call", "raw_signals.trap.call.trap_detected"),
+            ("reversal_type", "raw_signals.reversal.reversal_type"),
+            ("sr_confidence", "raw_signals.sr.0.confidence"),
+        ],
+        "label_fields": ["entry_direction", "raw_signals.bias.spot"],
+        "lookahead_minutes": META_LOOKAHEAD_MINUTES,
+        "future_fields": ["spot"],
+        "label": meta_label,
+        "label_columns": ["entry_worked"],
+    },
+}
+
+
+def _projection(spec):
+    """Server-side projection of exactly what the features and label read (array indexes dropped)."""
+    prefixes = spec.get("container") or [""]
+    if isinstance(prefixes, str):
+        prefixes = [prefixes]
+    fields = {"user", "expiry", "timestamp", *spec["label_fields"]}
+    for _, path in spec["features"]:
+        path = ".".join(p for p in path.split(".") if not p.isdigit())
+        fields.update(f"{prefix}.{path}" if prefix else path for prefix in prefixes)
+    if signal_paths(fields):
+        fields.add("signals_id")
+    return {"_id": 0, **{f: 1 for f in sorted(fields)}}
+
+
+def _chunks(docs, size):
+    chunk = []
+    for doc in docs:
+        chunk.append(doc)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def label_chunk(db, spec, docs):
+    """Rows for one chunk of snapshots: each user/expiry group is joined against its aggregates once."""
+    lookaheads = [timedelta(minutes=m) for m in spec["lookahead_minutes"]]
+    groups = {}
+    for doc in docs:
+        doc["timestamp"] = _as_datetime(doc.get("timestamp"))
+        groups.setdefault((doc.get("user"), doc.get("expiry")), []).append(doc)
+    rows = []
+    for (user, expiry), group in groups.items():
+        targets = [doc["timestamp"] + la for doc in group for la in lookaheads]
+        found = future_aggregates(db, user, expiry, targets, spec["future_fields"])
+        for i, doc in enumerate(group):
+            futures = found[i * len(lookaheads):(i + 1) * len(lookaheads)]
+            for keys, unit in spec["rows"](doc):
+                row = {"timestamp": doc["timestamp"], "user": user, "expiry": expiry, **keys}
+                row.update((column, get_path(unit, path)) for column, path in spec["features"])
+                label = spec["label"](doc, row, futures)
+                if label is None:
+                    continue
+                row.update(label)
+                rows.append(row)
+    # Groups were split out of a time-ordered chunk; keep the file in time order
+    rows.sort(key=lambda r: r["timestamp"])
+    return rows
+
+
+def iter_labeled_chunks(db, name, query=None):
+    """Streams one module's snapshots matching `query` in timestamp order, yielding labeled row lists per chunk."""
+    spec = EXPORTS[name]
+    coll = db[spec["collection"]]
+    coll.create_index("timestamp")
+    projection = _projection(spec)
+    paths = signal_paths(projection)
+    cursor = coll.find(query or {}, projection).sort("timestamp", 1).batch_size(EXPORT_BATCH)
+    try:
+        for docs in _chunks(cursor, EXPORT_BATCH):
+            if paths:
+                # Newer snapshots only reference their raw_signals (see signal_store); fetched per chunk
+                resolve_signals(db, docs, paths)
+            yield docs, label_chunk(db, spec, docs)
+    finally:
+        cursor.close()
+
+
+def columns(name):
+    spec = EXPORTS[name]
+    return ["timestamp", "user", "expiry", *spec.get("keys", []), *(c for c, _ in spec["features"]), *spec["label_columns"]]
+
+
+def export_cutoff(name, now=None):
+    """Newest snapshot time whose lookahead windows have all closed (plus grace), i.e. whose label is final."""
+    lookahead = timedelta(minutes=max(EXPORTS[name]["lookahead_minutes"]))
+    return (now or datetime.utcnow()) - lookahead - timedelta(seconds=EXPORT_GRACE_SECONDS)
+
+
+def _window(watermark, cutoff):
+    ts_range = {"$lte": cutoff}
+    if watermark is not None:
+        ts_range["$gt"] = watermark
+    return {"timestamp": ts_range}
+
+
+def export_csv(db, name, output=None, full=False, now=None):
+    """
+    Appends the rows of one module's snapshots between the export watermark and the cutoff to `output` (default:
+    the spec's file name); with `full`, or on the first run, rewrites the file from scratch. New rows go to a
+    temporary file first and the watermark (in `<output>.state.json`) only advances once they are in place.
+    Returns (snapshots, rows).
+    """
+    output = output or EXPORTS[name]["output"]
+    state_file = output + ".state.json"
+    cutoff = export_cutoff(name, now)
+    watermark = None if full or not os.path.exists(output) else load_watermark(state_file)
+    append = watermark is not None
+    tmp = output + ".tmp"
+    snapshots = written = 0
+    with open(tmp, "w", newline="") as f:
+        for docs, rows in iter_labeled_chunks(db, name, _window(watermark, cutoff)):
+            snapshots += len(docs)
+            if rows:
+                pd.DataFrame(rows, columns=columns(name)).to_csv(f, header=written == 0 and not append, index=False)
+                written += len(rows)
+    if append:
+        with open(tmp) as src, open(output, "a", newline="") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(tmp)
+    elif snapshots:
+        os.replace(tmp, output)
+    else:
+        os.remove(tmp)
+        return 0, 0
+    save_watermark(state_file, cutoff)
+    return snapshots, written
+
+
+def export_parquet(db, name, root=None, full=False, now=None):
+    """
+    Appends the rows of one module's snapshots between the export watermark and the cutoff to its partitioned
+    Parquet dataset (see dataset_store), as new part files. With `full`, or on the first run, the dataset is
+    rebuilt next to the current one and swapped in once complete. Returns (snapshots, rows).
+    """
+    path = dataset_path(name, root)
+    cutoff = export_cutoff(name, now)
+    watermark = None if full else load_watermark(os.path.join(path, STATE_FILE))
+    target = path if watermark is not None else path + ".rebuild"
+    if watermark is None:
+        shutil.rmtree(target, ignore_errors=True)
+    write_categories(name, target)
+    writer = PartitionWriter(name, [c for c in columns(name) if c not in ("user", "expiry")], target)
+    snapshots = written = 0
+    try:
+        for docs, rows in iter_labeled_chunks(db, name, _window(watermark, cutoff)):
+            snapshots += len(docs)
+            writer.write(rows)
+            written += len(rows)
+    except BaseException:
+        writer.abort()
+        raise
+    if target != path and not snapshots:
+        shutil.rmtree(target)
+        return 0, 0
+    writer.commit()
+    save_watermark(os.path.join(target, STATE_FILE), cutoff)
+    if target != path:
+        swap_dataset(target, path)
+    return snapshots, written
+
+
+def run_export(name, db=None, fmt=None, full=False):
+    """Script entry point: exports one module and reports like the old per-module scripts did."""
+    db = db if db is not None else MongoClient(MONGO_URI)[DB_NAME]
+    fmt = fmt or EXPORT_FORMAT
+    if fmt == "csv":
+        snapshots, written = export_csv(db, name, full=full)
+        target = EXPORTS[name]["output"]
+    else:
+        snapshots, written = export_parquet(db, name, full=full)
+        target = dataset_path(name)
+    if not snapshots and not os.path.exists(target):
+        print(f"No {EXPORTS[name]['collection']} found!")
+        return False
+    print(f"Exported {written} new labeled rows from {snapshots} snapshots to {target}")
+    return True
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("modules", nargs="*", help=f"any of {', '.join(EXPORTS)} (default: all)")
+    ap.add_argument("--format", choices=["parquet", "csv"], default=EXPORT_FORMAT)
+    ap.add_argument("--full", action="store_true", help="rebuild the dataset instead of appending past the watermark")
+    args = ap.parse_args()
+    unknown = sorted(set(args.modules) - set(EXPORTS))
+    if unknown:
+        ap.error(f"unknown module(s): {', '.join(unknown)}")
+    db = MongoClient(MONGO_URI)[DB_NAME]
+    ok = [run_export(name, db, args.format, args.full) for name in args.modules or list(EXPORTS)]
+    sys.exit(0 if all(ok) else 1)
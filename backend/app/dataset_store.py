@@ -0,0 +1,212 @@
+"""
+Partitioned Parquet training datasets, written by dataset_export and read by the train_* scripts.
+
+    datasets/<module>/_categories.json                               vocabulary of every categorical column
+    datasets/<module>/_export_state.json                             export watermark
+    datasets/<module>/date=2024-01-02/user=<u>/expiry=<e>/part-*.parquet
+
+Categorical columns are dictionary-encoded against the fixed feature_schema vocabularies, so a value has the
+same code in every file and every run; numeric columns are float64, binary labels int8. user/expiry live only
+in the partition path. Files are memory-mapped on load.
+"""
+import json
+import os
+import shutil
+from datetime import datetime
+from urllib.parse import quote
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+try:
+    from .feature_schema import SCHEMAS, LABELS, FLAG, TRAP_LEG, encode_value
+except ImportError:
+    # Imported as a top-level module by the scripts in this folder (train_meta_model.py)
+    from feature_schema import SCHEMAS, LABELS, FLAG, TRAP_LEG, encode_value
+
+DATASET_ROOT = os.getenv("DATASET_ROOT", "datasets")
+PARTITION_KEYS = ["date", "user", "expiry"]
+CATEGORIES_FILE = "_categories.json"
+# {"watermark": snapshot timestamp everything up to has been exported}
+STATE_FILE = "_export_state.json"
+# Categorical columns some exports carry that are not model features
+EXTRA_CATEGORIES = {"leg": TRAP_LEG}
+
+_PARTITIONING = ds.partitioning(pa.schema([(key, pa.string()) for key in PARTITION_KEYS]), flavor="hive")
+
+
+def dataset_path(name, root=None):
+    return os.path.join(root or DATASET_ROOT, name)
+
+
+def column_vocabularies(name):
+    vocabs = dict(EXTRA_CATEGORIES)
+    vocabs.update((column, vocab) for column, vocab in SCHEMAS.get(name, []) if vocab is not None)
+    column, vocab = LABELS.get(name, (None, None))
+    if vocab is not None:
+        vocabs[column] = vocab
+    return vocabs
+
+
+def arrow_schema(name, columns):
+    """Typed schema for the stored (non-partition) columns of one module's dataset."""
+    vocabs = column_vocabularies(name)
+    label = LABELS.get(name, (None, None))[0]
+    fields = []
+    for column in columns:
+        vocab = vocabs.get(column)
+        if column == "timestamp":
+            fields.append(pa.field(column, pa.timestamp("us")))
+        elif vocab is FLAG:
+            fields.append(pa.field(column, pa.bool_()))
+        elif vocab is not None:
+            fields.append(pa.field(column, pa.dictionary(pa.int8(), pa.string())))
+        elif column == label:
+            fields.append(pa.field(column, pa.int8()))
+        else:
+            fields.append(pa.field(column, pa.float64()))
+    return pa.schema(fields)
+
+
+def _arrow_column(values, field, vocab):
+    if pa.types.is_dictionary(field.type):
+        # Unknown values are stored as null, i.e. code -1 like feature_schema.encode_value
+        codes = [vocab.index(v) if v in vocab else None for v in values]
+        return pa.DictionaryArray.from_arrays(pa.array(codes, type=pa.int8()), pa.array(vocab, type=pa.string()))
+    if pa.types.is_boolean(field.type):
+        return pa.array([None if v is None else encode_value(v, FLAG) == 1.0 for v in values], type=pa.bool_())
+    if pa.types.is_floating(field.type):
+        return pa.array([encode_value(v, None) for v in values], type=field.type, from_pandas=True)
+    return pa.array(values, type=field.type)
+
+
+def rows_to_table(name, schema, rows):
+    vocabs = column_vocabularies(name)
+    return pa.Table.from_arrays(
+        [_arrow_column([row.get(f.name) for row in rows], f, vocabs.get(f.name)) for f in schema],
+        schema=schema,
+    )
+
+
+def partition_dir(path, date, user, expiry):
+    return os.path.join(path, f"date={date}", f"user={quote(str(user), safe='')}", f"expiry={quote(str(expiry), safe='')}")
+
+
+def write_categories(name, path):
+    os.makedirs(path, exist_ok=True)
+    vocabs = {column: vocab for column, vocab in column_vocabularies(name).items() if vocab is not FLAG}
+    with open(os.path.join(path, CATEGORIES_FILE), "w") as f:
+        json.dump(vocabs, f, indent=2)
+
+
+def load_watermark(state_file):
+    """Snapshot timestamp up to which an export is complete, or None if it has never run."""
+    if not os.path.exists(state_file):
+        return None
+    with open(state_file) as f:
+        return datetime.fromisoformat(json.load(f)["watermark"])
+
+
+def save_watermark(state_file, watermark):
+    tmp = state_file + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"watermark": watermark.isoformat(), "updated_at": datetime.utcnow().isoformat()}, f)
+    os.replace(tmp, state_file)
+
+
+class PartitionWriter:
+    """
+    Appends time-ordered row chunks to a new Parquet file per date/user/expiry partition. Partitions of a date
+    are closed once a later date shows up, so only the current day's writers are open. Files are written under
+    dot-prefixed names (skipped by readers) and only renamed into place by commit(), so an export that fails
+    halfway leaves the dataset as it was.
+    """
+
+    def __init__(self, name, columns, path):
+        self.name = name
+        self.path = path
+        self.schema = arrow_schema(name, columns)
+        self._writers = {}
+        self._pending = []
+
+    def _open(self, key, first_ts):
+        directory = partition_dir(self.path, *key)
+        os.makedirs(directory, exist_ok=True)
+        # Rows are newer than anything already exported, so the first timestamp never clashes with an existing part
+        final = os.path.join(directory, f"part-{first_ts:%Y%m%dT%H%M%S%f}.parquet")
+        tmp = os.path.join(directory, "." + os.path.basename(final) + ".tmp")
+        self._writers[key] = (pq.ParquetWriter(tmp, self.schema), tmp, final)
+
+    def _close(self, key):
+        writer, tmp, final = self._writers.pop(key)
+        writer.close()
+        self._pending.append((tmp, final))
+
+    def write(self, rows):
+        groups = {}
+        for row in rows:
+            key = (row["timestamp"].strftime("%Y-%m-%d"), row["user"], row["expiry"])
+            groups.setdefault(key, []).append(row)
+        for key, group in groups.items():
+            if key not in self._writers:
+                self._open(key, group[0]["timestamp"])
+            self._writers[key][0].write_table(rows_to_table(self.name, self.schema, group))
+        if groups:
+            newest = max(key[0] for key in groups)
+            for key in [k for k in self._writers if k[0] < newest]:
+                self._close(key)
+
+    def commit(self):
+        for key in list(self._writers):
+            self._close(key)
+        files = []
+        for tmp, final in self._pending:
+            os.replace(tmp, final)
+            files.append(final)
+        self._pending = []
+        return files
+
+    def abort(self):
+        for key in list(self._writers):
+            self._close(key)
+        for tmp, _ in self._pending:
+            os.remove(tmp)
+        self._pending = []
+
+
+def swap_dataset(rebuilt, path):
+    """Replaces the dataset at `path` with a fully rebuilt copy written next to it."""
+    old = path + ".old"
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.isdir(path):
+        os.replace(path, old)
+    os.replace(rebuilt, path)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def load_table(name, columns=None, root=None, filters=None):
+    """Memory-mapped Arrow table of a module's dataset, partition columns included."""
+    return pq.read_table(
+        dataset_path(name, root), columns=columns, filters=filters, memory_map=True, partitioning=_PARTITIONING,
+    )
+
+
+def load_dataset(name, columns=None, root=None, filters=None):
+    """
+    The module's dataset as a DataFrame whose categorical columns use the persisted vocabularies, so their
+    cat.codes are the feature_schema codes whichever values a given export happened to contain.
+    """
+    path = dataset_path(name, root)
+    df = load_table(name, columns, root, filters).to_pandas()
+    with open(os.path.join(path, CATEGORIES_FILE)) as f:
+        vocabs = json.load(f)
+    for column, vocab in vocabs.items():
+        if column in df.columns:
+            df[column] = df[column].astype("category").cat.set_categories(vocab)
+    return df
+
+
+def dataset_rows(name, root=None):
+    path = dataset_path(name, root)
+    if not os.path.isdir(path):
+        return 0
+    return ds.dataset(path, format="parquet", partitioning=_PARTITIONING).count_rows()
@@ -0,0 +1,193 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import bson
+from bson.raw_bson import RawBSONDocument
+from pymongo.errors import AutoReconnect, BulkWriteError, ExecutionTimeout, WTimeoutError
+
+# pymongo is synchronous; async routes hand every call to this bounded pool so the event loop never blocks on Mongo
+MONGO_POOL_SIZE = int(os.getenv("MONGO_POOL_SIZE", min(32, (os.cpu_count() or 1) * 4)))
+_executor = ThreadPoolExecutor(max_workers=MONGO_POOL_SIZE, thread_name_prefix="mongo")
+# Write-behind inserts: documents per insert_many, longest a queued document waits, queue bound (backpressure)
+WRITE_BEHIND_BATCH = int(os.getenv("WRITE_BEHIND_BATCH", 500))
+WRITE_BEHIND_FLUSH_MS = float(os.getenv("WRITE_BEHIND_FLUSH_MS", 250))
+WRITE_BEHIND_QUEUE = int(os.getenv("WRITE_BEHIND_QUEUE", 10000))
+# Attempts per batch on transient errors (lost connection, failover, timeouts), backing off from the first delay
+WRITE_BEHIND_RETRIES = int(os.getenv("WRITE_BEHIND_RETRIES", 6))
+WRITE_BEHIND_BACKOFF_MS = float(os.getenv("WRITE_BEHIND_BACKOFF_MS", 500))
+# AutoReconnect covers NetworkTimeout, NotPrimaryError and ServerSelectionTimeoutError
+TRANSIENT_ERRORS = (AutoReconnect, ExecutionTimeout, WTimeoutError)
+
+
+async def run_db(fn, *args, **kwargs):
+    """Runs a blocking pymongo call (or any helper taking `db`) on the Mongo thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(fn, *args, **kwargs))
+
+
+class AsyncCollection:
+    """Awaitable wrappers around the pymongo collection methods used by the routes."""
+
+    def __init__(self, col):
+        self.sync = col
+
+    async def find_one(self, *args, **kwargs):
+        return await run_db(self.sync.find_one, *args, **kwargs)
+
+    async def find_list(self, filter=None, projection=None, sort=None, limit=0):
+        """Runs find() and materialises the cursor on the pool."""
+        def fetch():
+            cursor = self.sync.find(filter or {}, projection)
+            if sort:
+                cursor = cursor.sort(sort)
+            if limit:
+                cursor = cursor.limit(limit)
+            return list(cursor)
+        return await run_db(fetch)
+
+    async def insert_one(self, *args, **kwargs):
+        return await run_db(self.sync.insert_one, *args, **kwargs)
+
+    async def insert_many(self, *args, **kwargs):
+        return await run_db(self.sync.insert_many, *args, **kwargs)
+
+    async def update_one(self, *args, **kwargs):
+        return await run_db(self.sync.update_one, *args, **kwargs)
+
+    async def update_many(self, *args, **kwargs):
+        return await run_db(self.sync.update_many, *args, **kwargs)
+
+    async def delete_many(self, *args, **kwargs):
+        return await run_db(self.sync.delete_many, *args, **kwargs)
+
+    async def bulk_write(self, *args, **kwargs):
+        return await run_db(self.sync.bulk_write, *args, **kwargs)
+
+    async def count_documents(self, *args, **kwargs):
+        return await run_db(self.sync.count_documents, *args, **kwargs)
+
+
+class AsyncDatabase:
+    def __init__(self, db):
+        self.sync = db
+        self._cols = {}
+
+    def __getitem__(self, name):
+        if name not in self._cols:
+            self._cols[name] = AsyncCollection(self.sync[name])
+        return self._cols[name]
+
+
+class WriteBehind:
+    """
+    Queues inserts and writes them in the background, one unordered insert_many per collection per batch.
+    A batch goes out once WRITE_BEHIND_BATCH documents are waiting or WRITE_BEHIND_FLUSH_MS after its first one.
+    Documents are BSON-encoded when queued, so callers may keep changing their dicts afterwards. When the queue
+    is full, insert() waits for room instead of letting it grow; close() writes out everything still queued.
+    A batch that hits a transient error is retried with backoff (every document has its _id already, so a
+    retry after a partial write only re-sends duplicates, which are ignored); documents still not written after
+    WRITE_BEHIND_RETRIES attempts, or rejected outright, are dropped and counted in `dropped`.
+    """
+
+    def __init__(self, db, batch=None, flush_ms=None, max_queue=None, retries=None, backoff_ms=None):
+        self.db = db
+        self.batch = batch or WRITE_BEHIND_BATCH
+        self.flush_s = (flush_ms or WRITE_BEHIND_FLUSH_MS) / 1000
+        self.max_queue = max_queue or WRITE_BEHIND_QUEUE
+        self.retries = retries or WRITE_BEHIND_RETRIES
+        self.backoff_s = (backoff_ms or WRITE_BEHIND_BACKOFF_MS) / 1000
+        # {collection: documents dropped}, and batches that needed a retry
+        self.dropped = {}
+        self.retried = 0
+        self._queue = None
+        self._full = None
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._full = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def insert(self, collection, doc):
+        self.start()
+        if "_id" not in doc:
+            doc = {"_id": bson.ObjectId(), **doc}
+        await self._queue.put((collection, RawBSONDocument(bson.encode(doc))))
+        if self._queue.qsize() >= self.batch:
+            self._full.set()
+
+    async def _run(self):
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            batch, closing = [item], False
+            if self._queue.qsize() + 1 < self.batch:
+                self._full.clear()
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.flush_s)
+                except asyncio.TimeoutError:
+                    pass
+            while len(batch) < self.batch and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+            await self._write(batch)
+            if closing:
+                return
+
+    async def _write(self, batch):
+        groups = {}
+        for collection, doc in batch:
+            groups.setdefault(collection, []).append(doc)
+        for collection, docs in groups.items():
+            await self._insert(collection, docs)
+
+    async def _insert(self, collection, docs):
+        for attempt in range(1, self.retries + 1):
+            try:
+                await run_db(self.db[collection].insert_many, docs, ordered=False)
+                return
+            except BulkWriteError as e:
+                # Duplicate keys are expected for content-addressed documents (signal_store) and after a retry
+                failed = [err for err in e.details.get("writeErrors", []) if err.get("code") != 11000]
+                if failed:
+                    reason = f"{len(failed)} of {len(docs)} inserts failed: {failed[0].get('errmsg')}"
+                    self._drop(collection, len(failed), reason)
+                return
+            except TRANSIENT_ERRORS as e:
+                if attempt == self.retries:
+                    reason = f"insert of {len(docs)} documents failed after {attempt} attempts: {e}"
+                    self._drop(collection, len(docs), reason)
+                    return
+                delay = self.backoff_s * 2 ** (attempt - 1)
+                self.retried += 1
+                print(f"[WriteBehind] {collection}: {e}; retrying {len(docs)} documents in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            except Exception as e:
+                self._drop(collection, len(docs), f"insert of {len(docs)} documents failed: {e}")
+                return
+
+    def _drop(self, collection, count, reason):
+        self.dropped[collection] = self.dropped.get(collection, 0) + count
+        print(f"[WriteBehind] {collection}: {reason}; dropped {count} ({self.dropped[collection]} so far)")
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "retried_batches": self.retried,
+            "dropped": dict(self.dropped),
+        }
+
+    async def close(self):
+        """Flushes the queue and stops the writer (call on shutdown)."""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        self._full.set()
+        await self._task
+        self._task = None
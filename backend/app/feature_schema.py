@@ -0,0 +1,155 @@
+import math
+import numpy as np
+
+# Fixed categorical vocabularies. Codes are positions in these sorted lists, i.e. what pandas
+# astype('category').cat.codes assigned when every value showed up in the training CSV; missing or
+# unseen values encode as -1, also like cat.codes. Train and serve both go through encode_* below.
+PRICE_DIRECTION = ["down", "flat", "up"]
+PARTICIPANT = sorted(["Long Buildup", "Short Buildup", "Short Covering", "Long Unwinding", "Neutral / Noise"])
+BIAS = ["Bearish", "Bullish", "Sideways"]
+VOLATILITY_STATE = ["High", "Low", "Stable"]
+STYLE_MODE = ["adaptive", "strict"]
+MARKET_STYLE = sorted(["Trending Up", "Trending Down", "Sideways", "Volatile / Choppy", "Low Liquidity"])
+STRUCTURAL_CONTEXT = ["counter_trend", "trend_continuation"]
+VOLATILITY_PHASE = ["expanding", "normal"]
+ZONE_TYPE = ["Manual", "PDH", "PDL", "Round", "VWAP"]
+ZONE_STATE = ["Active", "Decaying", "Ignored"]
+VOLATILITY_REGIME = ["high", "normal"]
+BIAS_SUGGESTION = ["Bounce", "Break", "Trap"]
+ENTRY_DIRECTION = ["avoid", "long", "short"]
+TRADE_TYPE = ["breakout", "fade", "trend_follow"]
+ENTRY_CONFIDENCE = ["high", "low", "medium"]
+ZONE_CONFIDENCE = ["High", "Low", "Medium"]
+REVERSAL_TYPE = ["bearish", "bullish"]
+FLAG = [False, True]
+TRUE_STYLE = ["Sideways", "Trending", "Volatile"]
+TRUE_OUTCOME = ["Bounce", "Break", "Other", "Trap"]
+TRAP_LEG = ["call", "put"]
+
+# Per-model (column, vocabulary) in the order the training scripts build X; vocabulary None = numeric.
+# spot_delta comes from the labelling lookahead in most exports, so it is unknown when serving and
+# scored as missing (NaN); the bias export stores the snapshot spot in it instead.
+SCHEMAS = {
+    "bias": [
+        ("ce_oi_pct", None), ("ce_iv_pct", None), ("ce_vol_pct", None),
+        ("pe_oi_pct", None), ("pe_iv_pct", None), ("pe_vol_pct", None),
+        ("spot_delta", None), ("price_direction", PRICE_DIRECTION),
+        ("call_participant", PARTICIPANT), ("put_participant", PARTICIPANT), ("bias", BIAS),
+    ],
+    "market_style": [
+        ("oi_diff", None), ("vol_diff", None), ("iv_diff", None),
+        ("price_direction", PRICE_DIRECTION), ("volatility_state", VOLATILITY_STATE),
+        ("spot_trend_strength", None), ("total_volume", None), ("total_oi", None), ("mode", STYLE_MODE),
+    ],
+    "reversal": [
+        ("bias_cluster_flipped", None), ("iv_oi_support_flip", None), ("price_vs_bias_conflict", None),
+        ("liquidity_ok", None), ("structural_context", STRUCTURAL_CONTEXT), ("volatility_phase", VOLATILITY_PHASE),
+        ("market_style", MARKET_STYLE), ("trap_detected", None), ("reversal_probability", None), ("spot_delta", None),
+    ],
+    "sr": [
+        ("zone_type", ZONE_TYPE), ("zone_state", ZONE_STATE), ("confidence_score", None),
+        ("volatility_regime", VOLATILITY_REGIME), ("trap_risk", None), ("bias_suggestion", BIAS_SUGGESTION),
+        ("signal_disagreement", None), ("spot_delta", None),
+    ],
+    "trap": [
+        ("deception_score", None), ("trap_memory", None), ("spot_delta", None), ("trap_detected", FLAG),
+    ],
+    "entry_logic": [
+        ("entry_direction", ENTRY_DIRECTION), ("trade_type", TRADE_TYPE), ("entry_score", None),
+        ("confidence", ENTRY_CONFIDENCE), ("must_avoid", None), ("zone_type", ZONE_TYPE),
+        ("zone_confidence", ZONE_CONFIDENCE), ("spot_delta", None),
+    ],
+    "meta": [
+        ("entry_score", None), ("confidence", ENTRY_CONFIDENCE), ("anomaly_score", None), ("bias", BIAS),
+        ("market_style", MARKET_STYLE), ("trap_call", FLAG), ("reversal_type", REVERSAL_TYPE),
+        ("sr_confidence", ZONE_CONFIDENCE),
+    ],
+    "anomaly": [
+        ("ce_oi", None), ("ce_iv", None), ("ce_vol", None), ("pe_oi", None), ("pe_iv", None), ("pe_vol", None),
+        ("spot_delta", None), ("style_enc", None), ("sr_prox", None), ("trap_mem", None), ("bias_conf", None),
+        ("trap_conf", None), ("reversal_conf", None), ("sr_conf", None), ("entry_conf", None), ("tod", None),
+    ],
+}
+
+
+# Per-model training target: (column, class vocabulary); None = already a 0/1 integer.
+# Class order is the predict_proba column order ml_inference reports.
+LABELS = {
+    "bias": ("true_direction", BIAS),
+    "market_style": ("true_style", TRUE_STYLE),
+    "reversal": ("true_reversal", None),
+    "sr": ("true_outcome", TRUE_OUTCOME),
+    "trap": ("true_trap", None),
+    "entry_logic": ("correct", None),
+    "meta": ("entry_worked", None),
+}
+
+
+def feature_names(model):
+    return [name for name, _ in SCHEMAS[model]]
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def encode_value(value, vocab):
+    if vocab is not None:
+        if _is_missing(value):
+            return -1.0
+        # CSV round-trips turn booleans into strings
+        if vocab is FLAG and isinstance(value, str):
+            value = value == "True"
+        try:
+            return float(vocab.index(value))
+        except ValueError:
+            return -1.0
+    if _is_missing(value):
+        return np.nan
+    if isinstance(value, str):
+        if value in ("True", "False"):
+            return float(value == "True")
+        try:
+            return float(value)
+        except ValueError:
+            return np.nan
+    return float(value)
+
+
+def encode_row(model, values):
+    """float32 feature vector for one `{column: value}` dict, in schema order."""
+    return np.array([encode_value(values.get(name), vocab) for name, vocab in SCHEMAS[model]], dtype=np.float32)
+
+
+def encode_rows(model, rows):
+    if not rows:
+        return np.empty((0, len(SCHEMAS[model])), dtype=np.float32)
+    return np.vstack([encode_row(model, row) for row in rows])
+
+
+def _encode_column(series, vocab):
+    # Categorical columns read back from the Parquet datasets already carry the vocabulary: use their codes
+    if vocab is not None and series.dtype.name == "category" and list(series.cat.categories) == vocab:
+        return series.cat.codes.to_numpy(dtype=np.float32)
+    if vocab is None and series.dtype.kind in "biuf":
+        return series.to_numpy(dtype=np.float32, na_value=np.nan)
+    return np.array([encode_value(v, vocab) for v in series.tolist()], dtype=np.float32)
+
+
+def encode_frame(df, model):
+    """Training-side counterpart of encode_rows: the schema columns of a DataFrame as a float32 matrix."""
+    X = np.full((len(df), len(SCHEMAS[model])), np.nan, dtype=np.float32)
+    for i, (name, vocab) in enumerate(SCHEMAS[model]):
+        if name in df.columns:
+            X[:, i] = _encode_column(df[name], vocab)
+        elif vocab is not None:
+            X[:, i] = -1.0
+    return X
+
+
+def encode_labels(df, model):
+    """Training target as stable integer class codes (positions in the LABELS vocabulary)."""
+    column, vocab = LABELS[model]
+    if vocab is None:
+        return df[column].to_numpy(dtype=np.int64)
+    return _encode_column(df[column], vocab).astype(np.int64)
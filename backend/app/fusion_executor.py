@@ -0,0 +1,91 @@
+"""
+Concurrent fan-out of the signal modules fused by the Entry Logic Engine.
+
+Every module starts at once as its own task and gets min(its timeout, the overall budget) to finish. A module
+that fails or misses its deadline is replaced by its last-known-good result for that user/expiry/mode (if it is
+recent enough), so the decision comes out on time with the slow module's previous signal. Late modules are not
+cancelled: they usually run inside the shared tick pipeline, and when they finish their result becomes the
+last-known-good for the next decision.
+"""
+import asyncio
+import os
+import time
+import traceback
+
+# Wall-clock budget of one fan-out, and the default deadline of each module within it
+FUSION_BUDGET_MS = float(os.getenv("FUSION_BUDGET_MS", 2000))
+FUSION_MODULE_TIMEOUT_MS = float(os.getenv("FUSION_MODULE_TIMEOUT_MS", 1500))
+# Last-known-good results older than this are not used as a fallback
+FUSION_MAX_STALE_SECONDS = float(os.getenv("FUSION_MAX_STALE_SECONDS", 60))
+
+
+def module_timeout_ms(name):
+    # Per-module override, e.g. FUSION_TIMEOUT_MS_SR=1000
+    return float(os.getenv(f"FUSION_TIMEOUT_MS_{name.upper()}", FUSION_MODULE_TIMEOUT_MS))
+
+
+class FusionExecutor:
+    """
+    Runs `modules`, a list of (name, label, fn(user, expiry, mode)) resolved once, concurrently.
+    run() returns ({name: result or None}, {name: report}); a report has the module's status ("ok", "error",
+    "timeout"), latency_ms, and for failures the error and whether a last-known-good result was used instead.
+    """
+
+    def __init__(self, modules, budget_ms=None):
+        self.modules = modules
+        self.budget_ms = budget_ms or FUSION_BUDGET_MS
+        self.timeouts_ms = {name: min(module_timeout_ms(name), self.budget_ms) for name, _, _ in modules}
+        # {(user, expiry, mode, name): (result, monotonic time it completed)}
+        self._last_good = {}
+
+    def _remember(self, key, task):
+        if task.cancelled() or task.exception() is not None:
+            return
+        self._last_good[key] = (task.result(), time.monotonic())
+
+    def last_good(self, key):
+        entry = self._last_good.get(key)
+        if entry is None or time.monotonic() - entry[1] > FUSION_MAX_STALE_SECONDS:
+            return None, None
+        return entry[0], time.monotonic() - entry[1]
+
+    async def run(self, user, expiry, mode):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        tasks, completed = {}, {}
+
+        def on_done(name, task):
+            completed[name] = loop.time()
+            self._remember((user, expiry, mode, name), task)
+
+        for name, _, fn in self.modules:
+            task = asyncio.ensure_future(fn(user, expiry, mode))
+            task.add_done_callback(lambda t, name=name: on_done(name, t))
+            tasks[name] = task
+        # Wait in deadline order; every module keeps running while we wait on another
+        for name in sorted(tasks, key=self.timeouts_ms.get):
+            remaining = start + self.timeouts_ms[name] / 1000 - loop.time()
+            if not tasks[name].done() and remaining > 0:
+                await asyncio.wait([tasks[name]], timeout=remaining)
+
+        results, reports = {}, {}
+        for name, label, _ in self.modules:
+            task = tasks[name]
+            latency = (completed.get(name, loop.time()) - start) * 1000
+            report = {"module": label, "latency_ms": round(latency, 1)}
+            if task.done() and not task.cancelled() and task.exception() is None:
+                results[name] = task.result()
+                report["status"] = "ok"
+            else:
+                if task.done():
+                    error = asyncio.CancelledError() if task.cancelled() else task.exception()
+                    report.update(status="error", error=str(error), trace="".join(
+                        traceback.format_exception(type(error), error, error.__traceback__)
+                    ))
+                else:
+                    report.update(status="timeout", error=f"no result within {self.timeouts_ms[name]:.0f} ms")
+                result, age = self.last_good((user, expiry, mode, name))
+                results[name] = result
+                report["fallback"] = None if age is None else {"last_known_good_age_s": round(age, 1)}
+            reports[name] = report
+        return results, reports
@@ -0,0 +1,85 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from .feature_schema import encode_row
+from .ml_inference import predict_batch, anomaly_scores, meta_decisions
+
+# Requests for the same model arriving within this window are scored in one predict_proba call
+INFERENCE_BATCH_WINDOW_MS = float(os.getenv("INFERENCE_BATCH_WINDOW_MS", 2))
+INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", 64))
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", 2))
+
+_executor = ThreadPoolExecutor(max_workers=INFERENCE_THREADS, thread_name_prefix="inference")
+
+
+def _score_matrix(model, X):
+    if model == "anomaly":
+        return anomaly_scores(X)
+    if model == "meta":
+        return meta_decisions(X)
+    return predict_batch(model, X)
+
+
+class MicroBatcher:
+    """Collects encoded rows for one model across users/requests and scores them together off the event loop."""
+
+    def __init__(self, model):
+        self.model = model
+        self._pending = []
+        self._timer = None
+
+    async def submit(self, rows):
+        """Queues float32 rows; resolves to their results in order. Errors (e.g. missing model) propagate to every caller of the batch."""
+        loop = asyncio.get_running_loop()
+        futures = []
+        for row in rows:
+            fut = loop.create_future()
+            self._pending.append((row, fut))
+            futures.append(fut)
+        if len(self._pending) >= INFERENCE_MAX_BATCH:
+            self._flush_now()
+        elif self._timer is None:
+            self._timer = loop.call_later(INFERENCE_BATCH_WINDOW_MS / 1000, self._flush_now)
+        return list(await asyncio.gather(*futures))
+
+    def _flush_now(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._score(batch))
+
+    async def _score(self, batch):
+        X = np.vstack([row for row, _ in batch])
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(_executor, _score_matrix, self.model, X)
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_, fut), result in zip(batch, results):
+            if not fut.done():
+                fut.set_result(result)
+
+
+_batchers = {}
+
+
+def _batcher(model):
+    if model not in _batchers:
+        _batchers[model] = MicroBatcher(model)
+    return _batchers[model]
+
+
+async def score(model, values):
+    """Scores one `{column: value}` feature dict (see feature_schema.SCHEMAS) through the model's micro-batcher."""
+    return (await score_many(model, [values]))[0]
+
+
+async def score_many(model, rows):
+    if not rows:
+        return []
+    return await _batcher(model).submit([encode_row(model, row) for row in rows])
@@ -1,116 +1,227 @@
 import os
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 from pymongo import MongoClient
-import pandas as pd
+import numpy as np
 import joblib
 from sklearn.ensemble import RandomForestClassifier
 from fastapi import FastAPI
+from model_registry import publish_model
 
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
 client = MongoClient(MONGO_URI)
 db = client["samarth"]
 
+# The loop trains on FEATURE_MAP (raw snapshot fields, 0/1 outcome), not on the feature_schema encoding the API
+# serves, so its models are published under their own registry names and never replace a served model
+LEARNING_MODEL_DIR = os.getenv("LEARNING_MODEL_DIR", "ml_models/learning_loop")
 MODEL_PATHS = {
-    'bias': 'ml_models/bias_identifier_model.pkl',
-    'market_style': 'ml_models/market_style_model.pkl',
-    'trap': 'ml_models/trap_detector_model.pkl',
-    'reversal': 'ml_models/reversal_probability_model.pkl',
-    'sr': 'ml_models/support_resistance_model.pkl',
-    'entry_logic': 'ml_models/entry_logic_model.pkl',
+    module: os.path.join(LEARNING_MODEL_DIR, f"{module}_model.pkl")
+    for module in ['bias', 'market_style', 'trap', 'reversal', 'sr', 'entry_logic']
 }
 
 MODEL_RETRAIN_LOG = "model_retrain_log"
+LEARNING_STATE_COLL = "learning_state"
 
-def fetch_labeled_data(collection, feature_keys, label_key='outcome'):
-    docs = list(db[collection].find({label_key: {"$exists": True}}))
-    if not docs:
-        return None, None
-    df = pd.DataFrame(docs)
-    # Flatten nested fields if needed
-    for k in feature_keys:
-        if '.' in k:
-            parts = k.split('.')
-            df[k] = df
-            for p in parts:
-                df[k] = df[k].apply(lambda x: x.get(p) if isinstance(x, dict) else None)
-    X = df[feature_keys].values
-    y = df[label_key].values
-    return X, y
+# "incremental" (warm-start on newly labeled snapshots) or "full" (refit on the whole history every run)
+RETRAIN_MODE = os.getenv("LEARNING_RETRAIN_MODE", "incremental")
+TREES_PER_UPDATE = int(os.getenv("LEARNING_TREES_PER_UPDATE", 10))
+MAX_TREES = int(os.getenv("LEARNING_MAX_TREES", 200))
+MIN_NEW_SAMPLES = int(os.getenv("LEARNING_MIN_NEW_SAMPLES", 100))
+# Only train on snapshots at least this old, so the outcome labeler has finished with them
+SETTLE_MINUTES = int(os.getenv("LEARNING_SETTLE_MINUTES", 30))
+
+# Features for each module (adjust as needed)
+FEATURE_MAP = {
+    'bias': ['rolling_pct.call_oi', 'rolling_pct.call_iv', 'rolling_pct.call_volume',
+             'rolling_pct.put_oi', 'rolling_pct.put_iv', 'rolling_pct.put_volume'],
+    'market_style': ['oi_diff', 'vol_diff', 'iv_diff', 'spot_trend_strength'],
+    'trap': ['call.deception_score', 'put.deception_score'],
+    'reversal': ['reversal_probability'],
+    'sr': ['zones.0.confidence_score'],
+    'entry_logic': ['entry_score'],
+}
+
+# --- Feature extraction (aggregation pipeline: only the feature values leave the server) ---
+def field_expression(key):
+    """
+    Aggregation expression for a dotted feature key. Numeric parts index into arrays, e.g. zones.0.confidence_score
+    becomes the confidence_score of {$arrayElemAt: ["$zones", 0]}.
+    """
+    expr, path = None, []
+    for part in key.split("."):
+        if part.isdigit():
+            base = "$" + ".".join(path) if expr is None else _field_of(expr, path)
+            expr, path = {"$arrayElemAt": [base, int(part)]}, []
+        else:
+            path.append(part)
+    if expr is None:
+        return "$" + ".".join(path)
+    return _field_of(expr, path) if path else expr
+
+def _field_of(expr, path):
+    if not path:
+        return expr
+    return {"$let": {"vars": {"v": expr}, "in": "$$v." + ".".join(path)}}
+
+def _as_double(expr):
+    # Missing or non-numeric values come back as null, i.e. NaN in the float columns
+    return {"$convert": {"input": expr, "to": "double", "onError": None, "onNull": None}}
+
+def fetch_feature_columns(collection, feature_keys, label_key='outcome', since=None, until=None):
+    """
+    Labeled snapshots with timestamp in (since, until], oldest first, as columns: {"timestamp": [...],
+    label_key: ndarray, feature key: float ndarray}. The pipeline projects each feature key server-side, so only
+    the feature values, the label and the timestamp are transferred and nothing is flattened in Python.
+    """
+    match = {label_key: {"$exists": True}}
+    ts_range = {}
+    if since is not None:
+        ts_range["$gt"] = since
+    if until is not None:
+        ts_range["$lte"] = until
+    if ts_range:
+        match["timestamp"] = ts_range
+    names = [f"f{i}" for i in range(len(feature_keys))]
+    project = {"_id": 0, "t": "$timestamp", "y": f"${label_key}"}
+    project.update((name, _as_double(field_expression(k))) for name, k in zip(names, feature_keys))
+    pipeline = [{"$match": match}, {"$sort": {"timestamp": 1}}, {"$project": project}]
+    rows = {name: [] for name in ["t", "y", *names]}
+    for doc in db[collection].aggregate(pipeline, allowDiskUse=True, batchSize=5000):
+        for name, values in rows.items():
+            values.append(doc.get(name))
+    columns = {"timestamp": rows["t"], label_key: np.array(rows["y"])}
+    columns.update((k, np.array(rows[name], dtype=np.float64)) for name, k in zip(names, feature_keys))
+    return columns
+
+def fetch_labeled_data(collection, feature_keys, label_key='outcome', since=None, until=None):
+    """(X, y, timestamp of the newest row) for fetch_feature_columns, or (None, None, None) when there are none."""
+    columns = fetch_feature_columns(collection, feature_keys, label_key, since, until)
+    if not columns["timestamp"]:
+        return None, None, None
+    X = np.column_stack([columns[k] for k in feature_keys])
+    return X, columns[label_key], columns["timestamp"][-1]
 
 # --- Log retrain event ---
-def log_retrain_event(module, accuracy, sample_count, feature_importances=None, error=None):
+def log_retrain_event(module, accuracy, sample_count, feature_importances=None, error=None, mode=None, version=None):
     db[MODEL_RETRAIN_LOG].insert_one({
         "module": module,
         "timestamp": datetime.utcnow(),
+        "mode": mode,
+        "version": version,
         "accuracy": accuracy,
         "sample_count": sample_count,
         "feature_importances": feature_importances,
         "error": error
     })
 
-# --- Modified retrain_classifier to log events ---
-def retrain_classifier(module, feature_keys):
+# --- Training state: {_id: module, watermark: newest snapshot trained on, features: feature keys of the model} ---
+def get_learning_state(module):
+    return db[LEARNING_STATE_COLL].find_one({"_id": module})
+
+def set_learning_state(module, watermark, feature_keys):
+    db[LEARNING_STATE_COLL].update_one(
+        {"_id": module},
+        {"$set": {"watermark": watermark, "features": list(feature_keys), "updated_at": datetime.utcnow()}},
+        upsert=True,
+    )
+
+def retrain_classifier(module, feature_keys, mode=None):
+    """
+    Incremental mode (default) grows the saved forest with trees fitted on the snapshots labeled since the last
+    run; a full retrain happens on the first run, when the features or classes changed, or with mode="full".
+    """
+    mode = mode or RETRAIN_MODE
+    state = get_learning_state(module)
+    if (mode == "incremental" and state and state.get("features") == list(feature_keys)
+            and os.path.exists(MODEL_PATHS[module])):
+        if update_classifier(module, feature_keys, state["watermark"]):
+            return
+    full_retrain(module, feature_keys)
+
+def full_retrain(module, feature_keys):
     print(f"Retraining {module} classifier...")
-    X, y = fetch_labeled_data(f"{module}_snapshots", feature_keys)
+    X, y, newest = fetch_labeled_data(f"{module}_snapshots", feature_keys, until=_settled_until())
     if X is None or len(X) < 100:
         print(f"Not enough data for {module}. Skipping.")
-        log_retrain_event(module, accuracy=None, sample_count=0, error="Not enough data")
+        log_retrain_event(module, accuracy=None, sample_count=0, error="Not enough data", mode="full")
         return
     clf = RandomForestClassifier(n_estimators=50, n_jobs=-1)
     clf.fit(X, y)
-    joblib.dump(clf, MODEL_PATHS[module])
     # Score
     acc = clf.score(X, y)
+    version = publish_model(clf, MODEL_PATHS[module], module=module, source="learning_loop", mode="full", accuracy=acc)
     # Feature importances
     importances = clf.feature_importances_.tolist()
-    log_retrain_event(module, accuracy=acc, sample_count=len(y), feature_importances=importances)
-    print(f"Saved new model for {module} at {MODEL_PATHS[module]}")
+    log_retrain_event(module, accuracy=acc, sample_count=len(y), feature_importances=importances, mode="full", version=version)
+    set_learning_state(module, newest, feature_keys)
+    print(f"Saved new model for {module} at {MODEL_PATHS[module]} (version {version})")
+
+def update_classifier(module, feature_keys, watermark):
+    """
+    Warm-starts the saved forest on the snapshots labeled after `watermark`: LEARNING_TREES_PER_UPDATE new
+    trees are fitted on the new rows only and the oldest trees beyond LEARNING_MAX_TREES are dropped, so the
+    cost follows the new data and the forest tracks the most recent history. Returns False when the update
+    needs a full retrain instead (new batch does not have the model's classes).
+    """
+    X, y, newest = fetch_labeled_data(f"{module}_snapshots", feature_keys, since=watermark, until=_settled_until())
+    if X is None or len(X) < MIN_NEW_SAMPLES:
+        # Leave the watermark so the rows accumulate into the next update
+        print(f"{0 if X is None else len(X)} new labeled samples for {module}; waiting for {MIN_NEW_SAMPLES}.")
+        return True
+    clf = joblib.load(MODEL_PATHS[module])
+    if set(np.unique(y)) != set(clf.classes_):
+        print(f"New {module} samples do not cover the model's classes; falling back to a full retrain.")
+        return False
+    print(f"Updating {module} classifier with {len(y)} new samples...")
+    # Prequential accuracy: the current model on rows it has not seen yet
+    acc = clf.score(X, y)
+    clf.set_params(warm_start=True, n_estimators=len(clf.estimators_) + TREES_PER_UPDATE, n_jobs=-1)
+    clf.fit(X, y)
+    if len(clf.estimators_) > MAX_TREES:
+        clf.estimators_ = clf.estimators_[-MAX_TREES:]
+        clf.set_params(n_estimators=MAX_TREES)
+    version = publish_model(
+        clf, MODEL_PATHS[module], module=module, source="learning_loop", mode="incremental", accuracy=acc,
+    )
+    importances = clf.feature_importances_.tolist()
+    log_retrain_event(
+        module, accuracy=acc, sample_count=len(y), feature_importances=importances, mode="incremental", version=version,
+    )
+    set_learning_state(module, newest, feature_keys)
+    print(f"Saved updated model for {module} at {MODEL_PATHS[module]} ({len(clf.estimators_)} trees, version {version})")
+    return True
+
+def _settled_until():
+    # Snapshots younger than this may still be waiting for the outcome labeler
+    return datetime.utcnow() - timedelta(minutes=SETTLE_MINUTES)
 
 def score_signals(module):
-    docs = list(db[f"{module}_snapshots"].find({"outcome": {"$exists": True}}))
-    if not docs:
+    stats = list(db[f"{module}_snapshots"].aggregate([
+        {"$match": {"outcome": {"$exists": True}}},
+        {"$group": {"_id": None, "accuracy": {"$avg": "$outcome"}, "samples": {"$sum": 1}}},
+    ]))
+    if not stats or stats[0]["accuracy"] is None:
         print(f"No labeled data for {module}")
         return
-    df = pd.DataFrame(docs)
-    acc = df['outcome'].mean()
-    print(f"{module} accuracy: {acc:.2%} ({len(df)} samples)")
+    print(f"{module} accuracy: {stats[0]['accuracy']:.2%} ({stats[0]['samples']} samples)")
 
 # --- FastAPI endpoint for manual retrain ---
 app = FastAPI()
 
 @app.post("/retrain-module")
-def retrain_module(module: str):
-    feature_map = {
-        'bias': ['rolling_pct.call_oi', 'rolling_pct.call_iv', 'rolling_pct.call_volume',
-                 'rolling_pct.put_oi', 'rolling_pct.put_iv', 'rolling_pct.put_volume'],
-        'market_style': ['oi_diff', 'vol_diff', 'iv_diff', 'spot_trend_strength'],
-        'trap': ['call.deception_score', 'put.deception_score'],
-        'reversal': ['reversal_probability'],
-        'sr': ['zones.0.confidence_score'],
-        'entry_logic': ['entry_score'],
-    }
-    if module not in feature_map:
+def retrain_module(module: str, full: bool = False):
+    if module not in FEATURE_MAP:
         return {"error": "Unknown module"}
     try:
-        retrain_classifier(module, feature_map[module])
+        retrain_classifier(module, FEATURE_MAP[module], mode="full" if full else None)
         return {"status": f"Retrained {module} successfully."}
     except Exception as e:
         log_retrain_event(module, accuracy=None, sample_count=0, error=str(e))
         return {"error": str(e)}
 
 def learning_loop():
-    # Define features for each module (adjust as needed)
-    feature_map = {
-        'bias': ['rolling_pct.call_oi', 'rolling_pct.call_iv', 'rolling_pct.call_volume',
-                 'rolling_pct.put_oi', 'rolling_pct.put_iv', 'rolling_pct.put_volume'],
-        'market_style': ['oi_diff', 'vol_diff', 'iv_diff', 'spot_trend_strength'],
-        'trap': ['call.deception_score', 'put.deception_score'],
-        'reversal': ['reversal_probability'],
-        'sr': ['zones.0.confidence_score'],
-        'entry_logic': ['entry_score'],
-    }
-    for module, features in feature_map.items():
+    for module, features in FEATURE_MAP.items():
         score_signals(module)
         retrain_classifier(module, features)
     print(f"Learning loop completed at {datetime.now()}")
@@ -1,5 +1,7 @@
 import os
 from fastapi import FastAPI, Query, HTTPException, Request, Body, Response, BackgroundTasks
+from fastapi.responses import StreamingResponse
+import asyncio
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from dotenv import load_dotenv
@@ -11,12 +13,32 @@ from pytz import timezone
 from collections import deque
 import numpy as np
 from fastapi import status
-import traceback
 from dateutil import parser
 from fastapi.staticfiles import StaticFiles
 import joblib
-from .ml_inference import (
-    predict_bias, predict_market_style, predict_trap, predict_reversal, predict_sr, predict_entry_logic, predict_anomaly_score, predict_meta_decision
+from .ml_inference import preload_models, model_versions, rejected_model_versions
+from .model_registry import start_watcher
+from .inference_server import score, score_many
+from .feature_schema import feature_names
+from .upstox_client import UPSTOX_BASE_URL, start_client, close_client, fetch_option_chain, exchange_auth_code
+from .chain_poller import subscribe, unsubscribe, stop_pollers, active_pollers
+from .outcome_labeler import start_labeler
+from .tick_pipeline import begin_tick, current_tick, clear_ticks
+from .db_access import AsyncDatabase, WriteBehind, MONGO_POOL_SIZE, run_db
+from .window_engine import (
+    WINDOW_POINTS, get_window, create_window, get_spot_ring, create_spot_ring, drop_spot_ring,
+    get_lookback, create_lookback, drop_lookback, to_epoch, ema, slope, value_range, delta_vs_avg, rising_iv_falling_volume
+)
+from .chain_store import (
+    ensure_chain_history, ensure_chain_aggregates, append_tick, build_tick_aggregate, append_aggregate,
+    recent_aggregates, latest_aggregate, push_spot, load_spots,
+    save_rolling_checkpoint, load_rolling_checkpoint
+)
+from .fusion_executor import FusionExecutor
+from .signal_store import SIGNALS_COLL, signal_document
+from .bar_store import (
+    ensure_bar_store, record_tick, load_session, load_previous_session, session_date, SessionStats,
+    get_session, set_session, get_previous, set_previous, tick_volume
 )
 import threading
 import time
@@ -36,10 +58,59 @@ app.add_middleware(
 
 # MongoDB setup
 MONGO_URI = os.getenv("MONGO_URI")
-client = MongoClient(MONGO_URI)
+client = MongoClient(MONGO_URI, maxPoolSize=MONGO_POOL_SIZE)
 db = client["samarth"]
+# Async routes go through adb (thread-pool backed) instead of blocking the event loop on pymongo
+adb = AsyncDatabase(db)
+# Per-tick snapshots and audit logs are batched off the request path (see db_access.WriteBehind)
+audit_writer = WriteBehind(db)
 tokens_col = db["tokens"]
 
+@app.on_event("startup")
+def init_collections():
+    ensure_chain_history(db)
+    ensure_chain_aggregates(db)
+    ensure_bar_store(db)
+
+# Outcome of the startup model load; status stays None until every model has been attempted
+model_load = {"status": None, "seconds": None}
+
+def _load_models():
+    t0 = time.perf_counter()
+    status = preload_models()
+    for module, error in status.items():
+        if error:
+            print(f"[ML] {module} model not loaded: {error}")
+    model_load.update(status=status, seconds=round(time.perf_counter() - t0, 3))
+    print(f"[ML] Models loaded in {model_load['seconds']}s")
+    # Newly published versions (train_*.py) are swapped in without a restart
+    start_watcher()
+
+@app.on_event("startup")
+def load_models():
+    # Keep every model resident from the start instead of loading on the first request that needs it; the load
+    # runs in the background so the app can answer /ready (503 until it finishes) right away
+    threading.Thread(target=_load_models, name="model-preload", daemon=True).start()
+
+@app.on_event("startup")
+async def init_upstox_client():
+    # One pooled keep-alive client for the app lifetime instead of a TCP+TLS handshake per fetch
+    await start_client()
+
+@app.on_event("startup")
+async def start_audit_writer():
+    audit_writer.start()
+
+@app.on_event("shutdown")
+async def shutdown_upstox_client():
+    stop_pollers()
+    await close_client()
+
+@app.on_event("shutdown")
+async def flush_audit_writer():
+    # After the pollers stop, so their last snapshots are written too
+    await audit_writer.close()
+
 # Upstox OAuth endpoints
 @app.get("/auth-url")
 def get_auth_url(user: str = Query(..., enum=["emperor", "king"])):
@@ -50,7 +121,7 @@ def get_auth_url(user: str = Query(..., enum=["emperor", "king"])):
         api_key = os.getenv("UPSTOX_KING_API_KEY")
         redirect_uri = os.getenv("UPSTOX_KING_REDIRECT_URI")
     
-    base_url = "https://api.upstox.com/v2/login/authorization/dialog"
+    base_url = f"{UPSTOX_BASE_URL}/v2/login/authorization/dialog"
     auth_url = f"{base_url}?response_type=code&client_id={api_key}&redirect_uri={redirect_uri}&state=xyz"
     return {"auth_url": auth_url}
 
@@ -69,7 +140,6 @@ async def generate_token(req: TokenRequest):
         api_secret = os.getenv("UPSTOX_KING_API_SECRET")
         redirect_uri = os.getenv("UPSTOX_KING_REDIRECT_URI")
 
-    token_url = "https://api.upstox.com/v2/login/authorization/token"
     payload = {
         "code": req.code,
         "client_id": api_key,
@@ -77,8 +147,10 @@ async def generate_token(req: TokenRequest):
         "redirect_uri": redirect_uri,
         "grant_type": "authorization_code"
     }
-    async with httpx.AsyncClient() as client:
-        response = await client.post(token_url, data=payload)
+    try:
+        response = await exchange_auth_code(payload)
+    except httpx.HTTPError:
+        raise HTTPException(status_code=400, detail="Failed to get access token from Upstox.")
     if response.status_code != 200:
         raise HTTPException(status_code=400, detail="Failed to get access token from Upstox.")
     data = response.json()
@@ -86,9 +158,9 @@ async def generate_token(req: TokenRequest):
     if not access_token:
         raise HTTPException(status_code=400, detail="No access token in response.")
     # Remove any previous token for this user
-    tokens_col.delete_many({"user": req.user})
+    await adb["tokens"].delete_many({"user": req.user})
     # Store in DB with expiry (24 hours from now)
-    tokens_col.insert_one({
+    await adb["tokens"].insert_one({
         "user": req.user,
         "access_token": access_token,
         "created_at": datetime.utcnow(),
@@ -107,24 +179,20 @@ def check_token(user: str):
 
 @app.get("/option-chain")
 async def get_option_chain(user: str, expiry: str, request: Request):
+    return await ingest_option_chain(user, expiry)
+
+async def ingest_option_chain(user, expiry):
     # Get access token from DB
-    token_doc = tokens_col.find_one({"user": user})
+    token_doc = await adb["tokens"].find_one({"user": user})
     if not token_doc or not token_doc.get("access_token"):
         raise HTTPException(status_code=401, detail="No access token found. Please login again.")
     access_token = token_doc["access_token"]
 
-    # Fetch option chain from Upstox
-    url = "https://api.upstox.com/v2/option/chain"
-    params = {
-        "instrument_key": "NSE_INDEX|Nifty 50",
-        "expiry_date": expiry
-    }
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Accept": "application/json"
-    }
-    async with httpx.AsyncClient() as client:
-        response = await client.get(url, params=params, headers=headers)
+    # Fetch option chain from Upstox (shared pooled client, retried with backoff)
+    try:
+        response = await fetch_option_chain(access_token, expiry)
+    except httpx.HTTPError:
+        raise HTTPException(status_code=400, detail="Failed to fetch option chain from Upstox.")
     if response.status_code != 200:
         raise HTTPException(status_code=400, detail="Failed to fetch option chain from Upstox.")
     data = response.json()
@@ -165,33 +233,44 @@ async def get_option_chain(user: str, expiry: str, request: Request):
             if f"put_{field}" not in strike:
                 strike[f"put_{field}"] = "-"
         strikes.append(strike)
+    spot = strikes[0].get("underlying_spot_price") if strikes else None
+    atm_strike = annotate_option_zones(strikes, spot) if spot is not None else None
 
     # Store snapshot in DB (overwrite previous for user+expiry)
-    db["option_chain_snapshots"].update_one(
+    tick_ts = datetime.utcnow()
+    await adb["option_chain_snapshots"].update_one(
         {"user": user, "expiry": expiry},
         {"$set": {
-            "timestamp": datetime.utcnow(),
+            "timestamp": tick_ts,
             "strikes": strikes
         }},
         upsert=True
     )
+    # Append to the time-series history used for windowed reads and outcome lookups
+    await run_db(append_tick, db, user, expiry, tick_ts, spot, strikes)
+    # Compact leg totals for this tick; the signal modules read these instead of re-summing strikes
+    aggregate = None
+    if spot is not None:
+        aggregate = build_tick_aggregate(user, expiry, tick_ts, spot, atm_strike, strikes)
+        await run_db(append_aggregate, db, aggregate)
+        (await series_window(user, expiry)).append(aggregate)
+        (await spot_ring(user, expiry)).append(spot)
+        await run_db(push_spot, db, user, expiry, spot, WINDOW_POINTS)
+        # Intraday bars and the running session (PDH/PDL, VWAP) of the underlying
+        if aggregate["underlying"]:
+            volume = tick_volume(user, expiry, aggregate["calls"]["volume"] + aggregate["puts"]["volume"])
+            (await session_stats(aggregate["underlying"], session_date(tick_ts))).add(spot, volume)
+            await run_db(record_tick, db, aggregate["underlying"], tick_ts, spot, volume)
+    # New tick: signal modules computed from here on are shared until the next fetch
+    begin_tick(user, expiry, tick_ts, aggregate)
     return {"strikes": strikes} 
 
-@app.get("/bias-identifier")
-async def bias_identifier(user: str, expiry: str):
-    # Fetch latest option chain snapshot for user+expiry
-    doc = db["option_chain_snapshots"].find_one({"user": user, "expiry": expiry}, sort=[("timestamp", -1)])
-    if not doc or not doc.get("strikes"):
-        raise HTTPException(status_code=404, detail="No option chain data found for user/expiry.")
-    strikes = doc["strikes"]
-    # Find ATM strike (closest to underlying_spot_price)
-    if not strikes:
-        raise HTTPException(status_code=404, detail="No strikes data available.")
-    spot = strikes[0].get("underlying_spot_price")
-    if spot is None:
-        raise HTTPException(status_code=400, detail="No underlying_spot_price in data.")
+def annotate_option_zones(strikes, spot):
+    """
+    Tags each strike row with call/put ATM/OTM/ITM zones relative to the strike closest to spot.
+    Returns the ATM strike.
+    """
     atm_strike = min((row["strike_price"] for row in strikes if row.get("strike_price") is not None), key=lambda x: abs(x - spot))
-    # Add option_type_zone to each row (in DB only)
     for row in strikes:
         strike = row.get("strike_price")
         if strike is None:
@@ -211,43 +290,128 @@ async def bias_identifier(user: str, expiry: str):
             row["put_option_type_zone"] = "OTM"
         else:
             row["put_option_type_zone"] = "ITM"
-    # Update DB with zones
-    db["option_chain_snapshots"].update_one({"_id": doc["_id"]}, {"$set": {"strikes": strikes}})
-    # Filter ATM+OTM rows for calls and puts
-    call_rows = [r for r in strikes if r.get("call_option_type_zone") in ("ATM", "OTM")]
-    put_rows = [r for r in strikes if r.get("put_option_type_zone") in ("ATM", "OTM")]
-    # Columns to aggregate
-    agg_cols = [
-        ("volume", "call_volume", "put_volume"),
-        ("openInterest", "call_oi", "put_oi"),
-        ("iv", "call_iv", "put_iv"),
-        ("bidQty", "call_bidQty", "put_bidQty"),
-        ("askQty", "call_askQty", "put_askQty"),
-        ("bidPrice", "call_bidPrice", "put_bidPrice"),
-        ("askPrice", "call_askPrice", "put_askPrice"),
-        ("theta", "call_theta", "put_theta"),
-        ("vega", "call_vega", "put_vega"),
-        ("gamma", "call_gamma", "put_gamma"),
-    ]
-    def agg(rows, call_or_put):
-        result = {}
-        for label, call_key, put_key in agg_cols:
-            key = call_key if call_or_put == "call" else put_key
-            total = sum(r.get(key, 0) or 0 for r in rows)
-            result[label] = total
-        return result
-    call_totals = agg(call_rows, "call")
-    put_totals = agg(put_rows, "put")
+    return atm_strike
+
+async def latest_tick(user, expiry):
+    """
+    Returns the tick pipeline for the latest ingested option chain of user+expiry.
+    Falls back to the stored snapshot timestamp when this process has not ingested a chain yet (e.g. after restart).
+    """
+    tick = current_tick(user, expiry)
+    if tick is None:
+        doc = await adb["option_chain_snapshots"].find_one({"user": user, "expiry": expiry}, {"timestamp": 1}, sort=[("timestamp", -1)])
+        # Another request may have started the tick while we were waiting on Mongo
+        tick = current_tick(user, expiry) or begin_tick(user, expiry, doc["timestamp"] if doc else None)
+    return tick
+
+async def run_in_tick(user, expiry, key, compute):
+    tick = await latest_tick(user, expiry)
+    return await tick.run(key, compute)
+
+async def tick_aggregate(user, expiry):
+    """Aggregate record of the latest tick, loaded from Mongo once if this process did not ingest it."""
+    tick = await latest_tick(user, expiry)
+    if tick.aggregate is None:
+        tick.aggregate = await run_db(latest_aggregate, db, user, expiry)
+    return tick.aggregate
+
+async def series_window(user, expiry):
+    """In-process NumPy window of aggregate records for user+expiry, seeded from Mongo on first use."""
+    window = get_window(user, expiry)
+    if window is None:
+        records = await run_db(recent_aggregates, db, user, expiry, WINDOW_POINTS)
+        window = get_window(user, expiry)
+        if window is None:
+            window = create_window(user, expiry, WINDOW_POINTS)
+            window.extend(records)
+    return window
+
+async def spot_ring(user, expiry):
+    """In-process rolling spot window for user+expiry, seeded from spot_price_rolling on first use."""
+    ring = get_spot_ring(user, expiry)
+    if ring is None:
+        spots = await run_db(load_spots, db, user, expiry)
+        ring = get_spot_ring(user, expiry)
+        if ring is None:
+            ring = create_spot_ring(user, expiry, WINDOW_POINTS)
+            ring.extend(spots)
+    return ring
+
+# Bias deltas compare against the latest tick at least this old
+ROLLING_DELTA_SECONDS = 600
+# At most one checkpoint write per interval, thinned to one entry per interval
+ROLLING_CHECKPOINT_SECONDS = int(os.getenv("ROLLING_CHECKPOINT_SECONDS", 30))
+
+async def rolling_lookback(user, expiry):
+    """In-process bias lookback buffer for user+expiry, seeded from its Mongo checkpoint on first use."""
+    buf = get_lookback(user, expiry)
+    if buf is None:
+        entries = await run_db(load_rolling_checkpoint, db, user, expiry)
+        buf = get_lookback(user, expiry)
+        if buf is None:
+            buf = create_lookback(user, expiry, ROLLING_DELTA_SECONDS)
+            buf.extend(entries)
+    return buf
+
+async def rolling_spots(user, expiry):
+    """Rolling spot prices (oldest to newest) as of the latest tick, copied once and shared by all modules."""
+    async def load():
+        return (await spot_ring(user, expiry)).values().tolist()
+    return await run_in_tick(user, expiry, "spots", load)
+
+async def session_stats(underlying, date):
+    """In-process running session of the underlying, seeded from intraday_sessions on first use and at day roll."""
+    stats = get_session(underlying)
+    if stats is None or stats.date != date:
+        doc = await run_db(load_session, db, underlying, date)
+        stats = get_session(underlying)
+        if stats is None or stats.date != date:
+            stats = set_session(SessionStats(underlying, date, doc))
+    return stats
+
+async def session_levels(user, expiry):
+    """
+    (session VWAP, previous day high, previous day low) of the underlying of user+expiry as of its latest tick;
+    any of them None when unknown (no bars yet, or no earlier session on record).
+    """
+    agg = await tick_aggregate(user, expiry)
+    underlying = agg.get("underlying") if agg else None
+    if not underlying:
+        return None, None, None
+    date = session_date(agg["timestamp"])
+    stats = await session_stats(underlying, date)
+    cached, previous = get_previous(underlying, date)
+    if not cached:
+        previous = set_previous(underlying, date, await run_db(load_previous_session, db, underlying, date))
+    if previous is None:
+        return stats.vwap, None, None
+    return stats.vwap, previous["high"], previous["low"]
+
+async def tick_series(user, expiry):
+    """Frozen copy of the window as of the latest tick, taken once and shared by all modules of that tick."""
+    async def load():
+        return (await series_window(user, expiry)).snapshot()
+    return await run_in_tick(user, expiry, "series", load)
+
+@app.get("/bias-identifier")
+async def bias_identifier(user: str, expiry: str):
+    return await run_in_tick(user, expiry, "bias", lambda: _bias_identifier(user, expiry))
+
+async def _bias_identifier(user, expiry):
+    # Latest per-tick leg totals (ATM+OTM), computed once at ingest
+    agg = await tick_aggregate(user, expiry)
+    if not agg:
+        raise HTTPException(status_code=404, detail="No option chain data found for user/expiry.")
+    spot = agg.get("spot")
+    if spot is None:
+        raise HTTPException(status_code=400, detail="No underlying_spot_price in data.")
+    call_totals = agg["calls"]
+    put_totals = agg["puts"]
 
     # --- Rolling 10-min window for OI, IV, Volume ---
-    from datetime import datetime, timedelta
-    rolling_col = db["option_chain_rolling"]
-    now = datetime.utcnow()
-    # Insert current snapshot
-    rolling_col.insert_one({
-                "user": user,
-                "expiry": expiry,
-        "timestamp": now,
+    lookback = await rolling_lookback(user, expiry)
+    now = to_epoch(datetime.utcnow())
+    lookback.append(now, {
         "call_oi": call_totals["openInterest"],
         "put_oi": put_totals["openInterest"],
         "call_iv": call_totals["iv"],
@@ -255,12 +419,8 @@ async def bias_identifier(user: str, expiry: str):
         "call_volume": call_totals["volume"],
         "put_volume": put_totals["volume"]
     })
-    # Find snapshot from ~10 minutes ago
-    ten_min_ago = now - timedelta(minutes=10)
-    old_doc = rolling_col.find_one(
-        {"user": user, "expiry": expiry, "timestamp": {"$lte": ten_min_ago}},
-        sort=[("timestamp", -1)]
-    )
+    # Snapshot from ~10 minutes ago
+    old_doc = lookback.lookback(now)
     if old_doc:
         rolling_deltas = {
             "call_oi": call_totals["openInterest"] - old_doc["call_oi"],
@@ -294,26 +454,14 @@ async def bias_identifier(user: str, expiry: str):
             "put_volume": 0,
         }
         is_baseline = True
-    # Purge old data (>15 min)
-    rolling_col.delete_many({"user": user, "expiry": expiry, "timestamp": {"$lt": now - timedelta(minutes=15)}})
+    # Compact checkpoint so a restart keeps its 10-min baseline
+    if lookback.checkpointed_at is None or now - lookback.checkpointed_at >= ROLLING_CHECKPOINT_SECONDS:
+        lookback.checkpointed_at = now
+        await run_db(save_rolling_checkpoint, db, user, expiry, lookback.checkpoint(ROLLING_CHECKPOINT_SECONDS))
 
     # --- Rolling spot price logic for dynamic price_direction ---
-    spot_rolling_col = db["spot_price_rolling"]
-    rolling_doc = spot_rolling_col.find_one({"user": user, "expiry": expiry})
-    if rolling_doc and "spots" in rolling_doc:
-        spots = rolling_doc["spots"]
-    else:
-        spots = []
-    # Append current spot, keep maxlen=120 (10 minutes)
-    spots.append(spot)
-    if len(spots) > 120:
-        spots = spots[-120:]
-    # Save back to DB
-    spot_rolling_col.update_one(
-        {"user": user, "expiry": expiry},
-        {"$set": {"user": user, "expiry": expiry, "spots": spots, "updated_at": datetime.utcnow()}},
-        upsert=True
-    )
+    # Last 120 spots (10 minutes), appended once per tick at ingest
+    spots = await rolling_spots(user, expiry)
     # Compute rolling average
     if len(spots) >= 2:
         rolling_avg = sum(spots) / len(spots)
@@ -394,20 +542,24 @@ async def bias_identifier(user: str, expiry: str):
         "is_baseline": is_baseline
     } 
     # ML inference
-    ml_features = [
-        output['rolling_pct'].get('call_oi'), output['rolling_pct'].get('call_iv'), output['rolling_pct'].get('call_volume'),
-        output['rolling_pct'].get('put_oi'), output['rolling_pct'].get('put_iv'), output['rolling_pct'].get('put_volume'),
-        output['spot'], output['price_direction'], output['call_participant'], output['put_participant'], output['bias']
-    ]
+    ml_features = {
+        "ce_oi_pct": output['rolling_pct'].get('call_oi'), "ce_iv_pct": output['rolling_pct'].get('call_iv'),
+        "ce_vol_pct": output['rolling_pct'].get('call_volume'), "pe_oi_pct": output['rolling_pct'].get('put_oi'),
+        "pe_iv_pct": output['rolling_pct'].get('put_iv'), "pe_vol_pct": output['rolling_pct'].get('put_volume'),
+        "spot_delta": output['spot'],  # export_bias_data stores the snapshot spot in this column
+        "price_direction": output['price_direction'], "call_participant": output['call_participant'],
+        "put_participant": output['put_participant'], "bias": output['bias'],
+    }
     try:
-        ml_result = predict_bias(ml_features)
+        ml_result = await score("bias", ml_features)
         output['ml_predicted_bias'] = ml_result['predicted']
         output['ml_probabilities'] = ml_result['probabilities']
         output['ml_confidence'] = ml_result['confidence']
+        output['ml_model_version'] = ml_result['model_version']
     except Exception as e:
         output['ml_error'] = str(e)
     # Persist output for ML/audit
-    db["bias_identifier_snapshots"].insert_one({
+    await audit_writer.insert("bias_identifier_snapshots", {
         **output,
         "user": user,
         "expiry": expiry,
@@ -418,49 +570,18 @@ async def bias_identifier(user: str, expiry: str):
 
 @app.get("/market-style-identifier")
 async def market_style_identifier(user: str, expiry: str, mode: str = Query("adaptive", enum=["strict", "adaptive"])):
-    # Fetch latest option chain snapshot for user+expiry
-    doc = db["option_chain_snapshots"].find_one({"user": user, "expiry": expiry}, sort=[("timestamp", -1)])
-    if not doc or not doc.get("strikes"):
+    return await run_in_tick(user, expiry, f"style:{mode}", lambda: _market_style_identifier(user, expiry, mode))
+
+async def _market_style_identifier(user, expiry, mode):
+    # Latest per-tick leg totals (ATM+OTM), computed once at ingest
+    agg = await tick_aggregate(user, expiry)
+    if not agg:
         raise HTTPException(status_code=404, detail="No option chain data found for user/expiry.")
-    strikes = doc["strikes"]
-    spot = strikes[0].get("underlying_spot_price")
+    spot = agg.get("spot")
     if spot is None:
         raise HTTPException(status_code=400, detail="No underlying_spot_price in data.")
-    # Find ATM strike
-    atm_strike = min((row["strike_price"] for row in strikes if row.get("strike_price") is not None), key=lambda x: abs(x - spot))
-    for row in strikes:
-        strike = row.get("strike_price")
-        if strike is None:
-            row["option_type_zone"] = None
-            continue
-        if strike == atm_strike:
-            row["call_option_type_zone"] = "ATM"
-        elif strike > atm_strike:
-            row["call_option_type_zone"] = "OTM"
-        else:
-            row["call_option_type_zone"] = "ITM"
-        if strike == atm_strike:
-            row["put_option_type_zone"] = "ATM"
-        elif strike < atm_strike:
-            row["put_option_type_zone"] = "OTM"
-        else:
-            row["put_option_type_zone"] = "ITM"
-    call_rows = [r for r in strikes if r.get("call_option_type_zone") in ("ATM", "OTM")]
-    put_rows = [r for r in strikes if r.get("put_option_type_zone") in ("ATM", "OTM")]
-    agg_cols = [
-        ("volume", "call_volume", "put_volume"),
-        ("openInterest", "call_oi", "put_oi"),
-        ("iv", "call_iv", "put_iv"),
-    ]
-    def agg(rows, call_or_put):
-        result = {}
-        for label, call_key, put_key in agg_cols:
-            key = call_key if call_or_put == "call" else put_key
-            total = sum(r.get(key, 0) or 0 for r in rows)
-            result[label] = total
-        return result
-    call_totals = agg(call_rows, "call")
-    put_totals = agg(put_rows, "put")
+    call_totals = {k: agg["calls"][k] for k in ("volume", "openInterest", "iv")}
+    put_totals = {k: agg["puts"][k] for k in ("volume", "openInterest", "iv")}
     total_volume = call_totals["volume"] + put_totals["volume"]
     total_oi = call_totals["openInterest"] + put_totals["openInterest"]
     # --- Baseline logic ---
@@ -470,11 +591,11 @@ async def market_style_identifier(user: str, expiry: str, mode: str = Query("ada
     nine_fifteen = now_ist.replace(hour=9, minute=15, second=0, microsecond=0)
     eleven_thirty = now_ist.replace(hour=11, minute=30, second=0, microsecond=0)
     # Get morning baseline
-    baseline_col = db["otm_baseline_snapshots"]
-    morning_baseline = baseline_col.find_one({"user": user, "expiry": expiry, "date": today_str})
+    baseline_col = adb["otm_baseline_snapshots"]
+    morning_baseline = await baseline_col.find_one({"user": user, "expiry": expiry, "date": today_str})
     # Get midday baseline
-    midday_col = db["midday_baseline_snapshots"]
-    midday_baseline = midday_col.find_one({"user": user, "expiry": expiry, "date": today_str})
+    midday_col = adb["midday_baseline_snapshots"]
+    midday_baseline = await midday_col.find_one({"user": user, "expiry": expiry, "date": today_str})
     baseline_used = "morning"
     baseline_doc = morning_baseline
     # --- Adaptive mode: dynamic midday baseline trigger ---
@@ -496,7 +617,7 @@ async def market_style_identifier(user: str, expiry: str, mode: str = Query("ada
                 "spot": spot,
                 "created_at": now_ist
             }
-            midday_col.insert_one(midday_baseline_doc)
+            await midday_col.insert_one(midday_baseline_doc)
             midday_baseline = midday_baseline_doc
         if midday_baseline:
             baseline_doc = midday_baseline
@@ -531,25 +652,21 @@ async def market_style_identifier(user: str, expiry: str, mode: str = Query("ada
     else:
         volatility_state = "Stable"
     # --- Rolling spot trend with EMA ---
-    spot_rolling_col = db["spot_price_rolling"]
-    rolling_doc = spot_rolling_col.find_one({"user": user, "expiry": expiry})
+    spots = await rolling_spots(user, expiry)
     price_direction = None
     spot_trend_strength = None
-    if rolling_doc and "spots" in rolling_doc:
-        spots = rolling_doc["spots"]
+    if spots:
         if len(spots) >= 2:
             # EMA calculation
             alpha = 2 / (min(len(spots), 120) + 1)
-            ema = spots[0]
-            for s in spots[1:]:
-                ema = alpha * s + (1 - alpha) * ema
+            spot_ema = ema(np.asarray(spots, dtype=np.float64), alpha)
             # Slope/strength: difference between last and first EMA over window
             ema_start = spots[0]
-            ema_end = ema
+            ema_end = spot_ema
             spot_trend_strength = ema_end - ema_start
-            if spot > ema:
+            if spot > spot_ema:
                 price_direction = "up"
-            elif spot < ema:
+            elif spot < spot_ema:
                 price_direction = "down"
             else:
                 price_direction = "flat"
@@ -595,18 +712,16 @@ async def market_style_identifier(user: str, expiry: str, mode: str = Query("ada
         "mode": mode
     } 
     # ML inference
-    ml_features = [
-        output['price_direction'], output['oi_diff'], output['vol_diff'], output['iv_diff'], output['volatility_state'],
-        output['baseline_used'], output['spot_trend_strength'], output['total_volume'], output['total_oi'], output['mode']
-    ]
+    ml_features = {k: output.get(k) for k in feature_names("market_style")}
     try:
-        ml_result = predict_market_style(ml_features)
+        ml_result = await score("market_style", ml_features)
         output['ml_predicted_market_style'] = ml_result['predicted']
         output['ml_probabilities'] = ml_result['probabilities']
         output['ml_confidence'] = ml_result['confidence']
+        output['ml_model_version'] = ml_result['model_version']
     except Exception as e:
         output['ml_error'] = str(e)
-    db["market_style_snapshots"].insert_one({
+    await audit_writer.insert("market_style_snapshots", {
         **output,
         "user": user,
         "expiry": expiry,
@@ -617,6 +732,9 @@ async def market_style_identifier(user: str, expiry: str, mode: str = Query("ada
 
 @app.get("/reversal-probability-finder")
 async def reversal_probability_finder(user: str, expiry: str):
+    return await run_in_tick(user, expiry, "reversal", lambda: _reversal_probability_finder(user, expiry))
+
+async def _reversal_probability_finder(user, expiry):
     ist = timezone('Asia/Kolkata')
     now_ist = datetime.now(ist)
     today_str = now_ist.strftime('%Y-%m-%d')
@@ -624,9 +742,7 @@ async def reversal_probability_finder(user: str, expiry: str):
     window_points = 120  # 10 min at 5s intervals
 
     # --- Get rolling spot prices ---
-    spot_rolling_col = db["spot_price_rolling"]
-    rolling_doc = spot_rolling_col.find_one({"user": user, "expiry": expiry})
-    spots = rolling_doc["spots"] if rolling_doc and "spots" in rolling_doc else []
+    spots = await rolling_spots(user, expiry)
     if len(spots) < 2:
         return {"reversal_probability": 0.0, "reversal_type": None, "bias_cluster_flipped": False, "iv_oi_support_flip": False, "price_vs_bias_conflict": False, "liquidity_ok": False, "structural_context": None, "volatility_phase": None, "reasoning": "Not enough spot data"}
     # --- Higher timeframe trend ---
@@ -641,8 +757,8 @@ async def reversal_probability_finder(user: str, expiry: str):
         higher_tf_trend = "sideways"
 
     # --- Get bias_state history (simulate from bias snapshots or store in a collection) ---
-    bias_col = db["bias_state_history"]
-    bias_doc = bias_col.find_one({"user": user, "expiry": expiry})
+    bias_col = adb["bias_state_history"]
+    bias_doc = await bias_col.find_one({"user": user, "expiry": expiry})
     bias_history = bias_doc["biases"][-window_points:] if bias_doc and "biases" in bias_doc else []
     # --- Bias flip cluster detection ---
     bias_flips = 0
@@ -654,23 +770,15 @@ async def reversal_probability_finder(user: str, expiry: str):
     bias_cluster_flipped = bias_flips >= 2
 
     # --- Get rolling option chain snapshots ---
-    oc_col = db["option_chain_snapshots"]
-    oc_docs = list(oc_col.find({"user": user, "expiry": expiry}).sort("timestamp", -1).limit(window_points))
-    oc_docs = oc_docs[::-1]  # oldest to newest
-    if not oc_docs:
+    series = await tick_series(user, expiry)  # oldest to newest
+    if not len(series):
         return {"reversal_probability": 0.0, "reversal_type": None, "bias_cluster_flipped": False, "iv_oi_support_flip": False, "price_vs_bias_conflict": False, "liquidity_ok": False, "structural_context": None, "volatility_phase": None, "reasoning": "No option chain data"}
     # --- IV & OI shift tracking ---
-    def get_agg(doc):
-        strikes = doc.get("strikes", [])
-        call_oi = sum(r.get("call_oi", 0) or 0 for r in strikes if r.get("call_option_type_zone") in ("ATM", "OTM"))
-        put_oi = sum(r.get("put_oi", 0) or 0 for r in strikes if r.get("put_option_type_zone") in ("ATM", "OTM"))
-        call_iv = sum(r.get("call_iv", 0) or 0 for r in strikes if r.get("call_option_type_zone") in ("ATM", "OTM"))
-        put_iv = sum(r.get("put_iv", 0) or 0 for r in strikes if r.get("put_option_type_zone") in ("ATM", "OTM"))
-        call_vol = sum(r.get("call_volume", 0) or 0 for r in strikes if r.get("call_option_type_zone") in ("ATM", "OTM"))
-        put_vol = sum(r.get("put_volume", 0) or 0 for r in strikes if r.get("put_option_type_zone") in ("ATM", "OTM"))
-        return call_oi, put_oi, call_iv, put_iv, call_vol, put_vol
-    call_oi_start, put_oi_start, call_iv_start, put_iv_start, call_vol_start, put_vol_start = get_agg(oc_docs[0])
-    call_oi_end, put_oi_end, call_iv_end, put_iv_end, call_vol_end, put_vol_end = get_agg(oc_docs[-1])
+    call_oi, put_oi = series["call_oi"], series["put_oi"]
+    call_iv, put_iv = series["call_iv"], series["put_iv"]
+    call_oi_start, put_oi_start, call_iv_start, put_iv_start = call_oi[0], put_oi[0], call_iv[0], put_iv[0]
+    call_oi_end, put_oi_end, call_iv_end, put_iv_end = call_oi[-1], put_oi[-1], call_iv[-1], put_iv[-1]
+    call_vol_end, put_vol_end = series["call_volume"][-1], series["put_volume"][-1]
     # Detect IV/OI support flip
     oi_shift = (call_oi_end - call_oi_start) - (put_oi_end - put_oi_start)
     iv_shift = (call_iv_end - call_iv_start) - (put_iv_end - put_iv_start)
@@ -684,17 +792,13 @@ async def reversal_probability_finder(user: str, expiry: str):
     # --- Liquidity check ---
     liquidity_ok = (call_oi_end + put_oi_end) > 100000 and (call_vol_end + put_vol_end) > 100000
     # --- Volatility filter ---
-    iv_series = [(get_agg(doc)[2] + get_agg(doc)[3]) for doc in oc_docs]
-    iv_range = max(iv_series) - min(iv_series) if iv_series else 0
+    iv_range = value_range(call_iv + put_iv)
     volatility_phase = "expanding" if iv_range > 5 else "normal"
     # --- Structural context ---
     structural_context = "counter_trend" if (higher_tf_trend == "down" and bias_trend == 1) or (higher_tf_trend == "up" and bias_trend == -1) else "trend_continuation"
 
     # --- Market Style & Trap Detector Integration ---
-    style_fn = app.routes[[r.path for r in app.routes].index("/market-style-identifier")].endpoint
-    trap_fn = app.routes[[r.path for r in app.routes].index("/trap-detector")].endpoint
-    style = await style_fn(user, expiry, "adaptive")
-    trap = await trap_fn(user, expiry)
+    style, trap = await asyncio.gather(market_style_identifier(user, expiry, "adaptive"), trap_detector(user, expiry))
     market_style = style.get("market_style") if style else None
     trap_call = trap.get("call") if trap else None
     trap_put = trap.get("put") if trap else None
@@ -744,18 +848,17 @@ async def reversal_probability_finder(user: str, expiry: str):
         "reasoning": reasoning
     } 
     # ML inference
-    ml_features = [
-        output['reversal_probability'], output['bias_cluster_flipped'], output['iv_oi_support_flip'], output['price_vs_bias_conflict'],
-        output['liquidity_ok'], output['structural_context'], output['volatility_phase'], output['market_style'], output['trap_detected']
-    ]
+    # spot_delta is a lookahead outcome in the training export, unknown here and scored as missing
+    ml_features = {k: output.get(k) for k in feature_names("reversal")}
     try:
-        ml_result = predict_reversal(ml_features)
+        ml_result = await score("reversal", ml_features)
         output['ml_predicted_reversal'] = ml_result['predicted']
         output['ml_probabilities'] = ml_result['probabilities']
         output['ml_confidence'] = ml_result['confidence']
+        output['ml_model_version'] = ml_result['model_version']
     except Exception as e:
         output['ml_error'] = str(e)
-    db["reversal_probability_snapshots"].insert_one({
+    await audit_writer.insert("reversal_probability_snapshots", {
         **output,
         "user": user,
         "expiry": expiry,
@@ -766,76 +869,45 @@ async def reversal_probability_finder(user: str, expiry: str):
 
 @app.get("/trap-detector")
 async def trap_detector(user: str, expiry: str):
-    from fastapi import Request
-    from datetime import datetime
-    import calendar
+    return await run_in_tick(user, expiry, "trap", lambda: _trap_detector(user, expiry))
+
+async def _trap_detector(user, expiry):
     ist = timezone('Asia/Kolkata')
     now_ist = datetime.now(ist)
-    window_points = 120  # 10 min at 5s intervals
 
     # --- Get rolling spot prices ---
-    spot_rolling_col = db["spot_price_rolling"]
-    rolling_doc = spot_rolling_col.find_one({"user": user, "expiry": expiry})
-    spots = rolling_doc["spots"] if rolling_doc and "spots" in rolling_doc else []
+    spots = await rolling_spots(user, expiry)
     if len(spots) < 2:
         return {"call": {"trap_detected": False, "trap_type": "None", "deception_score": 0, "confidence_level": "Low", "comment": "Not enough spot data"},
                 "put": {"trap_detected": False, "trap_type": "None", "deception_score": 0, "confidence_level": "Low", "comment": "Not enough spot data"}}
     # --- Get rolling option chain snapshots ---
-    oc_col = db["option_chain_snapshots"]
-    oc_docs = list(oc_col.find({"user": user, "expiry": expiry}).sort("timestamp", -1).limit(window_points))
-    oc_docs = oc_docs[::-1]  # oldest to newest
-    if not oc_docs:
+    series = await tick_series(user, expiry)  # oldest to newest
+    if not len(series):
         return {"call": {"trap_detected": False, "trap_type": "None", "deception_score": 0, "confidence_level": "Low", "comment": "No option chain data"},
                 "put": {"trap_detected": False, "trap_type": "None", "deception_score": 0, "confidence_level": "Low", "comment": "No option chain data"}}
-    # --- Helper: rolling avg ---
-    def rolling_avg(series):
-        return sum(series) / len(series) if series else 0
-    # --- Helper: get per-leg series ---
-    def get_leg_series(leg):
-        oi = []
-        iv = []
-        vol = []
-        for doc in oc_docs:
-            strikes = doc.get("strikes", [])
-            if leg == "call":
-                oi.append(sum(r.get("call_oi", 0) or 0 for r in strikes if r.get("call_option_type_zone") in ("ATM", "OTM")))
-                iv.append(sum(r.get("call_iv", 0) or 0 for r in strikes if r.get("call_option_type_zone") in ("ATM", "OTM")))
-                vol.append(sum(r.get("call_volume", 0) or 0 for r in strikes if r.get("call_option_type_zone") in ("ATM", "OTM")))
-            else:
-                oi.append(sum(r.get("put_oi", 0) or 0 for r in strikes if r.get("put_option_type_zone") in ("ATM", "OTM")))
-                iv.append(sum(r.get("put_iv", 0) or 0 for r in strikes if r.get("put_option_type_zone") in ("ATM", "OTM")))
-                vol.append(sum(r.get("put_volume", 0) or 0 for r in strikes if r.get("put_option_type_zone") in ("ATM", "OTM")))
-        return oi, iv, vol
-    ce_oi, ce_iv, ce_vol = get_leg_series("call")
-    pe_oi, pe_iv, pe_vol = get_leg_series("put")
+    # --- Per-leg series ---
+    ce_oi, ce_iv, ce_vol = series["call_oi"], series["call_iv"], series["call_volume"]
+    pe_oi, pe_iv, pe_vol = series["put_oi"], series["put_iv"], series["put_volume"]
+    spot_arr = np.asarray(spots, dtype=np.float64)
     # --- Price stalling ---
-    ema_slope = (spots[-1] - spots[0]) / (len(spots) or 1)
+    ema_slope = slope(spot_arr)
     price_stalling = abs(ema_slope) < 0.05  # configurable threshold
-    # --- Rolling IV avg ---
-    ce_iv_avg = rolling_avg(ce_iv[:-3]) if len(ce_iv) > 3 else rolling_avg(ce_iv)
-    pe_iv_avg = rolling_avg(pe_iv[:-3]) if len(pe_iv) > 3 else rolling_avg(pe_iv)
-    # --- Current deltas ---
+    # --- Current deltas (IV vs rolling avg excluding the last 3 points) ---
+    ce_iv_delta, ce_iv_avg = delta_vs_avg(ce_iv, 3)
+    pe_iv_delta, pe_iv_avg = delta_vs_avg(pe_iv, 3)
     ce_oi_delta = ce_oi[-1] - ce_oi[0]
-    ce_iv_delta = ce_iv[-1] - ce_iv_avg
     ce_vol_delta = ce_vol[-1] - ce_vol[0]
     pe_oi_delta = pe_oi[-1] - pe_oi[0]
-    pe_iv_delta = pe_iv[-1] - pe_iv_avg
     pe_vol_delta = pe_vol[-1] - pe_vol[0]
     # --- Price direction ---
-    price_direction = "up" if spots[-1] > rolling_avg(spots) else "down" if spots[-1] < rolling_avg(spots) else "flat"
+    spot_avg = spot_arr.mean()
+    price_direction = "up" if spot_arr[-1] > spot_avg else "down" if spot_arr[-1] < spot_avg else "flat"
     # --- Leg divergence ---
     ce_vs_pe_div = (ce_oi_delta > 0 and pe_oi_delta > 0 and pe_iv_delta > 0)
     pe_vs_ce_div = (pe_oi_delta > 0 and ce_oi_delta > 0 and ce_iv_delta > 0)
-    # --- Reversal confirmation (next 3 points) ---
-    def reversal_confirm(leg_iv, leg_vol):
-        if len(leg_iv) < 4 or len(leg_vol) < 4:
-            return False
-        # Look for IV rising and volume stalling in last 3 points
-        return any(leg_iv[-i] > leg_iv[-i-1] for i in range(1, 4)) and all(leg_vol[-i] < leg_vol[-i-1] for i in range(1, 4))
 
     # --- S/R Guard Integration ---
-    sr_fn = app.routes[[r.path for r in app.routes].index("/support-resistance-guard")].endpoint
-    sr_zones = await sr_fn(user, expiry)
+    sr_zones = await support_resistance_guard(user, expiry)
     sr_trap_signals = []
     for z in sr_zones:
         if z.get("trap_risk") and z.get("zone_state") == "Active":
@@ -848,9 +920,9 @@ async def trap_detector(user: str, expiry: str):
             sr_trap_signals.append(f"Fakeout at {z['zone_type']} {z['zone_level']}")
 
     # --- Trap Memory (Historical Context) ---
-    trap_memory_col = db["trap_memory"]
+    trap_memory_col = adb["trap_memory"]
     trap_level = round(spots[-1], -1)  # round to nearest 10 for grouping
-    trap_mem_doc = trap_memory_col.find_one({"user": user, "expiry": expiry, "level": trap_level})
+    trap_mem_doc = await trap_memory_col.find_one({"user": user, "expiry": expiry, "level": trap_level})
     trap_count = trap_mem_doc["count"] if trap_mem_doc else 0
 
     # --- Expiry/Event Sensitivity ---
@@ -880,7 +952,8 @@ async def trap_detector(user: str, expiry: str):
         call_score += 20
         call_comment.append("CE IV drop significant vs regime")
         trap_signals += 1
-    if reversal_confirm(ce_iv, ce_vol):
+    # Reversal confirmation: IV rising and volume stalling in the last 3 points
+    if rising_iv_falling_volume(ce_iv, ce_vol):
         call_score += 20
         call_comment.append("Reversal confirmation in last 3 points")
         trap_signals += 1
@@ -900,7 +973,7 @@ async def trap_detector(user: str, expiry: str):
     call_trap = trap_signals >= min_signals_required and call_score >= 60
     # Update trap memory if trap detected
     if call_trap:
-        trap_memory_col.update_one({"user": user, "expiry": expiry, "level": trap_level}, {"$inc": {"count": 1}}, upsert=True)
+        await trap_memory_col.update_one({"user": user, "expiry": expiry, "level": trap_level}, {"$inc": {"count": 1}}, upsert=True)
 
     # --- Put Trap Logic ---
     put_score = 0
@@ -922,7 +995,7 @@ async def trap_detector(user: str, expiry: str):
         put_score += 20
         put_comment.append("PE IV drop significant vs regime")
         trap_signals += 1
-    if reversal_confirm(pe_iv, pe_vol):
+    if rising_iv_falling_volume(pe_iv, pe_vol):
         put_score += 20
         put_comment.append("Reversal confirmation in last 3 points")
         trap_signals += 1
@@ -942,7 +1015,7 @@ async def trap_detector(user: str, expiry: str):
     put_trap = trap_signals >= min_signals_required and put_score >= 60
     # Update trap memory if trap detected
     if put_trap:
-        trap_memory_col.update_one({"user": user, "expiry": expiry, "level": trap_level}, {"$inc": {"count": 1}}, upsert=True)
+        await trap_memory_col.update_one({"user": user, "expiry": expiry, "level": trap_level}, {"$inc": {"count": 1}}, upsert=True)
 
     output = {
         "call": {
@@ -963,18 +1036,21 @@ async def trap_detector(user: str, expiry: str):
         }
     } 
     # ML inference
-    ml_features = [
-        output['call']['trap_detected'], output['put']['trap_detected'], output['call']['deception_score'], output['put']['deception_score'],
-        output['call']['confidence_level'], output['put']['confidence_level'], output['call']['comment'], output['put']['comment']
-    ]
+    # The trap model is trained per leg (see export_trap_data); score both legs as one batch
+    legs = ["call", "put"]
     try:
-        ml_result = predict_trap(ml_features)
+        leg_results = await score_many("trap", [{k: output[leg].get(k) for k in feature_names("trap")} for leg in legs])
+        for leg, leg_result in zip(legs, leg_results):
+            output[leg]['ml_trap_probability'] = leg_result['probabilities']['1']
+        # Top-level result follows the leg the model finds most trap-like
+        ml_result = max(leg_results, key=lambda r: r['probabilities']['1'])
         output['ml_predicted_trap'] = ml_result['predicted']
         output['ml_probabilities'] = ml_result['probabilities']
         output['ml_confidence'] = ml_result['confidence']
+        output['ml_model_version'] = ml_result['model_version']
     except Exception as e:
         output['ml_error'] = str(e)
-    db["trap_detector_snapshots"].insert_one({
+    await audit_writer.insert("trap_detector_snapshots", {
         **output,
         "user": user,
         "expiry": expiry,
@@ -985,35 +1061,34 @@ async def trap_detector(user: str, expiry: str):
 
 @app.get("/support-resistance-guard")
 async def support_resistance_guard(user: str, expiry: str):
+    return await run_in_tick(user, expiry, "sr", lambda: _support_resistance_guard(user, expiry))
+
+async def _support_resistance_guard(user, expiry):
     ist = timezone('Asia/Kolkata')
     now_ist = datetime.now(ist)
-    window_points = 120  # 10 min at 5s intervals
     recent_window_sec = 600  # 10 min
 
     # --- Get latest spot price ---
-    spot_rolling_col = db["spot_price_rolling"]
-    rolling_doc = spot_rolling_col.find_one({"user": user, "expiry": expiry})
-    spots = rolling_doc["spots"] if rolling_doc and "spots" in rolling_doc else []
+    spots = await rolling_spots(user, expiry)
     spot = spots[-1] if spots else None
     if not spot:
         return []
 
     # --- Get option chain snapshots (last 10 min) ---
-    oc_col = db["option_chain_snapshots"]
-    oc_docs = list(oc_col.find({"user": user, "expiry": expiry}).sort("timestamp", -1).limit(window_points))
-    oc_docs = oc_docs[::-1]  # oldest to newest
-    if not oc_docs:
+    series = await tick_series(user, expiry)  # oldest to newest
+    if not len(series):
         return []
 
     # --- Get bias from Bias Identifier ---
-    bias_col = db["bias_state_history"]
-    bias_doc = bias_col.find_one({"user": user, "expiry": expiry})
+    bias_col = adb["bias_state_history"]
+    bias_doc = await bias_col.find_one({"user": user, "expiry": expiry})
     global_bias = bias_doc["biases"][-1] if bias_doc and "biases" in bias_doc and bias_doc["biases"] else None
 
-    # --- VWAP, PDH, PDL (placeholders, replace with real values if available) ---
-    vwap = sum(spots) / len(spots) if spots else spot
-    pdh = spot + 100  # placeholder
-    pdl = spot - 100  # placeholder
+    # --- Session VWAP and previous day high/low from the intraday bar store ---
+    vwap, pdh, pdl = await session_levels(user, expiry)
+    if vwap is None:
+        # No session bars yet (underlying unknown for this tick): fall back to the rolling spot mean
+        vwap = sum(spots) / len(spots)
 
     # --- Auto-detect round levels ---
     round_levels = set()
@@ -1028,45 +1103,39 @@ async def support_resistance_guard(user: str, expiry: str):
     round_levels = [lvl for lvl in round_levels if abs(lvl - spot) <= 400]
 
     # --- Manual zones from config ---
-    manual_zones_col = db["manual_zones"]
-    manual_zones_doc = manual_zones_col.find_one({"user": user, "expiry": expiry})
+    manual_zones_col = adb["manual_zones"]
+    manual_zones_doc = await manual_zones_col.find_one({"user": user, "expiry": expiry})
     manual_zones = manual_zones_doc["zones"] if manual_zones_doc and "zones" in manual_zones_doc else []
     # manual_zones: list of {"zone_type": "Manual", "zone_level": float}
 
     # --- Build zones list ---
-    zones = [
-        {"zone_type": "VWAP", "zone_level": vwap},
-        {"zone_type": "PDH", "zone_level": pdh},
-        {"zone_type": "PDL", "zone_level": pdl},
-    ] + [{"zone_type": "Round", "zone_level": lvl} for lvl in round_levels]
+    zones = [{"zone_type": "VWAP", "zone_level": vwap}]
+    # PDH/PDL only once a previous session has been recorded
+    zones += [{"zone_type": ztype, "zone_level": lvl} for ztype, lvl in [("PDH", pdh), ("PDL", pdl)] if lvl is not None]
+    zones += [{"zone_type": "Round", "zone_level": lvl} for lvl in round_levels]
     # Add manual zones
     zones += [{"zone_type": z.get("zone_type", "Manual"), "zone_level": z["zone_level"]} for z in manual_zones if "zone_level" in z]
 
     # --- Volatility regime (iv_range) ---
-    def get_agg(doc):
-        strikes = doc.get("strikes", [])
-        ce_iv = sum(r.get("call_iv", 0) or 0 for r in strikes if r.get("call_option_type_zone") in ("ATM", "OTM"))
-        pe_iv = sum(r.get("put_iv", 0) or 0 for r in strikes if r.get("put_option_type_zone") in ("ATM", "OTM"))
-        return ce_iv, pe_iv
-    iv_series = [(get_agg(doc)[0] + get_agg(doc)[1]) for doc in oc_docs]
-    iv_range = max(iv_series) - min(iv_series) if iv_series else 0
+    iv_range = value_range(series["call_iv"] + series["put_iv"])
     volatility_regime = "high" if iv_range > 5 else "normal"
 
+    # --- OI/IV/Volume analysis (use last tick) ---
+    ce_oi = series["call_oi"][-1]
+    pe_oi = series["put_oi"][-1]
+    ce_iv = series["call_iv"][-1]
+    pe_iv = series["put_iv"][-1]
+
+    # --- Last test time of every zone (price within 0.1% or 20 points), from one index over the window ---
+    levels = np.array([zone["zone_level"] for zone in zones], dtype=np.float64)
+    touch_times = series.touch_index().last_touch(levels, np.maximum(20, 0.001 * levels))
+
     # --- For each zone, evaluate state and signals ---
     results = []
-    for zone in zones:
+    for zone, touch_time in zip(zones, touch_times):
         zlvl = zone["zone_level"]
         ztype = zone["zone_type"]
-        # Find last test time (price within 0.1% or 20 points)
-        last_test_time = None
-        for doc in reversed(oc_docs):
-            ts = doc.get("timestamp")
-            strikes = doc.get("strikes", [])
-            s = strikes[0].get("underlying_spot_price") if strikes and strikes[0].get("underlying_spot_price") else None
-            if not s: continue
-            if abs(s - zlvl) <= max(20, 0.001 * zlvl):
-                last_test_time = ts
-                break
+        last_test_time = None if np.isnan(touch_time) else datetime.utcfromtimestamp(touch_time)
         # Zone state
         if last_test_time:
             if isinstance(last_test_time, str):
@@ -1097,12 +1166,6 @@ async def support_resistance_guard(user: str, expiry: str):
         # Price action & wick structure (placeholder logic)
         wick_reject = abs(spot - zlvl) > 10 and abs(spots[-1] - zlvl) < 20
         body_break = abs(spot - zlvl) < 10
-        # OI/IV/Volume analysis (use last doc)
-        strikes = oc_docs[-1].get("strikes", [])
-        ce_oi = sum(r.get("call_oi", 0) or 0 for r in strikes if r.get("call_option_type_zone") in ("ATM", "OTM"))
-        pe_oi = sum(r.get("put_oi", 0) or 0 for r in strikes if r.get("put_option_type_zone") in ("ATM", "OTM"))
-        ce_iv = sum(r.get("call_iv", 0) or 0 for r in strikes if r.get("call_option_type_zone") in ("ATM", "OTM"))
-        pe_iv = sum(r.get("put_iv", 0) or 0 for r in strikes if r.get("put_option_type_zone") in ("ATM", "OTM"))
         # Bias suggestion and confidence logic
         bias_suggestion = "Bounce"
         confidence = "Low"
@@ -1148,26 +1211,18 @@ async def support_resistance_guard(user: str, expiry: str):
             "signal_disagreement": bool(signal_disagreement)
         })
     output = results
-    # ML inference
-    if results:
-        last_zone = results[-1]
-        ml_features = [
-            last_zone['zone_state'], last_zone['bias_suggestion'], last_zone['confidence'], last_zone['confidence_score'],
-            last_zone['volatility_regime'], last_zone['trap_risk'], last_zone['last_test_time'], last_zone['signal_disagreement']
-        ]
-    else:
-        ml_features = [None, None, None, None, None, None, None, None]
+    # ML inference: the S/R model is trained per zone (see export_sr_data), so every zone is scored in one batch
     try:
-        ml_result = predict_sr(ml_features)
-        # Optionally attach ML results to the last zone
-        if results:
-            results[-1]['ml_predicted_sr'] = ml_result['predicted']
-            results[-1]['ml_probabilities'] = ml_result['probabilities']
-            results[-1]['ml_confidence'] = ml_result['confidence']
+        zone_results = await score_many("sr", [{k: zone.get(k) for k in feature_names("sr")} for zone in results])
+        for zone, ml_result in zip(results, zone_results):
+            zone['ml_predicted_sr'] = ml_result['predicted']
+            zone['ml_probabilities'] = ml_result['probabilities']
+            zone['ml_confidence'] = ml_result['confidence']
+            zone['ml_model_version'] = ml_result['model_version']
     except Exception as e:
         if results:
             results[-1]['ml_error'] = str(e)
-    db["support_resistance_snapshots"].insert_one({
+    await audit_writer.insert("support_resistance_snapshots", {
         "zones": results,
         "user": user,
         "expiry": expiry,
@@ -1176,9 +1231,6 @@ async def support_resistance_guard(user: str, expiry: str):
     })
     return results
 
-# Internal logging collection for transparency
-entry_engine_log_col = db["entry_logic_engine_logs"]
-
 def confidence_weighted_sizer(entry_confidence, entry_direction, volatility_regime=None, max_position_size=3.0):
     """
     Maps entry_confidence (0-1) to position_size_factor, confidence_bucket, and risk_adjusted_action.
@@ -1223,12 +1275,25 @@ def confidence_weighted_sizer(entry_confidence, entry_direction, volatility_regi
         "risk_adjusted_action": risk_adjusted_action
     }
 
+# (raw signal key, module name in rejections, endpoint) of every module the Entry Logic Engine fuses
+ENTRY_MODULES = [
+    ("bias", "bias_identifier", lambda user, expiry, mode: bias_identifier(user, expiry)),
+    ("style", "market_style_identifier", lambda user, expiry, mode: market_style_identifier(user, expiry, mode)),
+    ("reversal", "reversal_probability_finder", lambda user, expiry, mode: reversal_probability_finder(user, expiry)),
+    ("trap", "trap_detector", lambda user, expiry, mode: trap_detector(user, expiry)),
+    ("sr", "support_resistance_guard", lambda user, expiry, mode: support_resistance_guard(user, expiry)),
+]
+entry_fusion = FusionExecutor(ENTRY_MODULES)
+
 @app.get("/entry-logic-engine")
 async def entry_logic_engine(user: str, expiry: str, mode: str = Query("adaptive", enum=["strict", "adaptive"])):
     """
     Fuses signals from Bias Identifier, Market Style Identifier, Trap Detector, Reversal Probability Finder, and Support/Resistance Guard
     to produce real-time entry recommendations.
     """
+    return await run_in_tick(user, expiry, f"entry:{mode}", lambda: _entry_logic_engine(user, expiry, mode))
+
+async def _entry_logic_engine(user, expiry, mode):
     now = datetime.utcnow()
     log_entry = {
         "user": user,
@@ -1239,29 +1304,15 @@ async def entry_logic_engine(user: str, expiry: str, mode: str = Query("adaptive
         "conflicts": [],
         "raw_signals": {},
     }
-    # Helper to log and fallback
-    async def safe_call(fn, name, *args, **kwargs):
-        try:
-            return await fn(*args, **kwargs)
-        except Exception as e:
-            tb = traceback.format_exc()
-            log_entry["rejections"].append({"module": name, "error": str(e), "trace": tb})
-            return None
-    # Import endpoints as callables
-    from fastapi import Request
-    # Get app dependency-injected endpoints
-    bias_fn = app.routes[[r.path for r in app.routes].index("/bias-identifier")].endpoint
-    style_fn = app.routes[[r.path for r in app.routes].index("/market-style-identifier")].endpoint
-    reversal_fn = app.routes[[r.path for r in app.routes].index("/reversal-probability-finder")].endpoint
-    trap_fn = app.routes[[r.path for r in app.routes].index("/trap-detector")].endpoint
-    sr_fn = app.routes[[r.path for r in app.routes].index("/support-resistance-guard")].endpoint
-    # Call all modules (serially for now)
-    bias = await safe_call(bias_fn, "bias_identifier", user, expiry)
-    style = await safe_call(style_fn, "market_style_identifier", user, expiry, mode)
-    reversal = await safe_call(reversal_fn, "reversal_probability_finder", user, expiry)
-    trap = await safe_call(trap_fn, "trap_detector", user, expiry)
-    sr = await safe_call(sr_fn, "support_resistance_guard", user, expiry)
+    # All modules at once, each with its deadline; a failed or late module falls back to its last-known-good signal
+    signals, reports = await entry_fusion.run(user, expiry, mode)
+    bias, style, reversal, trap, sr = (signals[name] for name in ("bias", "style", "reversal", "trap", "sr"))
+    log_entry["rejections"] = [report for report in reports.values() if report["status"] != "ok"]
+    log_entry["module_latency_ms"] = {name: report["latency_ms"] for name, report in reports.items()}
     log_entry["raw_signals"] = {"bias": bias, "style": style, "reversal": reversal, "trap": trap, "sr": sr}
+    # Stored once per distinct content; the log documents below reference it by id (see signal_store)
+    signals_ref, signals_doc = signal_document(log_entry["raw_signals"], now)
+    await audit_writer.insert(SIGNALS_COLL, signals_doc)
     # Fallbacks if any module fails
     must_avoid = False
     reasons = []
@@ -1378,6 +1429,16 @@ async def entry_logic_engine(user: str, expiry: str, mode: str = Query("adaptive
     else:
         confidence = "low"
     reason = " ".join(reasons)
+    log_entry["final_decision"] = {
+        "entry_direction": entry_direction,
+        "entry_zone": entry_zone,
+        "confidence": confidence,
+        "reason": reason,
+        "must_avoid": must_avoid,
+        "trade_type": trade_type,
+        "entry_score": round(entry_score, 2),
+        "signals_id": signals_ref,
+    }
     # --- ConfidenceWeightedSizer integration ---
     entry_confidence = entry_score  # float 0-1
     volatility_regime = style["volatility_state"] if style and "volatility_state" in style else None
@@ -1393,7 +1454,7 @@ async def entry_logic_engine(user: str, expiry: str, mode: str = Query("adaptive
         "entry": entry_direction
     }
     entropy = compute_module_entropy(module_preds)
-    anomaly_score = predict_anomaly_score(anomaly_features)
+    anomaly_score = await score("anomaly", dict(zip(feature_names("anomaly"), anomaly_features)))
     # Optionally blend entropy into anomaly score
     blended_score = min(1.0, 0.7 * anomaly_score + 0.3 * entropy)
     anomaly_detected = blended_score >= ANOMALY_THRESHOLD
@@ -1405,8 +1466,9 @@ async def entry_logic_engine(user: str, expiry: str, mode: str = Query("adaptive
         sizer_result = confidence_weighted_sizer(entry_confidence, entry_direction, volatility_regime)
     # --- Auto-Adaptive Trade Sizing ---
     recommended_position_size = auto_adaptive_trade_sizer(entry_confidence, blended_score, market_style)
+    log_entry["final_decision"]["anomaly_score"] = float(blended_score)
     # Log anomaly event
-    db["anomaly_log"].insert_one({
+    await audit_writer.insert("anomaly_log", {
         "timestamp": now,
         "user": user,
         "expiry": expiry,
@@ -1416,13 +1478,13 @@ async def entry_logic_engine(user: str, expiry: str, mode: str = Query("adaptive
         "anomaly_reason": anomaly_reason,
         "features": anomaly_features,
         "module_preds": module_preds,
-        "raw_signals": log_entry["raw_signals"],
+        "signals_id": signals_ref,
         "entry_confidence": entry_confidence,
         "sizer_result": sizer_result,
         "recommended_position_size": recommended_position_size
     })
     # Log sizing decision
-    db["confidence_sizer_logs"].insert_one({
+    await audit_writer.insert("confidence_sizer_logs", {
         "timestamp": datetime.utcnow(),
         "user": user,
         "expiry": expiry,
@@ -1430,14 +1492,16 @@ async def entry_logic_engine(user: str, expiry: str, mode: str = Query("adaptive
         "entry_direction": entry_direction,
         "volatility_regime": volatility_regime,
         **sizer_result,
-        "raw_signals": log_entry["raw_signals"],
+        "signals_id": signals_ref,
         "final_decision": log_entry["final_decision"],
         "recommended_position_size": recommended_position_size
     })
     log_entry["final_decision"].update(sizer_result)
     log_entry["final_decision"]["recommended_position_size"] = recommended_position_size
-    entry_engine_log_col.insert_one(log_entry)
-    db["entry_logic_snapshots"].insert_one({
+    await audit_writer.insert("entry_logic_engine_logs", {
+        **{k: v for k, v in log_entry.items() if k != "raw_signals"}, "signals_id": signals_ref,
+    })
+    await audit_writer.insert("entry_logic_snapshots", {
         **log_entry["final_decision"],
         "user": user,
         "expiry": expiry,
@@ -1445,36 +1509,44 @@ async def entry_logic_engine(user: str, expiry: str, mode: str = Query("adaptive
         "trigger": "entry_decision"
     })
     # ML inference
-    ml_features = [
-        entry_direction, trade_type, entry_score, confidence, must_avoid,
-        entry_zone["zone_type"] if entry_zone else None,
-        entry_zone["confidence"] if entry_zone else None,
-        entry_zone["zone_level"] if entry_zone else None
-    ]
-    try:
-        ml_result = predict_entry_logic(ml_features)
+    # spot_delta is a lookahead outcome in the training export, unknown here and scored as missing
+    ml_features = {
+        "entry_direction": entry_direction,
+        "trade_type": trade_type,
+        "entry_score": entry_score,
+        "confidence": confidence,
+        "must_avoid": must_avoid,
+        "zone_type": entry_zone["zone_type"] if entry_zone else None,
+        "zone_confidence": entry_zone["confidence"] if entry_zone else None,
+    }
+    # --- Meta-Model Feature Vector (anomaly_score is the blended score stored on the snapshot) ---
+    meta_features = {
+        "entry_score": entry_score,
+        "confidence": confidence,
+        "anomaly_score": blended_score,
+        "bias": bias["bias"] if bias else None,
+        "market_style": style["market_style"] if style else None,
+        "trap_call": trap["call"]["trap_detected"] if trap and "call" in trap else None,
+        "reversal_type": reversal["reversal_type"] if reversal else None,
+        "sr_confidence": sr[0]["confidence"] if sr and isinstance(sr, list) and len(sr) > 0 else None,
+    }
+    ml_result, meta_decision = await asyncio.gather(score("entry_logic", ml_features), score("meta", meta_features), return_exceptions=True)
+    if isinstance(ml_result, Exception):
+        ml_pred = None
+        ml_probs = None
+        ml_conf = str(ml_result)
+        ml_version = None
+    else:
         ml_pred = ml_result['predicted']
         ml_probs = ml_result['probabilities']
         ml_conf = ml_result['confidence']
-    except Exception as e:
-        ml_pred = None
-        ml_probs = None
-        ml_conf = str(e)
-    # --- Meta-Model Feature Vector ---
-    meta_features = [
-        entry_score,
-        confidence,
-        blended_score,
-        bias["bias"] if bias else None,
-        style["market_style"] if style else None,
-        trap["call"]["trap_detected"] if trap and "call" in trap else None,
-        reversal["reversal_type"] if reversal else None,
-        sr[0]["confidence"] if sr and isinstance(sr, list) and len(sr) > 0 else None,
-    ]
-    meta_decision = predict_meta_decision(meta_features)
+        ml_version = ml_result['model_version']
+    if isinstance(meta_decision, Exception):
+        raise meta_decision
     # Log meta-model decision
     log_entry["final_decision"]["meta_model_decision"] = meta_decision["should_enter"]
     log_entry["final_decision"]["meta_model_probability"] = meta_decision["probability"]
+    log_entry["final_decision"]["meta_model_version"] = meta_decision["model_version"]
     # --- Auto-Journaling ---
     journal_entry = {
         "timestamp": now,
@@ -1484,10 +1556,11 @@ async def entry_logic_engine(user: str, expiry: str, mode: str = Query("adaptive
         "recommended_position_size": recommended_position_size,
         "meta_model_decision": meta_decision["should_enter"],
         "meta_model_probability": meta_decision["probability"],
+        "meta_model_version": meta_decision["model_version"],
         "must_avoid": must_avoid,
         "reason": reason,
         "outcome": log_entry["final_decision"].get("outcome"),
-        "raw_signals": log_entry["raw_signals"],
+        "signals_id": signals_ref,
         "anomaly_score": float(blended_score),
         "modules_triggered": [
             m for m in ["bias", "reversal", "trap", "meta_model"]
@@ -1497,7 +1570,7 @@ async def entry_logic_engine(user: str, expiry: str, mode: str = Query("adaptive
             or (m == "trap" and (trap_call.get("trap_detected") or trap_put.get("trap_detected")))
         ]
     }
-    db["trade_journal"].insert_one(journal_entry)
+    await audit_writer.insert("trade_journal", journal_entry)
     return {
         "entry_direction": entry_direction,
         "entry_zone": entry_zone,
@@ -1509,6 +1582,7 @@ async def entry_logic_engine(user: str, expiry: str, mode: str = Query("adaptive
         "ml_predicted_entry": ml_pred,
         "ml_probabilities": ml_probs,
         "ml_confidence": ml_conf,
+        "ml_model_version": ml_version,
         "raw_signals": log_entry["raw_signals"],
         "rejections": log_entry["rejections"],
         "conflicts": log_entry["conflicts"],
@@ -1519,6 +1593,7 @@ async def entry_logic_engine(user: str, expiry: str, mode: str = Query("adaptive
         "recommended_position_size": recommended_position_size,
         "meta_model_decision": meta_decision["should_enter"],
         "meta_model_probability": meta_decision["probability"],
+        "meta_model_version": meta_decision["model_version"],
     } 
 
 @app.post("/clear-analytics")
@@ -1534,11 +1609,80 @@ def clear_analytics(user: str, expiry: str):
     db["support_resistance_snapshots"].delete_many({"user": user, "expiry": expiry})
     db["bias_state_history"].delete_many({"user": user, "expiry": expiry})
     db["manual_zones"].delete_many({"user": user, "expiry": expiry})
+    drop_spot_ring(user, expiry)
+    drop_lookback(user, expiry)
+    clear_ticks(user, expiry)
     return {"success": True, "message": "Analytics and rolling data cleared for user/expiry."}
 
-# Serve React build as static files
-frontend_build_path = os.path.join(os.path.dirname(__file__), '../../frontend/build')
-app.mount("/", StaticFiles(directory=frontend_build_path, html=True), name="static") 
+# --- Server-side polling with push to clients ---
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", 15))
+
+# (analytics key sent to the frontend, module endpoint)
+STREAM_MODULES = [
+    ("bias", lambda user, expiry: bias_identifier(user, expiry)),
+    ("style", lambda user, expiry: market_style_identifier(user, expiry, "adaptive")),
+    ("reversal", lambda user, expiry: reversal_probability_finder(user, expiry)),
+    ("trap", lambda user, expiry: trap_detector(user, expiry)),
+    ("sr", lambda user, expiry: support_resistance_guard(user, expiry)),
+    ("entry", lambda user, expiry: entry_logic_engine(user, expiry, "adaptive")),
+]
+
+async def poll_tick(user, expiry):
+    """One poller tick: fetch and ingest the chain, then run every signal module once for all subscribers."""
+    chain = await ingest_option_chain(user, expiry)
+    results = await asyncio.gather(*(module(user, expiry) for _, module in STREAM_MODULES), return_exceptions=True)
+    analytics = {}
+    for (key, _), result in zip(STREAM_MODULES, results):
+        if isinstance(result, Exception):
+            # Clients keep their last value for a module that failed this tick
+            print(f"[Poller] {key} failed for {user}/{expiry}: {getattr(result, 'detail', result)}")
+            continue
+        analytics[key] = result
+    return {"timestamp": current_tick(user, expiry).timestamp, "strikes": chain["strikes"], "analytics": analytics}
+
+@app.get("/stream/option-chain")
+async def stream_option_chain(user: str, expiry: str, request: Request):
+    """
+    Server-Sent Events feed of option chain + analytics for user/expiry.
+    All subscribers of the same user/expiry share one server-side poller.
+    """
+    queue = subscribe(user, expiry, poll_tick)
+
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comment frame keeps proxies from closing an idle stream
+                    yield ": keepalive\n\n"
+        finally:
+            unsubscribe(user, expiry, queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/stream/status")
+def stream_status():
+    return {"pollers": active_pollers(), "audit_writer": audit_writer.stats()}
+
+@app.get("/models")
+def models_status():
+    return {"versions": model_versions(), "rejected": rejected_model_versions()}
+
+@app.get("/ready")
+def ready(response: Response):
+    """Readiness probe: 200 once the startup model load has finished, 503 before."""
+    status = model_load["status"]
+    if status is None:
+        response.status_code = 503
+        return {"ready": False}
+    return {
+        "ready": True,
+        "load_seconds": model_load["seconds"],
+        "versions": model_versions(),
+        "not_loaded": {module: error for module, error in status.items() if error},
+    }
+
 
 # Expose sizer via API
 from fastapi import Body
@@ -1615,193 +1759,10 @@ def extract_anomaly_features(bias, style, trap, reversal, sr, sizer_result, now)
     tod = now.hour * 60 + now.minute
     return [ce_oi, ce_iv, ce_vol, pe_oi, pe_iv, pe_vol, spot_delta, style_enc, sr_prox, trap_mem, bias_conf, trap_conf, reversal_conf, sr_conf, entry_conf, tod]
 
-LOOKAHEAD_MINUTES = int(os.getenv("OUTCOME_LOOKAHEAD_MINUTES", 10))
-PRICE_MOVE_THRESHOLD = float(os.getenv("OUTCOME_PRICE_MOVE_THRESHOLD", 0.1))
-LABELER_SLEEP = int(os.getenv("OUTCOME_LABELER_SLEEP", 60))  # seconds between checks
-
-# --- Outcome Labeling Logic for All Modules ---
-def label_entry_logic_outcomes():
-    entries = list(db["entry_logic_snapshots"].find({"outcome": {"$exists": False}}))
-    for entry in entries:
-        ts = entry["timestamp"]
-        user = entry["user"]
-        expiry = entry["expiry"]
-        direction = entry.get("entry_direction")
-        # Find future price after lookahead
-        future = db["option_chain_snapshots"].find_one({
-            "user": user,
-            "expiry": expiry,
-            "timestamp": {"$gte": ts + timedelta(minutes=LOOKAHEAD_MINUTES)}
-        }, sort=[("timestamp", 1)])
-        spot_now = entry.get("raw_signals", {}).get("bias", {}).get("spot")
-        spot_future = future["strikes"][0].get("underlying_spot_price") if future and future.get("strikes") else None
-        if spot_now is None or spot_future is None:
-            continue
-        # Win if price moves in predicted direction by threshold
-        if direction == "long" and (spot_future - spot_now) > PRICE_MOVE_THRESHOLD:
-            outcome = 1
-        elif direction == "short" and (spot_now - spot_future) > PRICE_MOVE_THRESHOLD:
-            outcome = 1
-        else:
-            outcome = 0
-        db["entry_logic_snapshots"].update_one({"_id": entry["_id"]}, {"$set": {"outcome": outcome}})
-        print(f"[EntryLogic] Labeled {ts} as {'WIN' if outcome else 'LOSS'}")
-
-def label_bias_outcomes():
-    docs = list(db["bias_identifier_snapshots"].find({"outcome": {"$exists": False}}))
-    for doc in docs:
-        ts = doc["timestamp"]
-        user = doc["user"]
-        expiry = doc["expiry"]
-        bias = doc.get("bias")
-        future = db["option_chain_snapshots"].find_one({
-            "user": user,
-            "expiry": expiry,
-            "timestamp": {"$gte": ts + timedelta(minutes=LOOKAHEAD_MINUTES)}
-        }, sort=[("timestamp", 1)])
-        spot_now = doc.get("spot")
-        spot_future = future["strikes"][0].get("underlying_spot_price") if future and future.get("strikes") else None
-        if spot_now is None or spot_future is None:
-            continue
-        # Win if bias matches actual price direction
-        if bias == "Bullish" and (spot_future - spot_now) > PRICE_MOVE_THRESHOLD:
-            outcome = 1
-        elif bias == "Bearish" and (spot_now - spot_future) > PRICE_MOVE_THRESHOLD:
-            outcome = 1
-        elif bias == "Sideways" and abs(spot_future - spot_now) < PRICE_MOVE_THRESHOLD:
-            outcome = 1
-        else:
-            outcome = 0
-        db["bias_identifier_snapshots"].update_one({"_id": doc["_id"]}, {"$set": {"outcome": outcome}})
-        print(f"[Bias] Labeled {ts} as {'WIN' if outcome else 'LOSS'}")
-
-def label_market_style_outcomes():
-    docs = list(db["market_style_snapshots"].find({"outcome": {"$exists": False}}))
-    for doc in docs:
-        ts = doc["timestamp"]
-        user = doc["user"]
-        expiry = doc["expiry"]
-        style = doc.get("market_style")
-        future = db["option_chain_snapshots"].find_one({
-            "user": user,
-            "expiry": expiry,
-            "timestamp": {"$gte": ts + timedelta(minutes=LOOKAHEAD_MINUTES)}
-        }, sort=[("timestamp", 1)])
-        spot_now = doc.get("spot_trend_strength")
-        spot_future = None
-        if future and future.get("strikes"):
-            # Compute realized trend over lookahead
-            spot_start = doc.get("spot_trend_strength")
-            spot_end = future["strikes"][0].get("underlying_spot_price")
-            if spot_start is not None and spot_end is not None:
-                realized_trend = spot_end - spot_start
-                if style and "Trending" in style and abs(realized_trend) > PRICE_MOVE_THRESHOLD:
-                    outcome = 1
-                elif style and "Sideways" in style and abs(realized_trend) < PRICE_MOVE_THRESHOLD:
-                    outcome = 1
-                elif style and "Volatile" in style:
-                    # Volatile: large swings in either direction
-                    outcome = int(abs(realized_trend) > PRICE_MOVE_THRESHOLD * 2)
-                else:
-                    outcome = 0
-                db["market_style_snapshots"].update_one({"_id": doc["_id"]}, {"$set": {"outcome": outcome}})
-                print(f"[MarketStyle] Labeled {ts} as {'WIN' if outcome else 'LOSS'}")
-
-def label_trap_detector_outcomes():
-    docs = list(db["trap_detector_snapshots"].find({"outcome": {"$exists": False}}))
-    for doc in docs:
-        ts = doc["timestamp"]
-        user = doc["user"]
-        expiry = doc["expiry"]
-        call = doc.get("call", {})
-        put = doc.get("put", {})
-        future = db["option_chain_snapshots"].find_one({
-            "user": user,
-            "expiry": expiry,
-            "timestamp": {"$gte": ts + timedelta(minutes=LOOKAHEAD_MINUTES)}
-        }, sort=[("timestamp", 1)])
-        spot_now = None
-        spot_future = None
-        if future and future.get("strikes"):
-            spot_future = future["strikes"][0].get("underlying_spot_price")
-        # Trap win: trap detected and price reverses, or no trap and price continues
-        outcome = 0
-        if call.get("trap_detected"):
-            # If trap detected, price should reverse direction
-            # (for simplicity, just check price moved opposite to prior trend)
-            # Not perfect, but a start
-            outcome = int(spot_future is not None and abs(spot_future) < PRICE_MOVE_THRESHOLD)
-        elif not call.get("trap_detected"):
-            # No trap: price should continue in same direction
-            outcome = int(spot_future is not None and abs(spot_future) > PRICE_MOVE_THRESHOLD)
-        db["trap_detector_snapshots"].update_one({"_id": doc["_id"]}, {"$set": {"outcome": outcome}})
-        print(f"[TrapDetector] Labeled {ts} as {'WIN' if outcome else 'LOSS'}")
-
-def label_reversal_probability_outcomes():
-    docs = list(db["reversal_probability_snapshots"].find({"outcome": {"$exists": False}}))
-    for doc in docs:
-        ts = doc["timestamp"]
-        user = doc["user"]
-        expiry = doc["expiry"]
-        reversal_type = doc.get("reversal_type")
-        future = db["option_chain_snapshots"].find_one({
-            "user": user,
-            "expiry": expiry,
-            "timestamp": {"$gte": ts + timedelta(minutes=LOOKAHEAD_MINUTES)}
-        }, sort=[("timestamp", 1)])
-        spot_now = None
-        spot_future = None
-        if future and future.get("strikes"):
-            spot_future = future["strikes"][0].get("underlying_spot_price")
-        # Win if reversal predicted and price reverses
-        outcome = 0
-        if reversal_type == "bullish" and spot_future is not None and spot_future > PRICE_MOVE_THRESHOLD:
-            outcome = 1
-        elif reversal_type == "bearish" and spot_future is not None and spot_future < -PRICE_MOVE_THRESHOLD:
-            outcome = 1
-        db["reversal_probability_snapshots"].update_one({"_id": doc["_id"]}, {"$set": {"outcome": outcome}})
-        print(f"[Reversal] Labeled {ts} as {'WIN' if outcome else 'LOSS'}")
-
-def label_sr_guard_outcomes():
-    docs = list(db["support_resistance_snapshots"].find({"outcome": {"$exists": False}}))
-    for doc in docs:
-        ts = doc["timestamp"]
-        user = doc["user"]
-        expiry = doc["expiry"]
-        zones = doc.get("zones", [])
-        future = db["option_chain_snapshots"].find_one({
-            "user": user,
-            "expiry": expiry,
-            "timestamp": {"$gte": ts + timedelta(minutes=LOOKAHEAD_MINUTES)}
-        }, sort=[("timestamp", 1)])
-        spot_now = None
-        spot_future = None
-        if future and future.get("strikes"):
-            spot_future = future["strikes"][0].get("underlying_spot_price")
-        # Win if zone prediction matches price behavior at level
-        outcome = 0
-        for z in zones:
-            if z.get("bias_suggestion") == "Bounce" and spot_future is not None and spot_future < PRICE_MOVE_THRESHOLD:
-                outcome = 1
-            elif z.get("bias_suggestion") == "Break" and spot_future is not None and spot_future > PRICE_MOVE_THRESHOLD:
-                outcome = 1
-        db["support_resistance_snapshots"].update_one({"_id": doc["_id"]}, {"$set": {"outcome": outcome}})
-        print(f"[SRGuard] Labeled {ts} as {'WIN' if outcome else 'LOSS'}")
-
-# --- Background Task ---
-def outcome_labeler_loop():
-    while True:
-        label_entry_logic_outcomes()
-        label_bias_outcomes()
-        label_market_style_outcomes()
-        label_trap_detector_outcomes()
-        label_reversal_probability_outcomes()
-        label_sr_guard_outcomes()
-        time.sleep(LABELER_SLEEP)
-
 @app.post("/start-outcome-labeler")
 def start_outcome_labeler(background_tasks: BackgroundTasks):
-    threading.Thread(target=outcome_labeler_loop, daemon=True).start()
+    if not start_labeler(db):
+        return {"status": "Outcome labeler already running."}
     return {"status": "Outcome labeler started in background."}
 
 def auto_adaptive_trade_sizer(entry_confidence, anomaly_score, market_style):
@@ -1813,4 +1774,8 @@ def auto_adaptive_trade_sizer(entry_confidence, anomaly_score, market_style):
     elif entry_confidence < 0.6 or anomaly_score > 0.7:
         return 0.5
     else:
-        return 1.0
\ No newline at end of file
+        return 1.0
+
+# Serve React build as static files (mounted last: a catch-all mount shadows every route registered after it)
+frontend_build_path = os.path.join(os.path.dirname(__file__), '../../frontend/build')
+app.mount("/", StaticFiles(directory=frontend_build_path, html=True), name="static")
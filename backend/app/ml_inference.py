@@ -1,6 +1,13 @@
-import joblib
 import numpy as np
 import os
+from concurrent.futures import ThreadPoolExecutor
+try:
+    from .feature_schema import encode_rows
+    from .model_registry import get_model, served_versions, rejected_versions
+except ImportError:
+    # Imported as a top-level module by the scripts in this folder (paper_trading_engine.py)
+    from feature_schema import encode_rows
+    from model_registry import get_model, served_versions, rejected_versions
 
 MODEL_PATHS = {
     'bias': 'ml_models/bias_identifier_model.pkl',
@@ -9,143 +16,150 @@ MODEL_PATHS = {
     'reversal': 'ml_models/reversal_probability_model.pkl',
     'sr': 'ml_models/support_resistance_model.pkl',
     'entry_logic': 'ml_models/entry_logic_model.pkl',
+    'meta': 'ml_models/meta_model.pkl',
 }
+ANOMALY_MODEL_PATH = os.getenv("ANOMALY_MODEL_PATH", "ml_models/anomaly_detector.pkl")
+# Threads loading models at startup; 0 = one per model
+MODEL_LOAD_THREADS = int(os.getenv("MODEL_LOAD_THREADS", 0))
 
-# Class labels for each module (must match training order)
-BIAS_CLASSES = ['Bullish', 'Bearish', 'Sideways']
-STYLE_CLASSES = ['Trending', 'Sideways', 'Volatile']
+# Class labels for each module (must match training order: the scripts train on feature_schema.encode_labels codes)
+BIAS_CLASSES = ['Bearish', 'Bullish', 'Sideways']
+STYLE_CLASSES = ['Sideways', 'Trending', 'Volatile']
 TRAP_CLASSES = [0, 1]  # 0 = not trap, 1 = true trap
 REVERSAL_CLASSES = [0, 1]  # 0 = no reversal, 1 = true reversal
-SR_CLASSES = ['Bounce', 'Break', 'Trap', 'Other']
+SR_CLASSES = ['Bounce', 'Break', 'Other', 'Trap']
 ENTRY_CLASSES = [0, 1]  # 0 = incorrect, 1 = correct
 
-_model_cache = {}
+# Class labels per model, used to shape predict_proba output
+MODEL_CLASSES = {
+    'bias': BIAS_CLASSES,
+    'market_style': STYLE_CLASSES,
+    'trap': TRAP_CLASSES,
+    'reversal': REVERSAL_CLASSES,
+    'sr': SR_CLASSES,
+    'entry_logic': ENTRY_CLASSES,
+}
+
+def load_versioned_model(module):
+    """
+    (model, version) served for `module`; model_registry swaps in newly published versions that fit the
+    module's feature_schema encoding.
+    """
+    return get_model(ANOMALY_MODEL_PATH if module == 'anomaly' else MODEL_PATHS[module], schema=module)
 
 def load_model(module):
-    if module in _model_cache:
-        return _model_cache[module]
-    path = MODEL_PATHS[module]
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"Model file not found: {path}")
-    model = joblib.load(path)
-    _model_cache[module] = model
-    return model
+    return load_versioned_model(module)[0]
 
-def predict_bias(features):
-    model = load_model('bias')
-    X = np.array([features])
-    probs = model.predict_proba(X)[0]
-    idx = np.argmax(probs)
+def model_versions():
+    """{module: version} of every model this process has loaded."""
+    served = served_versions()
+    paths = {**MODEL_PATHS, 'anomaly': ANOMALY_MODEL_PATH}
+    return {module: served[path] for module, path in paths.items() if path in served}
+
+def rejected_model_versions():
+    """{module: reason} for every module whose newest published version was refused by the serving schema check."""
+    rejected = rejected_versions()
+    paths = {**MODEL_PATHS, 'anomaly': ANOMALY_MODEL_PATH}
+    return {module: rejected[path] for module, path in paths.items() if path in rejected}
+
+def _preload(module):
+    try:
+        load_model(module)
+        return None
+    except Exception as e:
+        return str(e)
+
+def preload_models(workers=None):
+    """
+    Loads every model that exists on disk concurrently, so no request pays the joblib.load.
+    Returns {module: error or None}.
+    """
+    modules = list(MODEL_PATHS) + ['anomaly']
+    workers = workers or MODEL_LOAD_THREADS or len(modules)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="model-load") as pool:
+        return dict(zip(modules, pool.map(_preload, modules)))
+
+def format_prediction(module, probs, version=None):
+    classes = MODEL_CLASSES[module]
+    idx = int(np.argmax(probs))
+    if isinstance(classes[0], str):
+        probabilities = dict(zip(classes, (float(p) for p in probs)))
+        predicted = classes[idx]
+    else:
+        probabilities = {str(k): float(v) for k, v in zip(classes, probs)}
+        predicted = int(classes[idx])
     return {
-        'predicted': BIAS_CLASSES[idx],
-        'probabilities': dict(zip(BIAS_CLASSES, probs)),
-        'confidence': float(probs[idx])
+        'predicted': predicted,
+        'probabilities': probabilities,
+        'confidence': float(probs[idx]),
+        'model_version': version,
     }
 
+def predict_batch(module, X):
+    """Scores a float32 matrix (rows encoded with feature_schema) in one predict_proba call."""
+    model, version = load_versioned_model(module)
+    probs = model.predict_proba(X)
+    return [format_prediction(module, p, version) for p in probs]
+
+def predict_bias(features):
+    return predict_batch('bias', encode_rows('bias', [features]))[0]
+
 def predict_market_style(features):
-    model = load_model('market_style')
-    X = np.array([features])
-    probs = model.predict_proba(X)[0]
-    idx = np.argmax(probs)
-    return {
-        'predicted': STYLE_CLASSES[idx],
-        'probabilities': dict(zip(STYLE_CLASSES, probs)),
-        'confidence': float(probs[idx])
-    }
+    return predict_batch('market_style', encode_rows('market_style', [features]))[0]
 
 def predict_trap(features):
-    model = load_model('trap')
-    X = np.array([features])
-    probs = model.predict_proba(X)[0]
-    idx = np.argmax(probs)
-    return {
-        'predicted': int(TRAP_CLASSES[idx]),
-        'probabilities': {str(k): float(v) for k, v in zip(TRAP_CLASSES, probs)},
-        'confidence': float(probs[idx])
-    }
+    return predict_batch('trap', encode_rows('trap', [features]))[0]
 
 def predict_reversal(features):
-    model = load_model('reversal')
-    X = np.array([features])
-    probs = model.predict_proba(X)[0]
-    idx = np.argmax(probs)
-    return {
-        'predicted': int(REVERSAL_CLASSES[idx]),
-        'probabilities': {str(k): float(v) for k, v in zip(REVERSAL_CLASSES, probs)},
-        'confidence': float(probs[idx])
-    }
+    return predict_batch('reversal', encode_rows('reversal', [features]))[0]
 
 def predict_sr(features):
-    model = load_model('sr')
-    X = np.array([features])
-    probs = model.predict_proba(X)[0]
-    idx = np.argmax(probs)
-    return {
-        'predicted': SR_CLASSES[idx],
-        'probabilities': dict(zip(SR_CLASSES, probs)),
-        'confidence': float(probs[idx])
-    }
+    return predict_batch('sr', encode_rows('sr', [features]))[0]
 
 def predict_entry_logic(features):
-    model = load_model('entry_logic')
-    X = np.array([features])
-    probs = model.predict_proba(X)[0]
-    idx = np.argmax(probs)
-    return {
-        'predicted': int(ENTRY_CLASSES[idx]),
-        'probabilities': {str(k): float(v) for k, v in zip(ENTRY_CLASSES, probs)},
-        'confidence': float(probs[idx])
-    }
-
-ANOMALY_MODEL_PATH = os.getenv("ANOMALY_MODEL_PATH", "ml_models/anomaly_detector.pkl")
-_anomaly_model_cache = None
+    return predict_batch('entry_logic', encode_rows('entry_logic', [features]))[0]
 
 def load_anomaly_model():
-    global _anomaly_model_cache
-    if _anomaly_model_cache is not None:
-        return _anomaly_model_cache
-    if not os.path.exists(ANOMALY_MODEL_PATH):
-        raise FileNotFoundError(f"Anomaly model file not found: {ANOMALY_MODEL_PATH}")
-    model = joblib.load(ANOMALY_MODEL_PATH)
-    _anomaly_model_cache = model
-    return model
+    return load_model('anomaly')
 
-def predict_anomaly_score(features):
+def anomaly_scores(X):
     """
-    Returns a normalized anomaly score (0-1) for the given feature vector using the loaded anomaly model.
+    Normalized anomaly scores (0-1) for a float32 matrix of anomaly feature rows.
     Supports Isolation Forest, One-Class SVM, or Autoencoder (sklearn/keras).
     """
     model = load_anomaly_model()
-    X = np.array([features])
     # Isolation Forest/One-Class SVM: decision_function or score_samples
     if hasattr(model, "decision_function"):
         # Higher = more normal, lower = more anomalous
-        score = -model.decision_function(X)[0]
+        scores = -model.decision_function(X)
     elif hasattr(model, "score_samples"):
-        score = -model.score_samples(X)[0]
+        scores = -model.score_samples(X)
     elif hasattr(model, "predict") and hasattr(model, "predict_proba"):
         # For probabilistic models
-        score = 1.0 - model.predict_proba(X)[0, 1]
+        scores = 1.0 - model.predict_proba(X)[:, 1]
     elif hasattr(model, "predict"):
         # For keras autoencoder: use reconstruction error
         recon = model.predict(X)
-        score = float(np.mean((X - recon) ** 2))
+        scores = np.mean((X - recon) ** 2, axis=1)
     else:
         raise ValueError("Unsupported anomaly model type.")
     # Normalize score to 0-1 (simple min-max, can be improved with calibration)
-    score = max(0.0, min(1.0, float(score)))
-    return score 
+    return [max(0.0, min(1.0, float(score))) for score in scores]
+
+def predict_anomaly_score(features):
+    return anomaly_scores(encode_rows('anomaly', [features]))[0]
 
 def load_meta_model():
-    path = "ml_models/meta_model.pkl"
-    if not os.path.exists(path):
-        raise FileNotFoundError("Meta-model not found.")
-    return joblib.load(path)
+    return load_model('meta')
+
+def meta_decisions(X):
+    model, version = load_versioned_model('meta')
+    preds = model.predict(X)
+    probs = model.predict_proba(X)[:, 1]
+    return [
+        {"should_enter": bool(pred), "probability": float(prob), "model_version": version}
+        for pred, prob in zip(preds, probs)
+    ]
 
 def predict_meta_decision(features):
-    model = load_meta_model()
-    import numpy as np
-    X = np.array([features])
-    pred = model.predict(X)[0]
-    prob = model.predict_proba(X)[0][1]
-    return {"should_enter": bool(pred), "probability": float(prob)} 
\ No newline at end of file
+    return meta_decisions(encode_rows('meta', [features]))[0]
@@ -0,0 +1,245 @@
+"""
+Versioned model artifacts with atomic publish and hot reload.
+
+Every trained model is published as an immutable version next to its usual path:
+
+    ml_models/bias_identifier_model.pkl                                 current version (hard link)
+    ml_models/versions/bias_identifier_model/20240102T101500123456.pkl  one file per published version
+    ml_models/versions/bias_identifier_model/CURRENT.json               {"version": ..., "file": ..., metadata}
+
+A version file is written under a temporary name and renamed into place, and CURRENT.json is replaced only
+after it, so a reader never sees a half-written pickle. The serving side keeps the loaded models in a dict
+that a watcher thread refreshes when CURRENT.json changes: the new version is loaded off to the side and
+swapped in with one assignment, so requests keep scoring on the old one until then and never wait on a load.
+Models saved before the registry existed (no CURRENT.json) are served from their path as version "legacy-<mtime>".
+
+A model published or served for a feature_schema model must fit it: as many features as SCHEMAS encodes and
+the classes of LABELS. publish_model refuses one that does not, and a reload keeps the version already served.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+import traceback
+from datetime import datetime
+import joblib
+try:
+    from .feature_schema import SCHEMAS, LABELS
+except ImportError:
+    # Imported as a top-level module by the scripts in this folder (learning_loop.py)
+    from feature_schema import SCHEMAS, LABELS
+
+# Published versions kept per model (the current one is never pruned)
+MODEL_KEEP_VERSIONS = int(os.getenv("MODEL_KEEP_VERSIONS", 5))
+# Seconds between checks of CURRENT.json by the serving process
+MODEL_RELOAD_SECONDS = float(os.getenv("MODEL_RELOAD_SECONDS", 5))
+# joblib mmap_mode for loading versions: numpy arrays stay in the page cache instead of being copied (""=off)
+MODEL_MMAP_MODE = os.getenv("MODEL_MMAP_MODE", "r") or None
+CURRENT_FILE = "CURRENT.json"
+
+
+def versions_dir(path):
+    directory, filename = os.path.split(path)
+    return os.path.join(directory, "versions", os.path.splitext(filename)[0])
+
+
+def _current_file(path):
+    return os.path.join(versions_dir(path), CURRENT_FILE)
+
+
+def _write_atomic(target, write):
+    tmp = target + ".tmp"
+    with open(tmp, "wb") as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, target)
+
+
+def list_versions(path):
+    """Published versions of the model at `path`, oldest first."""
+    directory = versions_dir(path)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[:-4] for name in os.listdir(directory) if name.endswith(".pkl"))
+
+
+def current_version(path):
+    """The CURRENT.json record of the model at `path`, or None if it was never published."""
+    try:
+        with open(_current_file(path)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def activate(path, version, **metadata):
+    """Makes an already published `version` the current one (publish does this; also used to roll back)."""
+    directory = versions_dir(path)
+    artifact = os.path.join(directory, version + ".pkl")
+    if not os.path.exists(artifact):
+        raise FileNotFoundError(f"Model version not found: {artifact}")
+    # Keep the plain path loadable for anything that reads it directly (it is only ever swapped, never rewritten)
+    tmp = path + ".tmp"
+    if os.path.lexists(tmp):
+        os.remove(tmp)
+    try:
+        os.link(artifact, tmp)
+    except OSError:
+        shutil.copyfile(artifact, tmp)
+    os.replace(tmp, path)
+    record = {"version": version, "file": artifact, "activated_at": datetime.utcnow().isoformat(), **metadata}
+    _write_atomic(_current_file(path), lambda f: f.write(json.dumps(record, default=str).encode()))
+    return record
+
+
+def schema_mismatch(model, schema):
+    """Why `model` cannot serve feature_schema model `schema`, or None when it fits (or `schema` is not one)."""
+    if schema not in SCHEMAS:
+        return None
+    n_features = getattr(model, "n_features_in_", None)
+    if n_features is not None and n_features != len(SCHEMAS[schema]):
+        return f"{n_features} features, {schema} serving encodes {len(SCHEMAS[schema])}"
+    if schema in LABELS and hasattr(model, "classes_"):
+        vocab = LABELS[schema][1]
+        expected = list(range(len(vocab) if vocab else 2))
+        if list(model.classes_) != expected:
+            return f"classes {list(model.classes_)}, {schema} serving expects {expected}"
+    return None
+
+
+def publish_model(model, path, keep=None, schema=None, **metadata):
+    """
+    Writes `model` as a new version of the model at `path` and makes it current. Returns the version.
+    Raises ValueError, publishing nothing, if it does not fit feature_schema model `schema`.
+    """
+    mismatch = schema_mismatch(model, schema)
+    if mismatch:
+        raise ValueError(f"Refusing to publish {path}: {mismatch}")
+    if schema is not None:
+        metadata["schema"] = schema
+    directory = versions_dir(path)
+    os.makedirs(directory, exist_ok=True)
+    version = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    _write_atomic(os.path.join(directory, version + ".pkl"), lambda f: joblib.dump(model, f))
+    activate(path, version, published_at=datetime.utcnow().isoformat(), **metadata)
+    for old in list_versions(path)[:-(keep or MODEL_KEEP_VERSIONS)]:
+        if old != version:
+            os.remove(os.path.join(directory, old + ".pkl"))
+    print(f"[Models] Published {path} version {version}")
+    return version
+
+
+# --- Serving side: {path: (model, version, stamp)} ---
+_loaded = {}
+# feature_schema model each path is served for, and {path: (stamp, reason)} of the reloads refused
+_schemas = {}
+_rejected = {}
+# One lock per path, so different models load in parallel and a model is never loaded twice
+_path_locks = {}
+_path_locks_guard = threading.Lock()
+
+
+def _stamp(path):
+    # What a reload compares: CURRENT.json once published, the plain file for legacy models
+    for candidate in (_current_file(path), path):
+        try:
+            st = os.stat(candidate)
+            return candidate, st.st_mtime_ns, st.st_size, st.st_ino
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def _load(path):
+    stamp = _stamp(path)
+    if stamp is None:
+        raise FileNotFoundError(f"Model file not found: {path}")
+    record = current_version(path)
+    if record is not None:
+        # Version files are immutable, so mapping them is safe
+        model, version = joblib.load(record["file"], mmap_mode=MODEL_MMAP_MODE), record["version"]
+    else:
+        model, version = joblib.load(path), f"legacy-{datetime.utcfromtimestamp(stamp[1] / 1e9):%Y%m%dT%H%M%S}"
+    schema = _schemas.get(path) or (record or {}).get("schema")
+    mismatch = schema_mismatch(model, schema)
+    if mismatch:
+        raise ValueError(f"{path} version {version} does not fit the serving schema: {mismatch}")
+    return model, version, stamp
+
+
+def get_model(path, schema=None):
+    """
+    (model, version) currently served for `path`; loaded on first use, then refreshed by the watcher.
+    `schema` names the feature_schema model it serves, which every version loaded must fit.
+    """
+    if schema is not None:
+        _schemas[path] = schema
+    entry = _loaded.get(path)
+    if entry is None:
+        with _path_locks_guard:
+            lock = _path_locks.setdefault(path, threading.Lock())
+        with lock:
+            entry = _loaded.get(path)
+            if entry is None:
+                entry = _load(path)
+                _loaded[path] = entry
+    return entry[0], entry[1]
+
+
+def served_versions():
+    return {path: entry[1] for path, entry in _loaded.items()}
+
+
+def rejected_versions():
+    """{path: reason} for every model whose latest version was refused, so an older one is still served."""
+    return {path: reason for path, (_, reason) in _rejected.items()}
+
+
+def refresh_models():
+    """Reloads every served model whose current version changed. Returns {path: new version}."""
+    swapped = {}
+    for path, (_, version, stamp) in list(_loaded.items()):
+        latest = _stamp(path)
+        # Unchanged, or a change already refused (retried once it changes again)
+        if latest == stamp or (path in _rejected and _rejected[path][0] == latest):
+            continue
+        try:
+            entry = _load(path)
+        except Exception as e:
+            # Keep serving the version already loaded
+            _rejected[path] = (latest, str(e))
+            print(f"[Models] Reload of {path} failed, still serving {version}: {e}")
+            continue
+        _rejected.pop(path, None)
+        _loaded[path] = entry
+        if entry[1] != version:
+            swapped[path] = entry[1]
+            print(f"[Models] {path}: {version} -> {entry[1]}")
+    return swapped
+
+
+# --- Watcher thread (one per process) ---
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+def _watch_loop():
+    while True:
+        time.sleep(MODEL_RELOAD_SECONDS)
+        try:
+            refresh_models()
+        except Exception:
+            traceback.print_exc()
+
+
+def start_watcher():
+    """Starts the hot-reload thread unless it is already running. Returns True if this call started it."""
+    global _watcher
+    with _watcher_lock:
+        if _watcher is not None and _watcher.is_alive():
+            return False
+        _watcher = threading.Thread(target=_watch_loop, name="model-watcher", daemon=True)
+        _watcher.start()
+        return True
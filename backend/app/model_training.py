@@ -0,0 +1,207 @@
+"""
+Trains the module models from the Parquet datasets written by dataset_export.
+
+Every model is one entry in TRAINERS. train_all fits them concurrently in a process pool sized to the cores,
+giving each fit an equal share of them as n_jobs; every worker memory-maps its module's dataset once. Each run
+appends the per-module report to the module's training log and one consolidated record (timings and metrics
+for every model) to ml_logs/training_report.jsonl.
+
+    python train_all_models.py                     # every model, from the repo root
+    python train_all_models.py bias trap --workers 2
+    python train_bias_model.py                     # one model
+    python -m backend.app.model_training           # same as train_all_models.py
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+try:
+    from .dataset_store import load_dataset
+    from .feature_schema import encode_frame, encode_labels
+    from .model_registry import publish_model
+except ImportError:
+    # Imported as a top-level module by the scripts in this folder (train_meta_model.py)
+    from dataset_store import load_dataset
+    from feature_schema import encode_frame, encode_labels
+    from model_registry import publish_model
+
+# Parallel fits; 0 = one per model, capped at the core count
+TRAIN_WORKERS = int(os.getenv("TRAIN_WORKERS", 0))
+REPORT_LOG = "ml_logs/training_report.jsonl"
+
+
+def random_forest(n_jobs):
+    from sklearn.ensemble import RandomForestClassifier
+    return RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=n_jobs)
+
+
+def xgboost_meta(n_jobs):
+    import xgboost as xgb
+    return xgb.XGBClassifier(n_estimators=100, max_depth=4, use_label_encoder=False, eval_metric="logloss", n_jobs=n_jobs)
+
+
+# Per model: output pickle, training log (None = no log), title for the log, estimator factory(n_jobs), held-out
+# test fraction (None = fit on everything, as the meta-model always has) and whether to report ROC-AUC.
+TRAINERS = {
+    "bias": {
+        "model": "ml_models/bias_identifier_model.pkl", "log": "ml_logs/bias_training.log",
+        "title": "Bias Identifier", "estimator": random_forest, "test_size": 0.2, "roc": False,
+    },
+    "market_style": {
+        "model": "ml_models/market_style_model.pkl", "log": "ml_logs/market_style_training.log",
+        "title": "Market Style Identifier", "estimator": random_forest, "test_size": 0.2, "roc": False,
+    },
+    "reversal": {
+        "model": "ml_models/reversal_probability_model.pkl", "log": "ml_logs/reversal_training.log",
+        "title": "Reversal Probability Finder", "estimator": random_forest, "test_size": 0.2, "roc": True,
+    },
+    "sr": {
+        "model": "ml_models/support_resistance_model.pkl", "log": "ml_logs/sr_training.log",
+        "title": "Support/Resistance Guard", "estimator": random_forest, "test_size": 0.2, "roc": False,
+    },
+    "trap": {
+        "model": "ml_models/trap_detector_model.pkl", "log": "ml_logs/trap_training.log",
+        "title": "Trap Detector", "estimator": random_forest, "test_size": 0.2, "roc": True,
+    },
+    "entry_logic": {
+        "model": "ml_models/entry_logic_model.pkl", "log": "ml_logs/entry_logic_training.log",
+        "title": "Entry Logic Engine", "estimator": random_forest, "test_size": 0.2, "roc": True,
+    },
+    "meta": {
+        "model": "ml_models/meta_model.pkl", "log": None,
+        "title": "Meta-model", "estimator": xgboost_meta, "test_size": None, "roc": False,
+    },
+}
+
+
+def train_model(name, n_jobs=-1):
+    """Loads, fits, evaluates and saves one model. Returns its report record (timings in seconds)."""
+    from sklearn.metrics import classification_report, roc_auc_score
+    from sklearn.model_selection import train_test_split
+
+    spec = TRAINERS[name]
+    record = {"module": name, "n_jobs": n_jobs}
+    t0 = time.perf_counter()
+    df = load_dataset(name)
+    X, y = encode_frame(df, name), encode_labels(df, name)
+    del df
+    record["rows"] = len(y)
+    t1 = time.perf_counter()
+    clf = spec["estimator"](n_jobs)
+    report = None
+    if spec["test_size"]:
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=spec["test_size"], random_state=42)
+        clf.fit(X_train, y_train)
+        t2 = time.perf_counter()
+        y_pred = clf.predict(X_test)
+        report = classification_report(y_test, y_pred)
+        summary = classification_report(y_test, y_pred, output_dict=True)
+        record["accuracy"] = summary["accuracy"]
+        record["macro_f1"] = summary["macro avg"]["f1-score"]
+        if spec["roc"]:
+            record["roc_auc"] = roc_auc_score(y_test, clf.predict_proba(X_test)[:, 1])
+    else:
+        clf.fit(X, y)
+        t2 = time.perf_counter()
+    metrics = {k: record[k] for k in ("rows", "accuracy", "macro_f1", "roc_auc") if k in record}
+    record["version"] = publish_model(clf, spec["model"], schema=name, module=name, source="model_training", **metrics)
+    t3 = time.perf_counter()
+    record.update(load_s=t1 - t0, fit_s=t2 - t1, eval_save_s=t3 - t2, total_s=t3 - t0)
+
+    if spec["log"] and report is not None:
+        os.makedirs(os.path.dirname(spec["log"]), exist_ok=True)
+        with open(spec["log"], "a") as f:
+            f.write(f"[{datetime.now()}] Training run for {spec['title']}\n")
+            f.write(report + (f"\nROC-AUC: {record['roc_auc']}\n" if "roc_auc" in record else "\n"))
+            f.write(f"Model saved to {spec['model']} (version {record['version']})\n\n")
+    record["report"] = report
+    return record
+
+
+def _train_safely(name, n_jobs):
+    # One failing model (e.g. no dataset yet) must not take the rest of the pool down
+    try:
+        return train_model(name, n_jobs)
+    except Exception as e:
+        traceback.print_exc()
+        return {"module": name, "n_jobs": n_jobs, "error": f"{type(e).__name__}: {e}"}
+
+
+def pool_size(count, workers=None):
+    """(parallel fits, n_jobs per fit) for `count` models on this machine."""
+    cores = os.cpu_count() or 1
+    workers = min(count, workers or TRAIN_WORKERS or cores, cores)
+    return max(1, workers), max(1, cores // max(1, workers))
+
+
+def train_all(names=None, workers=None):
+    """Fits `names` (default: every model) concurrently. Returns their report records in the order of `names`."""
+    names = names or list(TRAINERS)
+    workers, n_jobs = pool_size(len(names), workers)
+    records = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_train_safely, name, n_jobs): name for name in names}
+        for fut in as_completed(futures):
+            record = fut.result()
+            records[record["module"]] = record
+            status = record.get("error") or f"{record['rows']} rows in {record['total_s']:.1f}s"
+            print(f"[Train] {record['module']}: {status}")
+    return [records[name] for name in names]
+
+
+def format_report(records, wall_s):
+    lines = [f"{'module':<14}{'rows':>9}{'jobs':>6}{'load s':>9}{'fit s':>9}{'total s':>9}{'acc':>8}{'f1':>8}{'roc':>8}"]
+    for r in records:
+        if "error" in r:
+            lines.append(f"{r['module']:<14}  failed: {r['error']}")
+            continue
+        metric = lambda k: f"{r[k]:>8.3f}" if k in r else f"{'-':>8}"
+        lines.append(
+            f"{r['module']:<14}{r['rows']:>9}{r['n_jobs']:>6}{r['load_s']:>9.2f}{r['fit_s']:>9.2f}{r['total_s']:>9.2f}"
+            f"{metric('accuracy')}{metric('macro_f1')}{metric('roc_auc')}"
+        )
+    serial = sum(r.get("total_s", 0) for r in records)
+    lines.append(f"wall clock {wall_s:.1f}s (sum of per-model times {serial:.1f}s)")
+    return "\n".join(lines)
+
+
+def run_training(names=None, workers=None):
+    """Script entry point: trains, prints the consolidated report and appends it to REPORT_LOG."""
+    t0 = time.perf_counter()
+    if names and len(names) == 1:
+        # A single model gets every core in-process
+        records = [_train_safely(names[0], -1)]
+    else:
+        records = train_all(names, workers)
+    wall_s = time.perf_counter() - t0
+    for r in records:
+        if r.get("report"):
+            print(f"--- {TRAINERS[r['module']]['title']} ---\n{r['report']}")
+    print(format_report(records, wall_s))
+    os.makedirs(os.path.dirname(REPORT_LOG), exist_ok=True)
+    with open(REPORT_LOG, "a") as f:
+        f.write(json.dumps({
+            "timestamp": datetime.now().isoformat(),
+            "wall_s": wall_s,
+            "models": [{k: v for k, v in r.items() if k != "report"} for r in records],
+        }) + "\n")
+    return all("error" not in r for r in records)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser()
+    ap.add_argument("modules", nargs="*", help=f"any of {', '.join(TRAINERS)} (default: all)")
+    ap.add_argument("--workers", type=int, default=None, help="parallel fits (default: one per model, up to the cores)")
+    args = ap.parse_args(argv)
+    unknown = sorted(set(args.modules) - set(TRAINERS))
+    if unknown:
+        ap.error(f"unknown module(s): {', '.join(unknown)}")
+    return 0 if run_training(args.modules or None, args.workers) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
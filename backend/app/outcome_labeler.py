@@ -0,0 +1,235 @@
+import os
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from .chain_store import future_aggregates
+from .signal_store import signal_paths, resolve_signals
+
+LOOKAHEAD_MINUTES = int(os.getenv("OUTCOME_LOOKAHEAD_MINUTES", 10))
+PRICE_MOVE_THRESHOLD = float(os.getenv("OUTCOME_PRICE_MOVE_THRESHOLD", 0.1))
+LABELER_SLEEP = int(os.getenv("OUTCOME_LABELER_SLEEP", 60))  # seconds between checks
+# Snapshots joined and written per round trip
+LABELER_BATCH = int(os.getenv("OUTCOME_LABELER_BATCH", 500))
+# Extra wait past the lookahead so the tick closing a window has been ingested before we look for it
+LABELER_GRACE_SECONDS = int(os.getenv("OUTCOME_LABELER_GRACE_SECONDS", 30))
+# One document per labeler: {_id: log name, watermark: snapshot timestamp everything up to has been processed}
+LABELER_STATE_COLL = "labeler_state"
+
+
+# --- Outcome rules: (snapshot, future spot) -> 1/0, or None when the snapshot cannot be labeled ---
+def entry_logic_outcome(doc, spot_future):
+    direction = doc.get("entry_direction")
+    spot_now = doc.get("raw_signals", {}).get("bias", {}).get("spot")
+    if spot_now is None or spot_future is None:
+        return None
+    # Win if price moves in predicted direction by threshold
+    if direction == "long" and (spot_future - spot_now) > PRICE_MOVE_THRESHOLD:
+        return 1
+    if direction == "short" and (spot_now - spot_future) > PRICE_MOVE_THRESHOLD:
+        return 1
+    return 0
+
+
+def bias_outcome(doc, spot_future):
+    bias = doc.get("bias")
+    spot_now = doc.get("spot")
+    if spot_now is None or spot_future is None:
+        return None
+    # Win if bias matches actual price direction
+    if bias == "Bullish" and (spot_future - spot_now) > PRICE_MOVE_THRESHOLD:
+        return 1
+    if bias == "Bearish" and (spot_now - spot_future) > PRICE_MOVE_THRESHOLD:
+        return 1
+    if bias == "Sideways" and abs(spot_future - spot_now) < PRICE_MOVE_THRESHOLD:
+        return 1
+    return 0
+
+
+def market_style_outcome(doc, spot_future):
+    style = doc.get("market_style")
+    spot_start = doc.get("spot_trend_strength")
+    if spot_start is None or spot_future is None:
+        return None
+    # Compute realized trend over lookahead
+    realized_trend = spot_future - spot_start
+    if style and "Trending" in style and abs(realized_trend) > PRICE_MOVE_THRESHOLD:
+        return 1
+    if style and "Sideways" in style and abs(realized_trend) < PRICE_MOVE_THRESHOLD:
+        return 1
+    if style and "Volatile" in style:
+        # Volatile: large swings in either direction
+        return int(abs(realized_trend) > PRICE_MOVE_THRESHOLD * 2)
+    return 0
+
+
+def trap_detector_outcome(doc, spot_future):
+    if spot_future is None:
+        return None
+    # Trap win: trap detected and price reverses, or no trap and price continues
+    if doc.get("call", {}).get("trap_detected"):
+        return int(abs(spot_future) < PRICE_MOVE_THRESHOLD)
+    return int(abs(spot_future) > PRICE_MOVE_THRESHOLD)
+
+
+def reversal_probability_outcome(doc, spot_future):
+    if spot_future is None:
+        return None
+    # Win if reversal predicted and price reverses
+    reversal_type = doc.get("reversal_type")
+    if reversal_type == "bullish" and spot_future > PRICE_MOVE_THRESHOLD:
+        return 1
+    if reversal_type == "bearish" and spot_future < -PRICE_MOVE_THRESHOLD:
+        return 1
+    return 0
+
+
+def sr_guard_outcome(doc, spot_future):
+    if spot_future is None:
+        return None
+    # Win if zone prediction matches price behavior at level
+    outcome = 0
+    for z in doc.get("zones", []):
+        if z.get("bias_suggestion") == "Bounce" and spot_future < PRICE_MOVE_THRESHOLD:
+            outcome = 1
+        elif z.get("bias_suggestion") == "Break" and spot_future > PRICE_MOVE_THRESHOLD:
+            outcome = 1
+    return outcome
+
+
+# (log name, snapshot collection, fields the rule reads, rule)
+LABELERS = [
+    ("EntryLogic", "entry_logic_snapshots", ["entry_direction", "raw_signals.bias.spot"], entry_logic_outcome),
+    ("Bias", "bias_identifier_snapshots", ["bias", "spot"], bias_outcome),
+    ("MarketStyle", "market_style_snapshots", ["market_style", "spot_trend_strength"], market_style_outcome),
+    ("TrapDetector", "trap_detector_snapshots", ["call.trap_detected"], trap_detector_outcome),
+    ("Reversal", "reversal_probability_snapshots", ["reversal_type"], reversal_probability_outcome),
+    ("SRGuard", "support_resistance_snapshots", ["zones.bias_suggestion"], sr_guard_outcome),
+]
+
+
+def ensure_labeler_indexes(db):
+    for _, coll, _, _ in LABELERS:
+        db[coll].create_index("timestamp")
+
+
+def get_watermark(db, name):
+    doc = db[LABELER_STATE_COLL].find_one({"_id": name})
+    return doc.get("watermark") if doc else None
+
+
+def set_watermark(db, name, ts):
+    db[LABELER_STATE_COLL].update_one(
+        {"_id": name},
+        {"$max": {"watermark": ts}, "$set": {"updated_at": datetime.utcnow()}},
+        upsert=True,
+    )
+
+
+def future_spots(db, user, expiry, targets):
+    """Spot of the first aggregate at or after each of `targets` (None once the series runs out)."""
+    return [tick.get("spot") if tick else None for tick in future_aggregates(db, user, expiry, targets)]
+
+
+def _chunks(docs, size):
+    chunk = []
+    for doc in docs:
+        chunk.append(doc)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def label_collection(db, name, coll, fields, rule, now=None, lookahead_minutes=LOOKAHEAD_MINUTES):
+    """
+    Labels the snapshots of `coll` between the labeler's watermark and the point where the lookahead window
+    (plus grace) has fully elapsed, then advances the watermark there. Each chunk is joined against the
+    spot series per user/expiry and written with one bulk_write; snapshots the rule cannot label (no future
+    spot, missing inputs) are marked `unlabelable` so nothing is ever revisited.
+    Returns (labeled, unlabelable) counts.
+    """
+    lookahead = timedelta(minutes=lookahead_minutes)
+    cutoff = (now or datetime.utcnow()) - lookahead - timedelta(seconds=LABELER_GRACE_SECONDS)
+    watermark = get_watermark(db, name)
+    ts_range = {"$lte": cutoff}
+    if watermark is not None:
+        ts_range["$gt"] = watermark
+    projection = {"_id": 1, "user": 1, "expiry": 1, "timestamp": 1, **{f: 1 for f in fields}}
+    paths = signal_paths(fields)
+    if paths:
+        projection["signals_id"] = 1
+    cursor = (
+        db[coll]
+        .find({"timestamp": ts_range, "outcome": {"$exists": False}, "unlabelable": {"$exists": False}}, projection)
+        .sort("timestamp", 1)
+    )
+    labeled = unlabelable = 0
+    for chunk in _chunks(cursor, LABELER_BATCH):
+        if paths:
+            # Newer snapshots only reference their raw_signals (see signal_store)
+            resolve_signals(db, chunk, paths)
+        groups = {}
+        for doc in chunk:
+            groups.setdefault((doc.get("user"), doc.get("expiry")), []).append(doc)
+        ops = []
+        for (user, expiry), docs in groups.items():
+            spots = future_spots(db, user, expiry, [d["timestamp"] + lookahead for d in docs])
+            for doc, spot_future in zip(docs, spots):
+                outcome = rule(doc, spot_future)
+                if outcome is None:
+                    ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"unlabelable": True}}))
+                    unlabelable += 1
+                else:
+                    ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"outcome": outcome}}))
+                    labeled += 1
+        db[coll].bulk_write(ops, ordered=False)
+        # Checkpoint per chunk so an interrupted pass resumes where it stopped
+        set_watermark(db, name, chunk[-1]["timestamp"])
+    cursor.close()
+    set_watermark(db, name, cutoff)
+    return labeled, unlabelable
+
+
+def run_labeling_pass(db, now=None):
+    now = now or datetime.utcnow()
+    counts = {}
+    for name, coll, fields, rule in LABELERS:
+        labeled, unlabelable = label_collection(db, name, coll, fields, rule, now)
+        counts[name] = {"labeled": labeled, "unlabelable": unlabelable}
+        if labeled or unlabelable:
+            print(f"[{name}] Labeled {labeled} snapshots, {unlabelable} unlabelable")
+    return counts
+
+
+# --- Background worker (one per process) ---
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _labeler_loop(db):
+    ensure_labeler_indexes(db)
+    while True:
+        try:
+            run_labeling_pass(db)
+        except Exception:
+            # Keep the worker alive; the watermark makes the next pass retry from where this one stopped
+            traceback.print_exc()
+        time.sleep(LABELER_SLEEP)
+
+
+def start_labeler(db):
+    """Starts the labeler thread unless it is already running. Returns True if this call started it."""
+    global _worker
+    with _worker_lock:
+        if _worker is not None and _worker.is_alive():
+            return False
+        _worker = threading.Thread(target=_labeler_loop, args=(db,), name="outcome-labeler", daemon=True)
+        _worker.start()
+        return True
+
+
+def labeler_running():
+    return _worker is not None and _worker.is_alive()
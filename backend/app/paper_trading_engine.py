@@ -1,7 +1,9 @@
 import os
 from pymongo import MongoClient
 from datetime import timedelta
-from ml_inference import predict_meta_decision
+from ml_inference import meta_decisions
+from feature_schema import encode_rows
+from signal_store import resolve_signals
 
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
 client = MongoClient(MONGO_URI)
@@ -10,23 +12,32 @@ db = client["samarth"]
 LOOKAHEAD_MINUTES = [15, 30, 45, 60]
 PRICE_MOVE_THRESHOLD = 0.5  # percent
 
+entries = list(db["entry_logic_snapshots"].find({}))
+# Newer snapshots only reference their raw_signals (see signal_store)
+resolve_signals(db, entries, ["bias.bias", "bias.spot", "style.market_style", "trap.call.trap_detected",
+                              "reversal.reversal_type", "sr.confidence"])
+# Build meta-model features
+meta_rows = []
+for entry in entries:
+    meta_rows.append({
+        "entry_score": entry.get("entry_score"),
+        "confidence": entry.get("confidence"),
+        "anomaly_score": entry.get("anomaly_score"),
+        "bias": entry.get("raw_signals", {}).get("bias", {}).get("bias"),
+        "market_style": entry.get("raw_signals", {}).get("style", {}).get("market_style"),
+        "trap_call": entry.get("raw_signals", {}).get("trap", {}).get("call", {}).get("trap_detected"),
+        "reversal_type": entry.get("raw_signals", {}).get("reversal", {}).get("reversal_type"),
+        "sr_confidence": entry.get("raw_signals", {}).get("sr", [{}])[0].get("confidence") if entry.get("raw_signals", {}).get("sr") else None,
+    })
+# One predict call for every snapshot instead of a model load + predict per row
+decisions = meta_decisions(encode_rows("meta", meta_rows)) if meta_rows else []
+
 results = []
-for entry in db["entry_logic_snapshots"].find({}):
+for entry, meta_decision in zip(entries, decisions):
     ts = entry["timestamp"]
     user = entry["user"]
     expiry = entry["expiry"]
     direction = entry.get("entry_direction")
-    # Build meta-model features
-    entry_score = entry.get("entry_score")
-    confidence = entry.get("confidence")
-    anomaly_score = entry.get("anomaly_score")
-    bias = entry.get("raw_signals", {}).get("bias", {}).get("bias")
-    market_style = entry.get("raw_signals", {}).get("style", {}).get("market_style")
-    trap_call = entry.get("raw_signals", {}).get("trap", {}).get("call", {}).get("trap_detected")
-    reversal_type = entry.get("raw_signals", {}).get("reversal", {}).get("reversal_type")
-    sr_confidence = entry.get("raw_signals", {}).get("sr", [{}])[0].get("confidence") if entry.get("raw_signals", {}).get("sr") else None
-    meta_features = [entry_score, confidence, anomaly_score, bias, market_style, trap_call, reversal_type, sr_confidence]
-    meta_decision = predict_meta_decision(meta_features)
     if not meta_decision["should_enter"]:
         continue
     spot_now = entry.get("raw_signals", {}).get("bias", {}).get("spot")
@@ -34,12 +45,12 @@ for entry in db["entry_logic_snapshots"].find({}):
         continue
     entry_worked = 0
     for mins in LOOKAHEAD_MINUTES:
-        future = db["option_chain_snapshots"].find_one({
-            "user": user,
-            "expiry": expiry,
+        future = db["option_chain_aggregates"].find_one({
+            "meta.user": user,
+            "meta.expiry": expiry,
             "timestamp": {"$gte": ts + timedelta(minutes=mins)}
-        }, sort=[("timestamp", 1)])
-        spot_future = future["strikes"][0].get("underlying_spot_price") if future and future.get("strikes") else None
+        }, {"spot": 1}, sort=[("timestamp", 1)])
+        spot_future = future.get("spot") if future else None
         if spot_future is None:
             continue
         pct_move = (spot_future - spot_now) / spot_now * 100
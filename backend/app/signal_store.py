@@ -0,0 +1,56 @@
+"""
+Content-addressed storage of the Entry Logic Engine's per-tick `raw_signals` (bias, style, reversal, trap and
+the S/R zone list).
+
+The signals are stored once in signal_snapshots under the SHA-256 of their canonical JSON, and the log
+collections (entry_logic_engine_logs, entry_logic_snapshots, confidence_sizer_logs, anomaly_log, trade_journal)
+carry only that `signals_id`. Identical signals (e.g. several decisions on one tick) share one document.
+Readers resolve the reference lazily with resolve_signals / load_signals; documents written before this change
+still embed `raw_signals` and are left as they are.
+"""
+import hashlib
+import json
+
+SIGNALS_COLL = "signal_snapshots"
+SIGNALS_FIELD = "raw_signals"
+
+
+def signals_id(signals):
+    canonical = json.dumps(signals, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def signal_document(signals, timestamp):
+    """(id, document) for `signals`; insert the document ignoring duplicate keys, since the id is the content."""
+    sid = signals_id(signals)
+    return sid, {"_id": sid, "first_seen": timestamp, "signals": signals}
+
+
+def signal_paths(fields):
+    """The paths inside raw_signals among dotted `fields` (e.g. "raw_signals.bias.spot" -> "bias.spot")."""
+    prefix = SIGNALS_FIELD + "."
+    return [f[len(prefix):] for f in fields if f.startswith(prefix)]
+
+
+def load_signals(db, sid):
+    doc = db[SIGNALS_COLL].find_one({"_id": sid}, {"signals": 1}) if sid else None
+    return doc["signals"] if doc else None
+
+
+def resolve_signals(db, docs, paths=None):
+    """
+    Fills `raw_signals` in place for every doc that only references its signals, with one query per call.
+    `paths` (inside raw_signals) limits what is fetched.
+    """
+    ids = {doc["signals_id"] for doc in docs if doc.get("signals_id") and SIGNALS_FIELD not in doc}
+    if not ids:
+        return docs
+    if paths:
+        projection = {"signals." + ".".join(part for part in p.split(".") if not part.isdigit()): 1 for p in paths}
+    else:
+        projection = {"signals": 1}
+    found = {d["_id"]: d.get("signals", {}) for d in db[SIGNALS_COLL].find({"_id": {"$in": list(ids)}}, projection)}
+    for doc in docs:
+        if SIGNALS_FIELD not in doc and doc.get("signals_id") in found:
+            doc[SIGNALS_FIELD] = found[doc["signals_id"]]
+    return docs
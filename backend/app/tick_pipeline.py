@@ -0,0 +1,50 @@
+import asyncio
+
+# One pipeline per (user, expiry); replaced whenever a new option chain tick is ingested
+_pipelines = {}
+
+
+class TickPipeline:
+    """
+    Holds the signal module results for a single option chain tick.
+    Each module is computed at most once per tick, concurrent callers await the same result.
+    """
+
+    def __init__(self, user, expiry, timestamp, aggregate=None):
+        self.user = user
+        self.expiry = expiry
+        self.timestamp = timestamp
+        # Leg totals record of this tick (see chain_store.build_tick_aggregate)
+        self.aggregate = aggregate
+        self._results = {}
+        self._locks = {}
+
+    async def run(self, key, compute):
+        """
+        Returns the cached result for `key`, computing it with `compute()` (a coroutine factory) on first use.
+        Failures are not cached so a later caller can retry within the same tick.
+        """
+        if key in self._results:
+            return self._results[key]
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            if key not in self._results:
+                self._results[key] = await compute()
+        return self._results[key]
+
+    def result(self, key, default=None):
+        return self._results.get(key, default)
+
+
+def begin_tick(user, expiry, timestamp, aggregate=None):
+    pipeline = TickPipeline(user, expiry, timestamp, aggregate)
+    _pipelines[(user, expiry)] = pipeline
+    return pipeline
+
+
+def current_tick(user, expiry):
+    return _pipelines.get((user, expiry))
+
+
+def clear_ticks(user, expiry):
+    _pipelines.pop((user, expiry), None)
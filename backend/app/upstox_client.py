@@ -0,0 +1,102 @@
+import asyncio
+import os
+import httpx
+
+# Point at a local mock (see backend/mock_upstox_server.py) to benchmark fetches offline
+UPSTOX_BASE_URL = os.getenv("UPSTOX_BASE_URL", "https://api.upstox.com")
+UPSTOX_MAX_CONNECTIONS = int(os.getenv("UPSTOX_MAX_CONNECTIONS", 20))
+UPSTOX_MAX_KEEPALIVE = int(os.getenv("UPSTOX_MAX_KEEPALIVE", 10))
+UPSTOX_KEEPALIVE_EXPIRY = float(os.getenv("UPSTOX_KEEPALIVE_EXPIRY", 60))
+UPSTOX_TIMEOUT = float(os.getenv("UPSTOX_TIMEOUT", 10))
+UPSTOX_CONNECT_TIMEOUT = float(os.getenv("UPSTOX_CONNECT_TIMEOUT", 5))
+UPSTOX_RETRIES = int(os.getenv("UPSTOX_RETRIES", 2))
+UPSTOX_BACKOFF = float(os.getenv("UPSTOX_BACKOFF", 0.25))
+UPSTOX_HTTP2 = os.getenv("UPSTOX_HTTP2", "true").lower() in ("1", "true", "yes")
+
+# Rate limiting and gateway hiccups are worth another try; anything else is the caller's problem
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# Errors raised before the request left this process; safe to retry even for non-idempotent calls
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+_client = None
+
+
+def _http2_available():
+    # httpx only speaks HTTP/2 when the optional h2 package is installed (pip install httpx[http2])
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def create_client():
+    """Builds the application-lifetime client: pooled keep-alive connections, HTTP/2 when available."""
+    return httpx.AsyncClient(
+        base_url=UPSTOX_BASE_URL,
+        http2=UPSTOX_HTTP2 and _http2_available(),
+        limits=httpx.Limits(
+            max_connections=UPSTOX_MAX_CONNECTIONS,
+            max_keepalive_connections=UPSTOX_MAX_KEEPALIVE,
+            keepalive_expiry=UPSTOX_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(UPSTOX_TIMEOUT, connect=UPSTOX_CONNECT_TIMEOUT),
+        headers={"Accept": "application/json"},
+    )
+
+
+async def start_client():
+    global _client
+    if _client is None:
+        _client = create_client()
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client():
+    # Lazily created so scripts and tests that skip the startup hook still share one pool
+    global _client
+    if _client is None:
+        _client = create_client()
+    return _client
+
+
+async def request(method, path, retries=UPSTOX_RETRIES, idempotent=True, **kwargs):
+    """
+    Sends a request through the shared client with exponential backoff between attempts.
+    Idempotent calls retry any transport error and RETRY_STATUS responses; others only retry NOT_SENT_ERRORS.
+    Returns the last response or re-raises the last error.
+    """
+    client = get_client()
+    for attempt in range(retries + 1):
+        try:
+            response = await client.request(method, path, **kwargs)
+        except httpx.TransportError as e:
+            if attempt == retries or not (idempotent or isinstance(e, NOT_SENT_ERRORS)):
+                raise
+            print(f"[Upstox] {method} {path} failed ({e.__class__.__name__}), retry {attempt + 1}/{retries}")
+        else:
+            if not idempotent or response.status_code not in RETRY_STATUS or attempt == retries:
+                return response
+            print(f"[Upstox] {method} {path} returned {response.status_code}, retry {attempt + 1}/{retries}")
+        await asyncio.sleep(UPSTOX_BACKOFF * (2 ** attempt))
+
+
+async def fetch_option_chain(access_token, expiry, instrument_key="NSE_INDEX|Nifty 50"):
+    return await request(
+        "GET",
+        "/v2/option/chain",
+        params={"instrument_key": instrument_key, "expiry_date": expiry},
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+
+
+async def exchange_auth_code(payload):
+    # Authorization codes are single use: only retry when the request never reached Upstox
+    return await request("POST", "/v2/login/authorization/token", idempotent=False, data=payload)
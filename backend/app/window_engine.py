@@ -0,0 +1,283 @@
+from collections import deque
+from datetime import timezone as dt_timezone
+import numpy as np
+
+WINDOW_POINTS = 120  # 10 min at 5s intervals
+
+# Column layout of every window: (name, aggregate record section, field)
+COLUMNS = [
+    ("timestamp", None, None),  # epoch seconds (UTC)
+    ("spot", None, "spot"),
+    ("call_oi", "calls", "openInterest"),
+    ("call_iv", "calls", "iv"),
+    ("call_volume", "calls", "volume"),
+    ("put_oi", "puts", "openInterest"),
+    ("put_iv", "puts", "iv"),
+    ("put_volume", "puts", "volume"),
+]
+COLUMN_INDEX = {name: i for i, (name, _, _) in enumerate(COLUMNS)}
+
+# One window per (user, expiry), fed by option chain ingest
+_windows = {}
+# Rolling spot prices per (user, expiry); cleared with the analytics, unlike the aggregate windows
+_spot_rings = {}
+# Bias 10-minute delta lookbacks per (user, expiry); also cleared with the analytics
+_lookbacks = {}
+
+
+def to_epoch(ts):
+    # Mongo and datetime.utcnow() both give naive UTC datetimes
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=dt_timezone.utc)
+    return ts.timestamp()
+
+
+class WindowSnapshot:
+    """Frozen copy of a window; `snap["call_iv"]` is a contiguous float64 array, oldest to newest."""
+
+    def __init__(self, data):
+        self._data = data
+        self._touch_index = None
+
+    def __len__(self):
+        return self._data.shape[1]
+
+    def __getitem__(self, name):
+        return self._data[COLUMN_INDEX[name]]
+
+    def touch_index(self):
+        """TouchIndex over this window's spots, built on first use and shared by every module of the tick."""
+        if self._touch_index is None:
+            self._touch_index = TouchIndex(self["spot"], self["timestamp"])
+        return self._touch_index
+
+
+class TouchIndex:
+    """
+    Answers "when did spot last come within `band` of this level" for any number of levels at once.
+    The window's spots are sorted once, and a sparse table holds the newest tick of every power-of-two run of
+    that order; each level is then two binary searches and one range-max lookup instead of a window scan.
+    """
+
+    def __init__(self, spots, times):
+        # Missing spots (NaN, or 0 from a bad tick) never count as a touch
+        ticks = np.flatnonzero(~np.isnan(spots) & (spots != 0))
+        order = np.argsort(spots[ticks], kind="stable")
+        self._spots = spots[ticks][order]
+        self._times = times
+        n = len(order)
+        # table[k, i] = newest tick among sorted positions i .. i + 2**k - 1 (-1 past the end)
+        table = np.full((max(1, n.bit_length()), n), -1, dtype=np.int64)
+        table[0] = ticks[order]
+        for k in range(1, len(table)):
+            half = 1 << (k - 1)
+            table[k, :n - half] = np.maximum(table[k - 1, :n - half], table[k - 1, half:])
+        self._table = table
+
+    def last_touch(self, levels, bands):
+        """Epoch of the newest tick with |spot - level| <= band for each level, NaN where none is in the window."""
+        levels = np.asarray(levels, dtype=np.float64)
+        lo = np.searchsorted(self._spots, levels - bands, side="left")
+        hi = np.searchsorted(self._spots, levels + bands, side="right")
+        found = hi > lo
+        times = np.full(len(levels), np.nan)
+        if found.any():
+            lo, hi = lo[found], hi[found]
+            k = np.log2(hi - lo).astype(np.int64)
+            newest = np.maximum(self._table[k, lo], self._table[k, hi - (1 << k)])
+            times[found] = self._times[newest]
+        return times
+
+
+class TickWindow:
+    """
+    Last `capacity` ticks of one user/expiry held as preallocated float64 columns.
+    Every value is written twice (at i and i + capacity) so the live window is always one contiguous slice.
+    """
+
+    def __init__(self, capacity=WINDOW_POINTS):
+        self.capacity = capacity
+        self._buf = np.zeros((len(COLUMNS), 2 * capacity), dtype=np.float64)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def last_timestamp(self):
+        if not self._size:
+            return None
+        return self._buf[0, self._start + self._size - 1]
+
+    def append(self, record):
+        """Appends an aggregate record (see chain_store.build_tick_aggregate); ticks not newer than the last one are ignored."""
+        ts = to_epoch(record["timestamp"])
+        if self._size and ts <= self.last_timestamp:
+            return
+        if self._size < self.capacity:
+            pos = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            pos = self._start
+            self._start = (self._start + 1) % self.capacity
+        for i, (name, section, field) in enumerate(COLUMNS):
+            if name == "timestamp":
+                value = ts
+            elif section is None:
+                value = record.get(field)
+            else:
+                value = record[section].get(field)
+            value = float(value) if value is not None else np.nan
+            self._buf[i, pos] = value
+            self._buf[i, pos + self.capacity] = value
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def snapshot(self):
+        return WindowSnapshot(self._buf[:, self._start:self._start + self._size].copy())
+
+
+class RingBuffer:
+    """Fixed-size float64 ring, mirrored like TickWindow so `values()` is a single contiguous copy."""
+
+    def __init__(self, capacity=WINDOW_POINTS):
+        self.capacity = capacity
+        self._buf = np.zeros(2 * capacity, dtype=np.float64)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, value):
+        if self._size < self.capacity:
+            pos = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            pos = self._start
+            self._start = (self._start + 1) % self.capacity
+        self._buf[pos] = value
+        self._buf[pos + self.capacity] = value
+
+    def extend(self, values):
+        for value in values[-self.capacity:]:
+            self.append(value)
+
+    def values(self):
+        return self._buf[self._start:self._start + self._size].copy()
+
+
+class LookbackBuffer:
+    """
+    Time-ordered (epoch, values) entries answering "latest entry at or before now - horizon" in O(1).
+    Entries older than that anchor are dropped on append, so the buffer never holds more than one horizon of ticks.
+    """
+
+    def __init__(self, horizon_seconds):
+        self.horizon = horizon_seconds
+        self.checkpointed_at = None
+        self._entries = deque()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def append(self, ts, values):
+        if self._entries and ts <= self._entries[-1][0]:
+            return
+        self._entries.append((ts, values))
+        cutoff = ts - self.horizon
+        while len(self._entries) > 1 and self._entries[1][0] <= cutoff:
+            self._entries.popleft()
+
+    def extend(self, entries):
+        for ts, values in entries:
+            self.append(ts, values)
+
+    def lookback(self, now):
+        """Values of the newest entry at least `horizon` seconds older than `now`, or None."""
+        if self._entries and self._entries[0][0] <= now - self.horizon:
+            return self._entries[0][1]
+        return None
+
+    def checkpoint(self, step):
+        """Entries thinned to at most one per `step` seconds, always keeping the current anchor."""
+        kept = []
+        for ts, values in self._entries:
+            if not kept or ts - kept[-1][0] >= step:
+                kept.append((ts, values))
+        return kept
+
+
+def get_window(user, expiry):
+    return _windows.get((user, expiry))
+
+
+def create_window(user, expiry, capacity=WINDOW_POINTS):
+    window = TickWindow(capacity)
+    _windows[(user, expiry)] = window
+    return window
+
+
+def get_spot_ring(user, expiry):
+    return _spot_rings.get((user, expiry))
+
+
+def create_spot_ring(user, expiry, capacity=WINDOW_POINTS):
+    ring = RingBuffer(capacity)
+    _spot_rings[(user, expiry)] = ring
+    return ring
+
+
+def drop_spot_ring(user, expiry):
+    _spot_rings.pop((user, expiry), None)
+
+
+def get_lookback(user, expiry):
+    return _lookbacks.get((user, expiry))
+
+
+def create_lookback(user, expiry, horizon_seconds):
+    buf = LookbackBuffer(horizon_seconds)
+    _lookbacks[(user, expiry)] = buf
+    return buf
+
+
+def drop_lookback(user, expiry):
+    _lookbacks.pop((user, expiry), None)
+
+
+# --- Vectorized series primitives ---
+def ema(x, alpha):
+    """Closed form of `e = x[0]; for v in x[1:]: e = alpha * v + (1 - alpha) * e`."""
+    n = len(x)
+    if n == 0:
+        return None
+    decay = (1 - alpha) ** np.arange(n - 1, -1, -1, dtype=np.float64)
+    weights = alpha * decay
+    weights[0] = decay[0]
+    return float(weights @ x)
+
+
+def slope(x):
+    """Average change per point between the first and last value."""
+    return float((x[-1] - x[0]) / len(x)) if len(x) else 0.0
+
+
+def value_range(x):
+    return float(np.ptp(x)) if len(x) else 0.0
+
+
+def delta_vs_avg(x, exclude_last=3):
+    """Returns (latest - avg, avg), where avg is the window mean excluding its last `exclude_last` points."""
+    base = x[:-exclude_last] if len(x) > exclude_last else x
+    return float(x[-1] - base.mean()), float(base.mean())
+
+
+def rising_iv_falling_volume(iv, vol, k=3):
+    """True when IV rose on any of the last `k` steps while volume fell on all of them."""
+    if len(iv) < k + 1 or len(vol) < k + 1:
+        return False
+    return bool((np.diff(iv[-(k + 1):]) > 0).any() and (np.diff(vol[-(k + 1):]) < 0).all())
@@ -0,0 +1,152 @@
+"""
+Local stand-in for the Upstox endpoints the backend calls, for offline development and fetch benchmarks.
+
+    python mock_upstox_server.py serve --port 9100
+    UPSTOX_BASE_URL=http://127.0.0.1:9100 uvicorn app.main:app      # backend against the mock
+    python mock_upstox_server.py bench --url http://127.0.0.1:9100 --requests 500 --concurrency 10
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from urllib.parse import parse_qs
+from fastapi import FastAPI, Query, Request, Response
+
+MOCK_LATENCY_MS = float(os.getenv("MOCK_UPSTOX_LATENCY_MS", 0))
+# Fraction of option chain calls answered with a 503, to exercise the client's retry path
+MOCK_FAIL_RATE = float(os.getenv("MOCK_UPSTOX_FAIL_RATE", 0))
+MOCK_STRIKES = int(os.getenv("MOCK_UPSTOX_STRIKES", 41))
+STRIKE_STEP = 50
+
+app = FastAPI()
+_state = {"spot": float(os.getenv("MOCK_UPSTOX_SPOT", 22000))}
+
+
+def _leg(moneyness, is_call):
+    # Rough smile: OI/volume peak near the money, IV rises away from it
+    weight = max(0.05, 1 - abs(moneyness) / 12)
+    return {
+        "market_data": {
+            "ltp": round(max(0.05, (-moneyness if is_call else moneyness) * STRIKE_STEP + 80 * weight), 2),
+            "volume": int(random.uniform(0.8, 1.2) * 2e6 * weight),
+            "oi": int(random.uniform(0.9, 1.1) * 4e6 * weight),
+            "close_price": 0,
+            "bid_price": 0,
+            "bid_qty": random.randint(50, 5000),
+            "ask_price": 0,
+            "ask_qty": random.randint(50, 5000),
+            "prev_oi": int(4e6 * weight),
+        },
+        "option_greeks": {
+            "vega": round(random.uniform(5, 15), 4),
+            "theta": round(random.uniform(-15, -2), 4),
+            "gamma": round(random.uniform(0.0001, 0.002), 6),
+            "delta": round(weight if is_call else -weight, 4),
+            "iv": round(12 + abs(moneyness) * 0.4 + random.uniform(-0.5, 0.5), 2),
+            "pop": round(random.uniform(10, 90), 2),
+        },
+    }
+
+
+def build_chain(expiry, spot):
+    atm = round(spot / STRIKE_STEP) * STRIKE_STEP
+    half = MOCK_STRIKES // 2
+    data = []
+    for i in range(-half, half + 1):
+        strike = atm + i * STRIKE_STEP
+        moneyness = (strike - spot) / STRIKE_STEP
+        data.append({
+            "expiry": expiry,
+            "pcr": round(random.uniform(0.6, 1.4), 4),
+            "strike_price": strike,
+            "underlying_key": "NSE_INDEX|Nifty 50",
+            "underlying_spot_price": round(spot, 2),
+            "call_options": {"instrument_key": f"NSE_FO|C{strike}", **_leg(moneyness, True)},
+            "put_options": {"instrument_key": f"NSE_FO|P{strike}", **_leg(moneyness, False)},
+        })
+    return data
+
+
+@app.get("/v2/option/chain")
+async def option_chain(response: Response, instrument_key: str = Query(...), expiry_date: str = Query(...)):
+    if MOCK_LATENCY_MS:
+        await asyncio.sleep(MOCK_LATENCY_MS / 1000)
+    if MOCK_FAIL_RATE and random.random() < MOCK_FAIL_RATE:
+        response.status_code = 503
+        return {"status": "error", "errors": [{"message": "mock outage"}]}
+    _state["spot"] += random.gauss(0, 4)
+    return {"status": "success", "data": build_chain(expiry_date, _state["spot"])}
+
+
+@app.post("/v2/login/authorization/token")
+async def token(request: Request):
+    # Parsed by hand so the mock does not need python-multipart for Form()
+    form = parse_qs((await request.body()).decode())
+    code = form.get("code", ["code"])[0]
+    return {"access_token": f"mock-{code}", "user_name": "mock"}
+
+
+@app.get("/v2/login/authorization/dialog")
+async def dialog():
+    return {"status": "success"}
+
+
+# --- Benchmark ---
+async def bench(total, concurrency, expiry):
+    from app.upstox_client import UPSTOX_BASE_URL, start_client, close_client, fetch_option_chain
+
+    await start_client()
+    latencies = []
+    errors = 0
+    versions = set()
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            t0 = time.perf_counter()
+            try:
+                r = await fetch_option_chain("bench", expiry)
+                versions.add(r.http_version)
+                if r.status_code != 200:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - t0
+    await close_client()
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+    protocol = "/".join(sorted(versions))
+    print(f"{UPSTOX_BASE_URL}  {protocol}  requests={total}  concurrency={concurrency}")
+    print(f"throughput {total / elapsed:.1f} req/s  errors {errors}")
+    print(f"latency ms  p50 {pct(0.5):.1f}  p95 {pct(0.95):.1f}  p99 {pct(0.99):.1f}  max {latencies[-1] * 1000:.1f}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sp = sub.add_parser("serve")
+    sp.add_argument("--host", default="127.0.0.1")
+    sp.add_argument("--port", type=int, default=9100)
+    bp = sub.add_parser("bench")
+    bp.add_argument("--url", default="http://127.0.0.1:9100")
+    bp.add_argument("--requests", type=int, default=200)
+    bp.add_argument("--concurrency", type=int, default=4)
+    bp.add_argument("--expiry", default="2024-01-25")
+    args = ap.parse_args()
+
+    if args.cmd == "serve":
+        import uvicorn
+        uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    else:
+        # upstox_client reads its config at import time
+        os.environ["UPSTOX_BASE_URL"] = args.url
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        asyncio.run(bench(args.requests, args.concurrency, args.expiry))
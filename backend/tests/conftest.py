@@ -0,0 +1,24 @@
+import os
+import sys
+
+import mongomock
+import pytest
+from mongomock.collection import BulkOperationBuilder
+
+# Test dependencies: backend/requirements-dev.txt. Run with python -m pytest backend/tests
+# The tests import the backend as the root scripts do (backend.app.X), whatever directory pytest runs from
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+
+@pytest.fixture
+def mongo_db(monkeypatch):
+    """An empty mongomock database whose bulk_write accepts the operations of the installed pymongo."""
+    # Recent pymongo releases pass sort= to the bulk builder, which mongomock 4.3 does not know; the code never sets it
+    for method in ("add_update", "add_replace"):
+        original = getattr(BulkOperationBuilder, method)
+
+        def accept_sort(self, *args, sort=None, _original=original, **kwargs):
+            assert sort is None
+            return _original(self, *args, **kwargs)
+        monkeypatch.setattr(BulkOperationBuilder, method, accept_sort)
+    return mongomock.MongoClient()["samarth"]
@@ -0,0 +1,66 @@
+"""future_aggregates' single-cursor merge join against one find_one per target."""
+import random
+from datetime import datetime, timedelta
+
+import mongomock
+import pytest
+
+from backend.app.chain_store import CHAIN_AGG_COLL, future_aggregates
+
+START = datetime(2024, 1, 2, 3, 45)
+
+
+@pytest.fixture
+def db():
+    db = mongomock.MongoClient()["samarth"]
+    rng = random.Random(11)
+    docs = []
+    for user, expiry in [("u1", "2024-01-04"), ("u1", "2024-01-11"), ("u2", "2024-01-04")]:
+        ts = START
+        for _ in range(300):
+            # Irregular ticks, some sharing a timestamp
+            ts += timedelta(seconds=rng.choice([0, 5, 5, 5, 10, 60]))
+            docs.append({
+                "meta": {"user": user, "expiry": expiry}, "timestamp": ts,
+                "spot": rng.uniform(21900, 22100), "calls": {"volume": rng.randint(0, 1000)},
+            })
+    rng.shuffle(docs)
+    db[CHAIN_AGG_COLL].insert_many(docs)
+    return db
+
+
+def find_one_each(db, user, expiry, targets, fields):
+    found = []
+    for target in targets:
+        doc = db[CHAIN_AGG_COLL].find_one(
+            {"meta.user": user, "meta.expiry": expiry, "timestamp": {"$gte": target}},
+            {"_id": 0, "timestamp": 1, **{f: 1 for f in fields}},
+            sort=[("timestamp", 1)],
+        )
+        found.append(doc)
+    return found
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("fields", [("spot",), ("spot", "calls.volume")])
+def test_future_aggregates_matches_find_one(db, seed, fields):
+    rng = random.Random(seed)
+    last = db[CHAIN_AGG_COLL].find_one({"meta.user": "u1", "meta.expiry": "2024-01-04"}, sort=[("timestamp", -1)])
+    span = (last["timestamp"] - START).total_seconds()
+    # Unsorted targets: before the series, duplicates, exact tick times, between ticks and past the end
+    targets = [START + timedelta(seconds=rng.uniform(-120, span + 120)) for _ in range(40)]
+    targets += [targets[0], targets[3], START - timedelta(hours=1), last["timestamp"], last["timestamp"] + timedelta(seconds=1)]
+    targets += [doc["timestamp"] for doc in db[CHAIN_AGG_COLL].find({"meta.user": "u1"}).limit(5)]
+    rng.shuffle(targets)
+    assert future_aggregates(db, "u1", "2024-01-04", targets, fields) == find_one_each(
+        db, "u1", "2024-01-04", targets, fields,
+    )
+
+
+def test_future_aggregates_edges(db):
+    assert future_aggregates(db, "u1", "2024-01-04", []) == []
+    assert future_aggregates(db, "nobody", "2024-01-04", [START]) == [None]
+    late = START + timedelta(days=2)
+    assert future_aggregates(db, "u2", "2024-01-04", [late, START]) == [None] + find_one_each(
+        db, "u2", "2024-01-04", [START], ("spot",),
+    )
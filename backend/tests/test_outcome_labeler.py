@@ -0,0 +1,121 @@
+"""The outcome labeler's watermark window, unlabelable marking and single-worker guard, on mongomock."""
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.app import outcome_labeler
+from backend.app.chain_store import CHAIN_AGG_COLL
+from backend.app.outcome_labeler import (
+    LABELER_GRACE_SECONDS, LABELERS, LOOKAHEAD_MINUTES, get_watermark, label_collection, run_labeling_pass,
+    start_labeler,
+)
+
+START = datetime(2024, 1, 2, 3, 45)
+LOOKAHEAD = timedelta(minutes=LOOKAHEAD_MINUTES)
+TICKS = 360  # 30 minutes of 5s ticks
+LAST_TICK = START + timedelta(seconds=5 * (TICKS - 1))
+# Inputs every rule can score, so a snapshot is unlabelable only for want of a future spot
+SNAPSHOT_FIELDS = {
+    "entry_logic_snapshots": {"entry_direction": "long", "raw_signals": {"bias": {"spot": 22000.0}}},
+    "bias_identifier_snapshots": {"bias": "Bullish", "spot": 22000.0},
+    "market_style_snapshots": {"market_style": "Trending Up", "spot_trend_strength": 12.0},
+    "trap_detector_snapshots": {"call": {"trap_detected": True}},
+    "reversal_probability_snapshots": {"reversal_type": "bullish"},
+    "support_resistance_snapshots": {"zones": [{"bias_suggestion": "Break"}]},
+}
+
+
+def snapshot(coll, ts):
+    return {"user": "u1", "expiry": "2024-01-04", "timestamp": ts, **SNAPSHOT_FIELDS[coll]}
+
+
+def cutoff_for(now):
+    return now - LOOKAHEAD - timedelta(seconds=LABELER_GRACE_SECONDS)
+
+
+@pytest.fixture
+def db(mongo_db):
+    mongo_db[CHAIN_AGG_COLL].insert_many([
+        {"meta": {"user": "u1", "expiry": "2024-01-04"}, "timestamp": START + timedelta(seconds=5 * i),
+         "spot": 22000.0 + i}
+        for i in range(TICKS)
+    ])
+    for _, coll, _, _ in LABELERS:
+        mongo_db[coll].insert_many([snapshot(coll, START + timedelta(seconds=5 * i)) for i in range(TICKS)])
+    return mongo_db
+
+
+def test_snapshots_without_future_spot_are_unlabelable_for_every_rule(db):
+    now = LAST_TICK + LOOKAHEAD + timedelta(seconds=LABELER_GRACE_SECONDS)
+    counts = run_labeling_pass(db, now)
+    # Snapshots whose lookahead lands past the last tick have no future spot
+    expected_unlabelable = sum(1 for i in range(TICKS) if START + timedelta(seconds=5 * i) + LOOKAHEAD > LAST_TICK)
+    assert expected_unlabelable > 0
+    for name, coll, _, _ in LABELERS:
+        assert counts[name] == {"labeled": TICKS - expected_unlabelable, "unlabelable": expected_unlabelable}, name
+        for doc in db[coll].find():
+            if doc["timestamp"] + LOOKAHEAD > LAST_TICK:
+                assert doc.get("unlabelable") is True and "outcome" not in doc, name
+            else:
+                assert doc["outcome"] in (0, 1) and "unlabelable" not in doc, name
+        assert get_watermark(db, name) == cutoff_for(now)
+
+
+def test_watermark_advances_and_is_read_back(db):
+    name, coll, fields, rule = LABELERS[1]
+    first_now = START + timedelta(minutes=5) + LOOKAHEAD + timedelta(seconds=LABELER_GRACE_SECONDS)
+    labeled, unlabelable = label_collection(db, name, coll, fields, rule, first_now)
+    assert (labeled, unlabelable) == (61, 0)  # START .. START + 5 min inclusive
+    assert get_watermark(db, name) == START + timedelta(minutes=5)
+
+    # A snapshot arriving behind the watermark is not picked up again; the next pass resumes after it
+    late = db[coll].insert_one(snapshot(coll, START + timedelta(seconds=1))).inserted_id
+    second_now = first_now + timedelta(minutes=1)
+    labeled, unlabelable = label_collection(db, name, coll, fields, rule, second_now)
+    assert (labeled, unlabelable) == (12, 0)
+    assert get_watermark(db, name) == cutoff_for(second_now)
+    assert "outcome" not in db[coll].find_one({"_id": late})
+
+    # The watermark never moves back
+    label_collection(db, name, coll, fields, rule, first_now)
+    assert get_watermark(db, name) == cutoff_for(second_now)
+
+
+def test_interrupted_pass_resumes_from_last_chunk(db, monkeypatch):
+    name, coll, fields, rule = LABELERS[1]
+    monkeypatch.setattr(outcome_labeler, "LABELER_BATCH", 10)
+    seen = []
+
+    def failing_rule(doc, spot_future):
+        if len(seen) == 25:
+            raise RuntimeError("interrupted")
+        seen.append(doc["timestamp"])
+        return rule(doc, spot_future)
+
+    now = LAST_TICK + LOOKAHEAD + timedelta(seconds=LABELER_GRACE_SECONDS)
+    with pytest.raises(RuntimeError):
+        label_collection(db, name, coll, fields, failing_rule, now)
+    # Two full chunks were written and checkpointed; the third was not
+    assert get_watermark(db, name) == seen[19]
+    assert db[coll].count_documents({"outcome": {"$exists": True}}) == 20
+
+    labeled, unlabelable = label_collection(db, name, coll, fields, rule, now)
+    assert labeled + unlabelable == TICKS - 20
+    assert db[coll].count_documents({"outcome": {"$exists": False}, "unlabelable": {"$exists": False}}) == 0
+
+
+def test_start_labeler_runs_one_worker(mongo_db, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(outcome_labeler, "_worker", None)
+    monkeypatch.setattr(outcome_labeler, "_labeler_loop", lambda db: release.wait(5))
+    try:
+        assert start_labeler(mongo_db) is True
+        assert start_labeler(mongo_db) is False
+        assert outcome_labeler.labeler_running()
+    finally:
+        release.set()
+        outcome_labeler._worker.join(5)
+    assert not outcome_labeler.labeler_running()
+    monkeypatch.setattr(outcome_labeler, "_labeler_loop", lambda db: None)
+    assert start_labeler(mongo_db) is True
@@ -0,0 +1,152 @@
+"""Equivalence of the window_engine primitives with the plain loops they replaced."""
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from backend.app.window_engine import COLUMNS, TickWindow, TouchIndex, ema, to_epoch
+
+START = datetime(2024, 1, 2, 3, 45)
+
+
+def make_record(rng, ts):
+    def leg():
+        return {
+            "openInterest": rng.choice([None, rng.uniform(1e4, 1e6)]),
+            "iv": rng.uniform(5, 40),
+            "volume": rng.choice([None, rng.uniform(0, 1e5)]),
+        }
+    return {"timestamp": ts, "spot": rng.uniform(21000, 23000), "calls": leg(), "puts": leg()}
+
+
+def naive_window(records, capacity):
+    """What TickWindow is meant to hold: the newest `capacity` of the ticks that were newer than the one before."""
+    kept = []
+    for record in records:
+        if kept and to_epoch(record["timestamp"]) <= to_epoch(kept[-1]["timestamp"]):
+            continue
+        kept.append(record)
+    rows = []
+    for record in kept[-capacity:]:
+        row = []
+        for name, section, field in COLUMNS:
+            if name == "timestamp":
+                value = to_epoch(record["timestamp"])
+            else:
+                value = (record if section is None else record[section]).get(field)
+            row.append(np.nan if value is None else float(value))
+        rows.append(row)
+    return np.array(rows, dtype=np.float64).reshape(-1, len(COLUMNS)).T
+
+
+@pytest.mark.parametrize("capacity,ticks", [(1, 5), (7, 3), (7, 7), (7, 8), (7, 50), (120, 400)])
+def test_tick_window_wraparound_matches_list(capacity, ticks):
+    rng = random.Random(capacity * 1000 + ticks)
+    records = [make_record(rng, START + timedelta(seconds=5 * i)) for i in range(ticks)]
+    window = TickWindow(capacity)
+    for n, record in enumerate(records, 1):
+        window.append(record)
+        # Every intermediate state, not just the last, so each wrap position is covered
+        expected = naive_window(records[:n], capacity)
+        snap = window.snapshot()
+        assert len(window) == len(snap) == expected.shape[1]
+        for i, (name, _, _) in enumerate(COLUMNS):
+            np.testing.assert_array_equal(snap[name], expected[i])
+            assert snap[name].flags["C_CONTIGUOUS"]
+        assert window.last_timestamp == expected[0, -1]
+
+
+def test_tick_window_ignores_out_of_order_and_duplicate_ticks():
+    rng = random.Random(7)
+    offsets = [0, 5, 5, 3, 10, 15, 1, 20, 20, 25, 30, 12, 35, 40, 45, 50]
+    records = [make_record(rng, START + timedelta(seconds=s)) for s in offsets]
+    window = TickWindow(5)
+    window.extend(records)
+    expected = naive_window(records, 5)
+    np.testing.assert_array_equal(window.snapshot()["timestamp"], expected[0])
+    np.testing.assert_array_equal(window.snapshot()["spot"], expected[1])
+    assert list(np.diff(window.snapshot()["timestamp"]) > 0) == [True] * 4
+
+
+def test_tick_window_empty():
+    window = TickWindow(4)
+    assert len(window) == 0 and window.last_timestamp is None
+    assert len(window.snapshot()) == 0
+
+
+def ema_loop(x, alpha):
+    # The per-tick loop the market style module used before the closed form
+    e = x[0]
+    for v in x[1:]:
+        e = alpha * v + (1 - alpha) * e
+    return e
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 10, 120])
+def test_ema_matches_loop(n):
+    rng = np.random.default_rng(n)
+    x = 22000 + rng.normal(0, 25, n).cumsum()
+    for alpha in (2 / (min(n, 120) + 1), 0.05, 0.5, 1.0):
+        assert ema(x, alpha) == pytest.approx(ema_loop(x, alpha), rel=1e-12, abs=1e-9)
+
+
+def test_ema_empty():
+    assert ema(np.array([]), 0.5) is None
+
+
+def last_touch_scan(spots, times, levels, bands):
+    # Per-level scan of the window, newest tick first, as the S/R guard did before TouchIndex
+    bands = np.broadcast_to(np.asarray(bands, dtype=np.float64), (len(levels),))
+    result = []
+    for level, band in zip(levels, bands):
+        touched = np.nan
+        for i in range(len(spots) - 1, -1, -1):
+            spot = spots[i]
+            if np.isnan(spot) or spot == 0:
+                continue
+            if abs(spot - level) <= band:
+                touched = times[i]
+                break
+        result.append(touched)
+    return np.array(result, dtype=np.float64)
+
+
+def random_window(rng, n, integer):
+    spots = rng.integers(21950, 22050, n).astype(np.float64) if integer else rng.uniform(21950, 22050, n)
+    # Missing ticks
+    spots[rng.random(n) < 0.1] = np.nan
+    spots[rng.random(n) < 0.05] = 0.0
+    times = 1.7e9 + 5.0 * np.arange(n)
+    return spots, times
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_last_touch_matches_scan(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(0, 200))
+    # Integer spots, levels and bands make exact band edges and tied spots common
+    integer = seed % 2 == 0
+    spots, times = random_window(rng, n, integer)
+    levels = rng.integers(21900, 22100, 60).astype(np.float64) if integer else rng.uniform(21900, 22100, 60)
+    index = TouchIndex(spots, times)
+    for bands in (rng.integers(0, 15, 60).astype(np.float64), 5.0, 0.0):
+        np.testing.assert_array_equal(
+            index.last_touch(levels, bands), last_touch_scan(spots, times, levels, bands),
+        )
+
+
+def test_last_touch_ties_pick_newest_tick():
+    spots = np.array([100.0, 105.0, 100.0, np.nan, 0.0, 100.0, 95.0])
+    times = np.arange(len(spots), dtype=np.float64) * 10
+    index = TouchIndex(spots, times)
+    np.testing.assert_array_equal(
+        index.last_touch([100.0, 105.0, 102.5, 0.0, 90.0], [0.0, 0.0, 2.5, 1.0, 4.9]),
+        [50.0, 10.0, 50.0, np.nan, np.nan],
+    )
+
+
+def test_last_touch_without_valid_spots():
+    for spots in (np.array([]), np.array([np.nan, 0.0, np.nan])):
+        index = TouchIndex(spots, np.arange(len(spots), dtype=np.float64))
+        assert np.isnan(index.last_touch([0.0, 100.0], 50.0)).all()
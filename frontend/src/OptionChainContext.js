@@ -29,7 +29,7 @@ export function OptionChainProvider({ user: externalUser, children }) {
     }
   });
   const [error, setError] = useState(null);
-  const intervalRef = useRef(null);
+  const streamRef = useRef(null);
   const lastOptionChainRef = useRef(null); // for change detection
 
   // Persist state
@@ -111,13 +111,38 @@ export function OptionChainProvider({ user: externalUser, children }) {
     }
   }, [user, expiry, fetchAnalytics]);
 
-  // Polling logic
+  // Subscribe to the server-side poller: one Upstox fetch + module run per tick, shared by all open tabs
   useEffect(() => {
     if (!fetching || !user || !expiry) return;
-    fetchOptionChain(); // Fetch immediately
-    intervalRef.current = setInterval(fetchOptionChain, 5000);
-    return () => clearInterval(intervalRef.current);
-  }, [fetching, user, expiry, fetchOptionChain]);
+    const source = new EventSource(`${API_BASE}/stream/option-chain?user=${user}&expiry=${expiry}`);
+    streamRef.current = source;
+    source.addEventListener('tick', (e) => {
+      const json = JSON.parse(e.data);
+      const newStrikes = json.strikes || [];
+      const newStrikesString = JSON.stringify(newStrikes);
+      setError(null);
+      if (lastOptionChainRef.current !== newStrikesString) {
+        setOptionChain(newStrikes);
+        lastOptionChainRef.current = newStrikesString;
+        // Modules that failed this tick are left out, keep their last known result
+        setAnalytics(prev => ({ ...prev, ...(json.analytics || {}) }));
+      }
+    });
+    source.addEventListener('error', (e) => {
+      // Server-sent error events carry a detail; connection drops have none and EventSource reconnects itself
+      if (e.data) {
+        try {
+          setError(JSON.parse(e.data).detail || 'Failed to fetch option chain');
+        } catch {
+          setError('Failed to fetch option chain');
+        }
+      }
+    });
+    return () => {
+      source.close();
+      streamRef.current = null;
+    };
+  }, [fetching, user, expiry]);
 
   // Auto-resume fetching after reload if needed
   useEffect(() => {
@@ -135,7 +160,7 @@ export function OptionChainProvider({ user: externalUser, children }) {
   };
   const stopFetching = () => {
     setFetching(false);
-    clearInterval(intervalRef.current);
+    if (streamRef.current) streamRef.current.close();
   };
 
   return (
@@ -5,6 +5,7 @@ import plotly.express as px
 from pymongo import MongoClient
 from datetime import datetime
 import requests
+from backend.app.signal_store import load_signals
 
 st.set_page_config(page_title='ML Model Monitoring Dashboard', layout='wide')
 st.title('ML Model Monitoring & Evaluation Dashboard')
@@ -199,7 +200,11 @@ with tabs[6]:
         st.write(f"**Outcome:** {trade.get('outcome', 'N/A')}")
         st.write(f"**Modules Triggered:** {', '.join(trade['modules_triggered'])}")
         st.write("**Module Outputs:**")
-        st.json(trade["raw_signals"])
+        # Entries logged since signals were deduplicated reference them by id; fetch only the selected trade's
+        raw_signals = trade.get("raw_signals")
+        if not isinstance(raw_signals, dict):
+            raw_signals = load_signals(db, trade.get("signals_id"))
+        st.json(raw_signals or {})
         # Optional: next/prev navigation
         idx = df_journal.index[df_journal["timestamp"].astype(str) == selected][0]
         col1, col2 = st.columns(2)
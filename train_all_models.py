@@ -0,0 +1,6 @@
+import sys
+from backend.app.model_training import main
+
+# Trains every module model (or those named) in parallel: see backend/app/model_training.py
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,49 +1,6 @@
-import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import classification_report, roc_auc_score
-import joblib
-import datetime
-import os
+import sys
+from backend.app.model_training import run_training
 
-# 1. Load data
-CSV = 'trap_detector_snapshots_labeled.csv'
-LOG = 'ml_logs/trap_training.log'
-MODEL = 'ml_models/trap_detector_model.pkl'
-df = pd.read_csv(CSV)
-
-# 2. Features and target
-features = [
-    'deception_score', 'trap_memory', 'spot_delta', 'trap_detected'
-]
-# Convert categorical features to numeric
-if 'trap_detected' in df:
-    df['trap_detected'] = df['trap_detected'].astype('category').cat.codes
-X = df[features]
-y = df['true_trap']
-
-# 3. Train/test split
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# 4. Train model
-clf = RandomForestClassifier(n_estimators=100, random_state=42)
-clf.fit(X_train, y_train)
-
-# 5. Evaluate
-y_pred = clf.predict(X_test)
-y_prob = clf.predict_proba(X_test)[:, 1]
-report = classification_report(y_test, y_pred)
-roc = roc_auc_score(y_test, y_prob)
-print(report)
-print('ROC-AUC:', roc)
-
-# 6. Save model
-os.makedirs('ml_models', exist_ok=True)
-os.makedirs('ml_logs', exist_ok=True)
-joblib.dump(clf, MODEL)
-
-# 7. Log metrics
-with open(LOG, 'a') as f:
-    f.write(f'[{datetime.datetime.now()}] Training run for Trap Detector\n')
-    f.write(report + f'\nROC-AUC: {roc}\n')
-    f.write(f'Model saved to {MODEL}\n\n') 
\ No newline at end of file
+# Spec (model path, estimator, evaluation, training log): backend/app/model_training.py TRAINERS["trap"]
+if __name__ == "__main__":
+    sys.exit(0 if run_training(["trap"]) else 1)